@@ -0,0 +1,160 @@
+"""Compare per-record and batched decoder throughput.
+
+Run with ``uv run python benchmarks/bench_batching.py``.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from pyreadsb.decode_cache import DecodeCache
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.traces_decoder import (
+    process_traces_from_file,
+    process_traces_from_json_bytes,
+)
+
+TRACE_RESOURCE = (
+    Path(__file__).parent.parent / "tests" / "resources" / "trace_full_ac134a.json"
+)
+
+
+def _signed32(value: int) -> int:
+    return value - (1 << 32) if value & (1 << 31) else value
+
+
+def synthetic_heatmap(records: int) -> bytes:
+    """Build a little-endian heatmap slot with one separator per 1000 records."""
+    rng = random.Random(0)
+    magic = HeatmapDecoder.MAGIC_NUMBER
+    pack = HeatmapDecoder.HEAT_ENTRY_LE.pack
+    ms = 1723420800000
+    out = []
+    for i in range(records):
+        if i % 1000 == 0:
+            out.append(
+                pack(magic, _signed32(ms >> 32), _signed32(ms & 0xFFFFFFFF), 0, 0)
+            )
+            ms += 2000
+        else:
+            out.append(
+                pack(
+                    rng.randrange(1 << 24),
+                    rng.randrange(-90_000_000, 90_000_000),
+                    rng.randrange(-180_000_000, 180_000_000),
+                    rng.randrange(1600),
+                    rng.randrange(6000),
+                )
+            )
+    return b"".join(out)
+
+
+def consume(entries: Iterable[object]) -> int:
+    count = 0
+    for _ in entries:
+        count += 1
+    return count
+
+
+def consume_batches(batches: Iterable[list[object]]) -> int:
+    # Visit every entry, as a consumer would, so batches are not favoured
+    count = 0
+    for batch in batches:
+        for _ in batch:
+            count += 1
+    return count
+
+
+def compare(
+    name: str,
+    entries: Callable[[], Iterable[object]],
+    batches: Callable[[], Iterable[list[object]]],
+    repeat: int,
+) -> None:
+    """Time single entries and batches in alternating runs, keeping the best.
+
+    Alternating keeps both sides under the same load, so the ratio holds
+    even when the machine's speed drifts between runs.
+    """
+    best = [float("inf"), float("inf")]
+    counts = [0, 0]
+    runs = (lambda: consume(entries()), lambda: consume_batches(batches()))
+    for _ in range(repeat):
+        for side, run in enumerate(runs):
+            start = time.perf_counter()
+            counts[side] = run()
+            best[side] = min(best[side], time.perf_counter() - start)
+    single, batched = (
+        count / seconds / 1e6 for count, seconds in zip(counts, best, strict=True)
+    )
+    print(
+        f"{name:<32} {single:6.2f} -> {batched:6.2f} M entries/s"
+        f" ({batched / single:.2f}x)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    batch_size = args.batch_size
+
+    decoder = HeatmapDecoder()
+    data = synthetic_heatmap(args.records)
+    # Repeat the bundled trace's points to get a long trace
+    document = json.loads(TRACE_RESOURCE.read_bytes())
+    document["trace"] *= 200
+    trace = json.dumps(document).encode()
+    with tempfile.TemporaryDirectory() as tmp:
+        heatmap_file = Path(tmp) / "00.bin.ttf"
+        heatmap_file.write_bytes(gzip.compress(data, compresslevel=1))
+        trace_file = Path(tmp) / "trace_full_ac134a.json"
+        trace_file.write_bytes(gzip.compress(trace, compresslevel=1))
+        cache = DecodeCache(Path(tmp) / "cache")
+
+        print(f"single entries -> batches of {batch_size}")
+        compare(
+            "decode_from_bytes",
+            lambda: decoder.decode_from_bytes(data),
+            lambda: decoder.decode_from_bytes(data, batch_size=batch_size),
+            args.repeat,
+        )
+        compare(
+            "decode_from_file",
+            lambda: decoder.decode_from_file(heatmap_file),
+            lambda: decoder.decode_from_file(heatmap_file, batch_size=batch_size),
+            args.repeat,
+        )
+        compare(
+            "decode_from_file(cache)",
+            lambda: decoder.decode_from_file(heatmap_file, cache),
+            lambda: decoder.decode_from_file(
+                heatmap_file, cache, batch_size=batch_size
+            ),
+            args.repeat,
+        )
+        compare(
+            "process_traces_from_json_bytes",
+            lambda: process_traces_from_json_bytes(trace),
+            lambda: process_traces_from_json_bytes(trace, batch_size=batch_size),
+            args.repeat,
+        )
+        compare(
+            "process_traces_from_file(cache)",
+            lambda: process_traces_from_file(trace_file, cache=cache),
+            lambda: process_traces_from_file(
+                trace_file, cache=cache, batch_size=batch_size
+            ),
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
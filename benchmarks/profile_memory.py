@@ -0,0 +1,286 @@
+"""Profile the memory use and import time of the public decoding APIs.
+
+For each API, the peak memory traced by ``tracemalloc`` while decoding
+synthetic data is reported per million records, next to the bytes retained
+per ``HeatEntry``/``TraceEntry`` and the time ``import pyreadsb`` adds to
+interpreter startup. Results are printed (or written) as JSON; with
+``--check``, the run fails when a metric exceeds its threshold. The
+thresholds of streaming APIs are absolute peaks, so they assume the default
+record counts.
+
+Run with ``uv run python benchmarks/profile_memory.py --check
+benchmarks/profile_thresholds.json``.
+"""
+
+import argparse
+import gc
+import gzip
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from bench_batching import TRACE_RESOURCE, consume, consume_batches, synthetic_heatmap
+
+import pyreadsb
+from pyreadsb import (
+    CoverageStats,
+    HeatmapDecoder,
+    HeatmapEncoder,
+    build_trajectories,
+    decode_heatmap_files,
+    process_traces_from_file,
+    trace_columns_from_file,
+    trace_entries_from_columns,
+)
+
+BATCH_SIZE = 4096
+
+
+def synthetic_trace(records: int) -> bytes:
+    """Repeat the points of the bundled trace up to ``records`` points."""
+    document = json.loads(TRACE_RESOURCE.read_bytes())
+    points = document["trace"]
+    document["trace"] = (points * (records // len(points) + 1))[:records]
+    return json.dumps(document).encode()
+
+
+def traced(run: Callable[[], int]) -> dict[str, float]:
+    """Run ``run`` under tracemalloc; return its records, time and peak memory."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        records = run()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "records": records,
+        "seconds": round(seconds, 4),
+        "peak_bytes": peak,
+        "peak_bytes_per_million_records": round(peak * 1e6 / max(records, 1)),
+    }
+
+
+def retained_bytes(build: Callable[[], list[Any]]) -> float:
+    """Return the traced bytes per item still held by the list ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        items = build()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return round(retained / len(items), 1)
+
+
+def collect(entries: Iterable[Any]) -> int:
+    """Hold every entry at once, as callers that build a list do."""
+    return len(list(entries))
+
+
+def api_scenarios(
+    heatmap_file: Path, heatmap_data: bytes, trace_file: Path
+) -> dict[str, Callable[[], int]]:
+    decoder = HeatmapDecoder()
+
+    def heatmap_stats() -> int:
+        columns = decoder.decode_columns_from_file(heatmap_file)
+        CoverageStats(reference=(50.0, 8.0)).update_from_columns(columns)
+        return len(columns)
+
+    def heatmap_trajectories() -> int:
+        columns = decoder.decode_columns_from_file(heatmap_file)
+        build_trajectories(columns)
+        return len(columns)
+
+    def heatmap_encode() -> int:
+        columns = decoder.decode_columns_from_file(heatmap_file)
+        with HeatmapEncoder.open(heatmap_file.with_name("copy.bin")) as encoder:
+            encoder.write_columns(columns)
+        return encoder.records
+
+    def heatmap_bulk() -> int:
+        return sum(
+            len(entries) for _, entries in decode_heatmap_files([heatmap_file] * 2)
+        )
+
+    def trace_entries() -> int:
+        return consume(trace_entries_from_columns(trace_columns_from_file(trace_file)))
+
+    return {
+        "HeatmapDecoder.decode_from_bytes": lambda: consume(
+            decoder.decode_from_bytes(heatmap_data)
+        ),
+        "HeatmapDecoder.decode_from_file": lambda: consume(
+            decoder.decode_from_file(heatmap_file)
+        ),
+        "HeatmapDecoder.decode_from_file[batch_size]": lambda: consume_batches(
+            decoder.decode_from_file(heatmap_file, batch_size=BATCH_SIZE)
+        ),
+        "HeatmapDecoder.decode_from_file[list]": lambda: collect(
+            decoder.decode_from_file(heatmap_file)
+        ),
+        "HeatmapDecoder.decode_columns_from_file": lambda: len(
+            decoder.decode_columns_from_file(heatmap_file)
+        ),
+        "decode_heatmap_files": heatmap_bulk,
+        "CoverageStats.update_from_columns": heatmap_stats,
+        "build_trajectories": heatmap_trajectories,
+        "HeatmapEncoder.write_columns": heatmap_encode,
+        "process_traces_from_file": lambda: consume(
+            process_traces_from_file(trace_file)
+        ),
+        "process_traces_from_file[batch_size]": lambda: consume_batches(
+            process_traces_from_file(trace_file, batch_size=BATCH_SIZE)
+        ),
+        "process_traces_from_file[list]": lambda: collect(
+            process_traces_from_file(trace_file)
+        ),
+        "trace_columns_from_file": lambda: len(trace_columns_from_file(trace_file)),
+        "trace_entries_from_columns": trace_entries,
+    }
+
+
+def entry_sizes(heatmap_data: bytes, trace_file: Path) -> dict[str, dict[str, float]]:
+    """Return the shallow and retained bytes of a single decoded entry."""
+    decoder = HeatmapDecoder()
+    sample = heatmap_data[: 100_000 * decoder.HEAT_ENTRY_SIZE]
+
+    def heat_entries() -> list[Any]:
+        return [
+            entry
+            for entry in decoder.decode_from_bytes(sample)
+            if isinstance(entry, HeatmapDecoder.HeatEntry)
+        ]
+
+    def trace_entries() -> list[Any]:
+        return list(process_traces_from_file(trace_file))
+
+    return {
+        "HeatEntry": {
+            "shallow_bytes": sys.getsizeof(heat_entries()[0]),
+            "retained_bytes": retained_bytes(heat_entries),
+        },
+        "TraceEntry": {
+            "shallow_bytes": sys.getsizeof(trace_entries()[0]),
+            "retained_bytes": retained_bytes(trace_entries),
+        },
+    }
+
+
+def import_time(repeat: int) -> dict[str, float]:
+    """Return the median time ``import pyreadsb`` adds to interpreter startup."""
+
+    def run(code: str) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
+
+    interpreter = run("pass")
+    with_import = run("import pyreadsb")
+    modules = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; before = len(sys.modules); import pyreadsb; "
+            "print(len(sys.modules) - before)",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return {
+        "seconds": round(max(with_import - interpreter, 0.0), 4),
+        "interpreter_seconds": round(interpreter, 4),
+        "modules": int(modules),
+    }
+
+
+def lookup(results: dict[str, Any], key: str) -> Any:
+    """Return the value at a dotted ``key``; API names may contain dots."""
+    section, _, rest = key.partition(".")
+    value = results[section]
+    if section == "apis":
+        name, _, metric = rest.rpartition(".")
+        return value[name][metric]
+    for part in rest.split("."):
+        value = value[part]
+    return value
+
+
+def check(results: dict[str, Any], thresholds: dict[str, float]) -> list[str]:
+    """Return a message for each metric above its threshold."""
+    failures = []
+    for key, limit in thresholds.items():
+        try:
+            value = lookup(results, key)
+        except KeyError:
+            failures.append(f"{key}: not measured")
+            continue
+        if value > limit:
+            failures.append(f"{key}: {value} exceeds {limit}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--heatmap-records", type=int, default=200_000)
+    parser.add_argument("--trace-records", type=int, default=50_000)
+    parser.add_argument("--import-repeat", type=int, default=15)
+    parser.add_argument("-o", "--output", type=Path, help="Write JSON here")
+    parser.add_argument(
+        "--check", type=Path, help="JSON file of maximum values by dotted metric"
+    )
+    args = parser.parse_args()
+
+    heatmap_data = synthetic_heatmap(args.heatmap_records)
+    results: dict[str, Any] = {
+        "python": platform.python_version(),
+        "pyreadsb": pyreadsb.__version__,
+        "records": {
+            "heatmap": args.heatmap_records,
+            "trace": args.trace_records,
+        },
+        "import": import_time(args.import_repeat),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        heatmap_file = Path(tmp) / "00.bin.ttf"
+        heatmap_file.write_bytes(gzip.compress(heatmap_data, compresslevel=1))
+        trace_file = Path(tmp) / "trace_full_ac134a.json"
+        trace_file.write_bytes(synthetic_trace(args.trace_records))
+
+        results["entry_sizes"] = entry_sizes(heatmap_data, trace_file)
+        scenarios = api_scenarios(heatmap_file, heatmap_data, trace_file)
+        results["apis"] = {name: traced(run) for name, run in scenarios.items()}
+
+    document = json.dumps(results, indent=2)
+    if args.output is not None:
+        args.output.write_text(document + "\n")
+    else:
+        print(document)
+
+    if args.check is not None:
+        failures = check(results, json.loads(args.check.read_text()))
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
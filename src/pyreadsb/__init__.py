@@ -1,39 +1,189 @@
-"""pyreadsb - Python library for decoding readsb data formats."""
-
-from .compression_utils import detect_compression, open_file
-from .heatmap_decoder import HeatmapDecoder
-from .traces_decoder import (
-    TRACE_FLAG_ALTITUDE_GEOMETRIC,
-    TRACE_FLAG_NEW_LEG,
-    TRACE_FLAG_STALE,
-    TRACE_FLAG_VERTICAL_RATE_GEOMETRIC,
-    TRACE_FLAGS,
-    AircraftRecord,
-    TraceEntry,
-    get_aircraft_record,
-    process_traces_from_file,
-    process_traces_from_json_bytes,
-)
+"""pyreadsb - Python library for decoding readsb data formats.
+
+Public names are imported from their submodules on first access, so that
+``import pyreadsb`` stays cheap for short-lived processes.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .compression_utils import detect_compression, open_file
+    from .decode_cache import DecodeCache
+    from .heatmap_bulk import decode_heatmap_files
+    from .heatmap_decoder import DecodeContext, HeatmapColumns, HeatmapDecoder
+    from .heatmap_encoder import HeatmapEncoder, encode_heatmap_bytes
+    from .heatmap_query import query_heatmap, slot_files, slot_path
+    from .heatmap_shm_cache import (
+        HeatmapCacheManager,
+        HeatmapSlotRegistry,
+        SharedHeatmapCache,
+    )
+    from .heatmap_stats import (
+        CoverageStats,
+        Histogram,
+        HyperLogLog,
+        coverage_stats_from_files,
+    )
+    from .heatmap_tracks import (
+        HeatmapTrajectories,
+        build_trajectories,
+        merge_trajectories,
+        trajectories_from_files,
+    )
+    from .traces_bulk import decode_trace_directory, iter_trace_files
+    from .traces_decoder import (
+        TRACE_FLAG_ALTITUDE_GEOMETRIC,
+        TRACE_FLAG_NEW_LEG,
+        TRACE_FLAG_STALE,
+        TRACE_FLAG_VERTICAL_RATE_GEOMETRIC,
+        TRACE_FLAGS,
+        AircraftRecord,
+        TraceColumns,
+        TraceEntry,
+        TraceInterner,
+        TraceLeg,
+        compute_trace_legs,
+        get_aircraft_record,
+        process_traces_from_file,
+        process_traces_from_json_bytes,
+        trace_columns_from_file,
+        trace_columns_from_json_bytes,
+        trace_entries_from_columns,
+    )
+    from .traces_index import IndexedLeg, TraceIndex
+    from .traces_resample import ResampledTrace, resample_trace
+    from .traces_simplify import SimplifiedTrace, simplify_trace
+
+_EXPORTS: dict[str, str] = {
+    "detect_compression": "compression_utils",
+    "open_file": "compression_utils",
+    "DecodeCache": "decode_cache",
+    "decode_heatmap_files": "heatmap_bulk",
+    "DecodeContext": "heatmap_decoder",
+    "HeatmapColumns": "heatmap_decoder",
+    "HeatmapDecoder": "heatmap_decoder",
+    "HeatmapEncoder": "heatmap_encoder",
+    "encode_heatmap_bytes": "heatmap_encoder",
+    "query_heatmap": "heatmap_query",
+    "slot_files": "heatmap_query",
+    "slot_path": "heatmap_query",
+    "HeatmapCacheManager": "heatmap_shm_cache",
+    "HeatmapSlotRegistry": "heatmap_shm_cache",
+    "SharedHeatmapCache": "heatmap_shm_cache",
+    "CoverageStats": "heatmap_stats",
+    "Histogram": "heatmap_stats",
+    "HyperLogLog": "heatmap_stats",
+    "coverage_stats_from_files": "heatmap_stats",
+    "HeatmapTrajectories": "heatmap_tracks",
+    "build_trajectories": "heatmap_tracks",
+    "merge_trajectories": "heatmap_tracks",
+    "trajectories_from_files": "heatmap_tracks",
+    "decode_trace_directory": "traces_bulk",
+    "iter_trace_files": "traces_bulk",
+    "TRACE_FLAG_ALTITUDE_GEOMETRIC": "traces_decoder",
+    "TRACE_FLAG_NEW_LEG": "traces_decoder",
+    "TRACE_FLAG_STALE": "traces_decoder",
+    "TRACE_FLAG_VERTICAL_RATE_GEOMETRIC": "traces_decoder",
+    "TRACE_FLAGS": "traces_decoder",
+    "AircraftRecord": "traces_decoder",
+    "TraceColumns": "traces_decoder",
+    "TraceEntry": "traces_decoder",
+    "TraceInterner": "traces_decoder",
+    "TraceLeg": "traces_decoder",
+    "compute_trace_legs": "traces_decoder",
+    "get_aircraft_record": "traces_decoder",
+    "process_traces_from_file": "traces_decoder",
+    "process_traces_from_json_bytes": "traces_decoder",
+    "trace_columns_from_file": "traces_decoder",
+    "trace_columns_from_json_bytes": "traces_decoder",
+    "trace_entries_from_columns": "traces_decoder",
+    "IndexedLeg": "traces_index",
+    "TraceIndex": "traces_index",
+    "ResampledTrace": "traces_resample",
+    "resample_trace": "traces_resample",
+    "SimplifiedTrace": "traces_simplify",
+    "simplify_trace": "traces_simplify",
+}
 
 __all__ = [
     # Heatmap decoder
+    "DecodeContext",
+    "HeatmapColumns",
     "HeatmapDecoder",
+    # Heatmap encoder
+    "HeatmapEncoder",
+    "encode_heatmap_bytes",
+    # Bulk heatmap decoding
+    "decode_heatmap_files",
+    # Heatmap archive queries
+    "query_heatmap",
+    "slot_files",
+    "slot_path",
+    # Heatmap coverage statistics
+    "CoverageStats",
+    "Histogram",
+    "HyperLogLog",
+    "coverage_stats_from_files",
+    # Heatmap trajectories
+    "HeatmapTrajectories",
+    "build_trajectories",
+    "merge_trajectories",
+    "trajectories_from_files",
     "convert_to_dataframes",
     "export_to_parquet",
     # Traces decoder
     "AircraftRecord",
+    "TraceColumns",
     "TraceEntry",
+    "TraceInterner",
+    "TraceLeg",
+    "compute_trace_legs",
     "get_aircraft_record",
     "process_traces_from_file",
     "process_traces_from_json_bytes",
+    "trace_columns_from_file",
+    "trace_columns_from_json_bytes",
+    "trace_entries_from_columns",
     "TRACE_FLAG_STALE",
     "TRACE_FLAG_NEW_LEG",
     "TRACE_FLAG_VERTICAL_RATE_GEOMETRIC",
     "TRACE_FLAG_ALTITUDE_GEOMETRIC",
     "TRACE_FLAGS",
+    # Trace resampling
+    "ResampledTrace",
+    "resample_trace",
+    # Trace simplification
+    "SimplifiedTrace",
+    "simplify_trace",
+    # Trace index
+    "IndexedLeg",
+    "TraceIndex",
+    # Bulk trace ingestion
+    "decode_trace_directory",
+    "iter_trace_files",
+    # Decode cache
+    "DecodeCache",
+    # Shared-memory heatmap cache
+    "HeatmapCacheManager",
+    "HeatmapSlotRegistry",
+    "SharedHeatmapCache",
     # Compression utilities
     "detect_compression",
     "open_file",
 ]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -0,0 +1,713 @@
+"""Command-line interface: ``pyreadsb convert``, ``stats`` and ``index``.
+
+Decoder modules and optional dependencies are imported inside the commands,
+so that starting the CLI costs little more than starting Python.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, TextIO
+
+if TYPE_CHECKING:
+    from .heatmap_decoder import HeatmapColumns
+    from .heatmap_stats import CoverageStats
+
+logger = logging.getLogger(__name__)
+
+FORMATS: Final[tuple[str, ...]] = ("parquet", "csv", "ndjson")
+
+HEATMAP_FIELDS: Final[tuple[str, ...]] = (
+    "timestamp",
+    "hex_id",
+    "callsign",
+    "latitude",
+    "longitude",
+    "altitude",
+    "on_ground",
+    "ground_speed",
+)
+TRACE_FIELDS: Final[tuple[str, ...]] = (
+    "timestamp",
+    "hex_id",
+    "latitude",
+    "longitude",
+    "altitude",
+    "on_ground",
+    "ground_speed",
+    "track",
+    "vertical_rate",
+    "flags",
+    "source",
+)
+
+_TRACE_NAME: Final[str] = "trace_full_*.json*"
+_HEATMAP_NAMES: Final[tuple[str, ...]] = ("*.bin.ttf", "*.bin")
+
+
+class UsageError(Exception):
+    """Invalid command-line arguments, reported with the usage and status 2."""
+
+
+@dataclass(slots=True, frozen=True)
+class RecordFilter:
+    """Records to keep, pushed down into decoding where the format allows."""
+
+    bbox: tuple[float, float, float, float] | None = None
+    addresses: frozenset[int] | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+
+
+def _parse_time(value: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(float(value), tz=UTC)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def parse_filters(specs: Sequence[str]) -> RecordFilter:
+    """Parse ``--filter`` values into a :class:`RecordFilter`.
+
+    Accepted forms are ``bbox=MIN_LAT,MIN_LON,MAX_LAT,MAX_LON``,
+    ``hex=ABC123[,DEF456...]``, ``start=TIME`` and ``end=TIME``, where a time
+    is ISO 8601 (UTC unless an offset is given) or POSIX seconds.
+    """
+    bbox: tuple[float, float, float, float] | None = None
+    addresses: set[int] | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+
+    for spec in specs:
+        key, sep, value = spec.partition("=")
+        if not sep or not value:
+            raise ValueError(f"Filter {spec!r} is not of the form key=value")
+        key = key.strip().lower()
+        if key == "bbox":
+            values = [float(v) for v in value.split(",")]
+            if len(values) != 4:
+                raise ValueError("bbox takes MIN_LAT,MIN_LON,MAX_LAT,MAX_LON")
+            bbox = (values[0], values[1], values[2], values[3])
+        elif key == "hex":
+            addresses = (addresses or set()) | {
+                int(h.strip().lstrip("~"), 16) for h in value.split(",")
+            }
+        elif key == "start":
+            start = _parse_time(value)
+        elif key == "end":
+            end = _parse_time(value)
+        else:
+            raise ValueError(f"Unknown filter {key!r}")
+
+    return RecordFilter(
+        bbox=bbox,
+        addresses=None if addresses is None else frozenset(addresses),
+        start=start,
+        end=end,
+    )
+
+
+def _kind(path: Path) -> str | None:
+    if fnmatch(path.name, _TRACE_NAME):
+        return "traces"
+    if any(fnmatch(path.name, pattern) for pattern in _HEATMAP_NAMES):
+        return "heatmap"
+    return None
+
+
+def expand_inputs(paths: Iterable[Path]) -> list[tuple[str, Path]]:
+    """Return ``(kind, file)`` pairs for the given files and directory trees.
+
+    Directories are walked in a stable order for trace (``trace_full_*``) and
+    heatmap (``*.bin.ttf``) files. Explicit files that match neither are
+    treated as heatmap files.
+    """
+    inputs: list[tuple[str, Path]] = []
+    for path in paths:
+        if not path.is_dir():
+            inputs.append((_kind(path) or "heatmap", path))
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+            for name in sorted(filenames):
+                file = Path(dirpath) / name
+                kind = _kind(file)
+                if kind is not None:
+                    inputs.append((kind, file))
+    return inputs
+
+
+def _select_heatmap_rows(
+    columns: "HeatmapColumns", record_filter: RecordFilter
+) -> list[int]:
+    """Return the rows of ``columns`` kept by ``record_filter``."""
+    start, end = record_filter.start, record_filter.end
+    return columns.select_rows(
+        None if start is None else start.timestamp(),
+        None if end is None else end.timestamp(),
+        bbox=record_filter.bbox,
+        addresses=record_filter.addresses,
+    )
+
+
+def _heatmap_rows(path: Path, record_filter: RecordFilter) -> list[tuple[Any, ...]]:
+    from .heatmap_decoder import HeatmapDecoder
+
+    decoder = HeatmapDecoder()
+    columns = decoder.decode_columns_from_file(path)
+    magic = decoder.MAGIC_NUMBER
+    decode = decoder._decode_heat_entry
+    hex_values = columns.hex_values
+    latitudes = columns.latitudes
+    longitudes = columns.longitudes
+    altitudes = columns.altitudes
+    ground_speeds = columns.ground_speeds
+
+    callsigns: dict[str, str | None] = {}
+    timestamp = 0.0
+    rows: list[tuple[Any, ...]] = []
+    for i in _select_heatmap_rows(columns, record_filter):
+        hex_val = hex_values[i]
+        if hex_val == magic:
+            timestamp = columns.separator_timestamp(i)
+            continue
+        entry = decode(
+            hex_val, latitudes[i], longitudes[i], altitudes[i], ground_speeds[i]
+        )
+        if isinstance(entry, HeatmapDecoder.CallsignEntry):
+            callsigns[entry.hex_id] = entry.callsign
+            continue
+        alt = entry.alt
+        rows.append(
+            (
+                timestamp,
+                entry.hex_id,
+                callsigns.get(entry.hex_id),
+                entry.lat,
+                entry.lon,
+                alt if isinstance(alt, int) else None,
+                alt == "ground",
+                entry.ground_speed,
+            )
+        )
+    return rows
+
+
+def _trace_rows(path: Path, record_filter: RecordFilter) -> list[tuple[Any, ...]]:
+    import math
+
+    from .traces_bulk import icao_from_trace_path
+    from .traces_decoder import trace_columns_from_file
+
+    addresses = record_filter.addresses
+    if addresses is not None:
+        # Trace files hold one aircraft: skip the others without decoding them
+        try:
+            address = int(icao_from_trace_path(path).lstrip("~"), 16)
+        except ValueError:
+            return []
+        if address not in addresses:
+            return []
+
+    columns = trace_columns_from_file(
+        path, start=record_filter.start, end=record_filter.end
+    )
+    icao = columns.icao or icao_from_trace_path(path)
+    base = columns.timestamp
+    bbox = record_filter.bbox
+
+    def nullable(value: float) -> float | None:
+        return None if math.isnan(value) else value
+
+    rows: list[tuple[Any, ...]] = []
+    for i in range(len(columns)):
+        lat = columns.latitudes[i]
+        lon = columns.longitudes[i]
+        if bbox is not None and not (
+            bbox[0] <= lat <= bbox[2] and bbox[1] <= lon <= bbox[3]
+        ):
+            continue
+        altitude = columns.altitudes[i]
+        rows.append(
+            (
+                base + columns.offsets[i],
+                icao,
+                lat,
+                lon,
+                None if altitude == -1 or math.isnan(altitude) else int(altitude),
+                altitude == -1,
+                nullable(columns.ground_speeds[i]),
+                nullable(columns.tracks[i]),
+                nullable(columns.vertical_rates[i]),
+                columns.flags[i],
+                columns.sources[i],
+            )
+        )
+    return rows
+
+
+def _encode(rows: list[tuple[Any, ...]], fields: Sequence[str], fmt: str) -> Any:
+    """Serialise rows in the worker, so that only text or columns cross over."""
+    if fmt == "csv":
+        import csv
+        import io
+
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+    if fmt == "ndjson":
+        import json
+
+        dumps = json.dumps
+        return "".join(
+            dumps(dict(zip(fields, row, strict=True))) + "\n" for row in rows
+        )
+
+    data = {
+        name: list(values)
+        for name, values in zip(fields, zip(*rows, strict=True), strict=False)
+    }
+    if rows:
+        data["timestamp"] = [round(t * 1e6) for t in data["timestamp"]]
+    return data
+
+
+def _convert_file(
+    task: tuple[str, Path, str, RecordFilter],
+) -> tuple[Path, int, Any, str | None]:
+    """Worker entry point: convert one file to encoded output."""
+    from .compression_utils import READ_ERRORS
+
+    kind, path, fmt, record_filter = task
+    try:
+        if kind == "heatmap":
+            rows = _heatmap_rows(path, record_filter)
+            fields = HEATMAP_FIELDS
+        else:
+            rows = _trace_rows(path, record_filter)
+            fields = TRACE_FIELDS
+    except READ_ERRORS as e:
+        return path, 0, None, str(e)
+    return path, len(rows), _encode(rows, fields, fmt), None
+
+
+class _Progress:
+    """Files, records and throughput on stderr, redrawn at most 5 times a second."""
+
+    __slots__ = ("total", "files", "records", "started", "drawn", "live", "stream")
+
+    def __init__(self, total: int, quiet: bool, stream: TextIO = sys.stderr) -> None:
+        self.total = total
+        self.files = 0
+        self.records = 0
+        self.started = time.perf_counter()
+        self.drawn = 0.0
+        self.stream: TextIO | None = None if quiet else stream
+        self.live = self.stream is not None and self.stream.isatty()
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.records / elapsed if elapsed > 0 else 0.0
+
+    def update(self, records: int) -> None:
+        self.files += 1
+        self.records += records
+        now = time.perf_counter()
+        if self.live and self.stream is not None and now - self.drawn >= 0.2:
+            self.drawn = now
+            self.stream.write(
+                f"\r{self.files}/{self.total} files, {self.records:,} records, "
+                f"{self.rate():,.0f} records/s"
+            )
+            self.stream.flush()
+
+    def finish(self, verb: str) -> None:
+        if self.stream is None:
+            return
+        elapsed = time.perf_counter() - self.started
+        if self.live:
+            self.stream.write("\r\033[K")
+        self.stream.write(
+            f"{verb} {self.records:,} records from {self.files} files in "
+            f"{elapsed:.2f}s ({self.rate():,.0f} records/s)\n"
+        )
+
+
+def _run[T, R](worker: Callable[[T], R], tasks: Sequence[T], jobs: int) -> Iterator[R]:
+    """Run ``worker`` over ``tasks`` in order, in-process or on ``jobs`` processes.
+
+    At most four tasks per process are submitted ahead of the consumer, so
+    the results of a slow sink do not pile up in memory.
+    """
+    if jobs == 1 or len(tasks) <= 1:
+        yield from map(worker, tasks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from .executor_utils import bounded_map
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for _, result in bounded_map(executor, worker, tasks, max_pending=4 * jobs):
+            yield result
+
+
+class _TextSink:
+    __slots__ = ("stream", "owned")
+
+    def __init__(self, output: str, header: str | None) -> None:
+        self.owned = output != "-"
+        self.stream: TextIO = (
+            open(output, "w", encoding="utf-8", newline="")
+            if self.owned
+            else sys.stdout
+        )
+        if header is not None:
+            self.stream.write(header)
+
+    def write(self, payload: Any) -> None:
+        self.stream.write(payload)
+
+    def close(self) -> None:
+        if self.owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class _ParquetSink:
+    __slots__ = ("pa", "schema", "writer")
+
+    def __init__(self, output: str, kind: str) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise SystemExit(
+                "Parquet output requires pyarrow: pip install 'pyreadsb[parquet]'"
+            ) from e
+
+        common = [
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("hex_id", pa.string()),
+        ]
+        if kind == "heatmap":
+            fields = [
+                *common,
+                ("callsign", pa.string()),
+                ("latitude", pa.float64()),
+                ("longitude", pa.float64()),
+                ("altitude", pa.int32()),
+                ("on_ground", pa.bool_()),
+                ("ground_speed", pa.float64()),
+            ]
+        else:
+            fields = [
+                *common,
+                ("latitude", pa.float64()),
+                ("longitude", pa.float64()),
+                ("altitude", pa.int32()),
+                ("on_ground", pa.bool_()),
+                ("ground_speed", pa.float64()),
+                ("track", pa.float64()),
+                ("vertical_rate", pa.float64()),
+                ("flags", pa.int32()),
+                ("source", pa.string()),
+            ]
+        self.pa = pa
+        self.schema = pa.schema(fields)
+        self.writer = pq.ParquetWriter(output, self.schema)
+
+    def write(self, payload: Any) -> None:
+        if payload:
+            self.writer.write_table(self.pa.table(payload, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def _output_format(args: argparse.Namespace) -> str:
+    if args.format is not None:
+        return str(args.format)
+    suffix = Path(args.output).suffix.lower().lstrip(".")
+    if suffix in ("jsonl", "json"):
+        return "ndjson"
+    if suffix in FORMATS:
+        return suffix
+    raise UsageError(f"Cannot infer the output format of {args.output}; use --format")
+
+
+def _record_filter(args: argparse.Namespace) -> RecordFilter:
+    try:
+        return parse_filters(args.filter)
+    except ValueError as e:
+        raise UsageError(str(e)) from e
+
+
+def _jobs(args: argparse.Namespace) -> int:
+    return int(args.jobs) if args.jobs > 0 else os.cpu_count() or 1
+
+
+def cmd_convert(args: argparse.Namespace) -> int:
+    fmt = _output_format(args)
+    if fmt == "parquet" and args.output == "-":
+        raise UsageError("Parquet output cannot be written to stdout")
+    record_filter = _record_filter(args)
+    inputs = expand_inputs(args.inputs)
+    kinds = {kind for kind, _ in inputs}
+    if len(kinds) > 1:
+        raise UsageError("Convert heatmap and trace files separately")
+    if not inputs:
+        raise UsageError("No heatmap or trace files found")
+    kind = kinds.pop()
+    fields = HEATMAP_FIELDS if kind == "heatmap" else TRACE_FIELDS
+
+    sink: _TextSink | _ParquetSink = (
+        _ParquetSink(args.output, kind)
+        if fmt == "parquet"
+        else _TextSink(args.output, ",".join(fields) + "\n" if fmt == "csv" else None)
+    )
+    progress = _Progress(len(inputs), args.quiet)
+    failures = 0
+    tasks = [(k, path, fmt, record_filter) for k, path in inputs]
+    try:
+        for path, records, payload, error in _run(_convert_file, tasks, _jobs(args)):
+            if error is not None:
+                logger.warning(f"Skipping {path}: {error}")
+                failures += 1
+            else:
+                sink.write(payload)
+            progress.update(records)
+    finally:
+        sink.close()
+    progress.finish("Converted")
+    return 1 if failures else 0
+
+
+def _file_stats(
+    task: tuple[Path, tuple[float, float] | None, RecordFilter],
+) -> "tuple[Path, CoverageStats | None, str | None]":
+    """Worker entry point: coverage statistics of one heatmap file."""
+    from .compression_utils import READ_ERRORS
+    from .heatmap_decoder import HeatmapDecoder
+    from .heatmap_stats import CoverageStats
+
+    path, reference, record_filter = task
+    try:
+        columns = HeatmapDecoder().decode_columns_from_file(path)
+    except READ_ERRORS as e:
+        return path, None, str(e)
+
+    if record_filter != RecordFilter():
+        columns = columns.take(_select_heatmap_rows(columns, record_filter))
+
+    stats = CoverageStats(reference=reference)
+    stats.update_from_columns(columns)
+    return path, stats, None
+
+
+def _bands(edges: Sequence[float], counts: Sequence[int]) -> dict[str, int]:
+    labels = [f"<{edges[0]:g}"]
+    labels += [f"{lo:g}-{hi:g}" for lo, hi in zip(edges, edges[1:], strict=False)]
+    labels.append(f">={edges[-1]:g}")
+    return dict(zip(labels, counts, strict=True))
+
+
+def stats_summary(stats: "CoverageStats", name: str) -> dict[str, Any]:
+    """Return the JSON-serialisable summary printed by ``pyreadsb stats``."""
+
+    def iso(timestamp: float | None) -> str | None:
+        if timestamp is None:
+            return None
+        return datetime.fromtimestamp(timestamp, tz=UTC).isoformat()
+
+    summary: dict[str, Any] = {
+        "source": name,
+        "start": iso(stats.start),
+        "end": iso(stats.end),
+        "positions": stats.positions,
+        "distinct_aircraft": stats.distinct_aircraft,
+        "callsign_records": stats.callsign_records,
+        "distinct_callsigns": stats.distinct_callsigns,
+        "ground_positions": stats.ground_positions,
+        "unknown_altitudes": stats.unknown_altitudes,
+        "altitude_bands_ft": _bands(stats.altitudes.edges, stats.altitudes.counts),
+    }
+    if stats.reference is not None:
+        summary["reference"] = list(stats.reference)
+        summary["max_distance_km"] = round(stats.max_distance_km, 3)
+        summary["distance_bands_km"] = _bands(
+            stats.distances.edges, stats.distances.counts
+        )
+    return summary
+
+
+def cmd_stats(args: argparse.Namespace) -> int:
+    import json
+
+    from .heatmap_stats import CoverageStats
+
+    record_filter = _record_filter(args)
+    reference: tuple[float, float] | None = None
+    if args.reference is not None:
+        try:
+            lat, lon = (float(v) for v in args.reference.split(","))
+        except ValueError as e:
+            raise UsageError(f"--reference takes LAT,LON: {e}") from e
+        reference = (lat, lon)
+
+    inputs = [path for kind, path in expand_inputs(args.inputs) if kind == "heatmap"]
+    if not inputs:
+        raise UsageError("No heatmap files found")
+
+    total = CoverageStats(reference=reference)
+    progress = _Progress(len(inputs), args.quiet)
+    failures = 0
+    tasks = [(path, reference, record_filter) for path in inputs]
+    for path, stats, error in _run(_file_stats, tasks, _jobs(args)):
+        if stats is None:
+            logger.warning(f"Skipping {path}: {error}")
+            failures += 1
+            progress.update(0)
+            continue
+        if args.per_file:
+            print(json.dumps(stats_summary(stats, str(path))))
+        total.merge(stats)
+        progress.update(stats.positions)
+
+    print(json.dumps(stats_summary(total, "total")))
+    progress.finish("Summarised")
+    return 1 if failures else 0
+
+
+def cmd_index(args: argparse.Namespace) -> int:
+    from .traces_index import TraceIndex
+
+    started = time.perf_counter()
+    index = TraceIndex.build(
+        args.traces,
+        cell_degrees=args.cell_degrees,
+        max_gap=args.max_gap,
+        max_workers=_jobs(args),
+    )
+    index.save(args.output)
+    if not args.quiet:
+        sys.stderr.write(
+            f"Indexed {len(index.legs):,} legs of {len(index.paths):,} files in "
+            f"{time.perf_counter() - started:.2f}s\n"
+        )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pyreadsb", description="Convert and summarise readsb data files."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="count", default=0, help="Log more details."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def common(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=1,
+            help="Worker processes (0: one per CPU; default: 1).",
+        )
+        sub.add_argument(
+            "-q", "--quiet", action="store_true", help="Do not report progress."
+        )
+
+    def filters(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument(
+            "-f",
+            "--filter",
+            action="append",
+            default=[],
+            metavar="KEY=VALUE",
+            help=(
+                "Keep matching records: bbox=MIN_LAT,MIN_LON,MAX_LAT,MAX_LON, "
+                "hex=ABC123[,...], start=TIME or end=TIME (ISO 8601 or POSIX "
+                "seconds). May be repeated."
+            ),
+        )
+
+    convert = commands.add_parser(
+        "convert", help="Convert heatmap or trace files to Parquet, CSV or NDJSON."
+    )
+    convert.add_argument("inputs", nargs="+", type=Path, help="Files or directories.")
+    convert.add_argument(
+        "-o", "--output", required=True, help="Output file, or - for stdout."
+    )
+    convert.add_argument(
+        "--format", choices=FORMATS, help="Output format (default: from --output)."
+    )
+    common(convert)
+    filters(convert)
+    convert.set_defaults(handler=cmd_convert)
+
+    stats = commands.add_parser(
+        "stats", help="Print coverage statistics of heatmap files as JSON."
+    )
+    stats.add_argument("inputs", nargs="+", type=Path, help="Files or directories.")
+    stats.add_argument(
+        "--reference",
+        metavar="LAT,LON",
+        help="Receiver position, for distance statistics.",
+    )
+    stats.add_argument(
+        "--per-file",
+        action="store_true",
+        help="Also print the statistics of each file.",
+    )
+    common(stats)
+    filters(stats)
+    stats.set_defaults(handler=cmd_stats)
+
+    index = commands.add_parser("index", help="Build a trace index of a traces tree.")
+    index.add_argument("traces", type=Path, help="A readsb traces/ directory.")
+    index.add_argument("-o", "--output", required=True, type=Path)
+    index.add_argument(
+        "--cell-degrees", type=float, default=1.0, help="Grid cell size in degrees."
+    )
+    index.add_argument(
+        "--max-gap", type=float, help="Also split legs on gaps longer than this (s)."
+    )
+    common(index)
+    index.set_defaults(handler=cmd_index)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING - 10 * min(args.verbose, 2),
+        format="%(levelname)s: %(message)s",
+    )
+    from .compression_utils import READ_ERRORS
+
+    try:
+        return int(args.handler(args))
+    except UsageError as e:
+        parser.error(str(e))
+    except READ_ERRORS as e:
+        logger.error(e)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
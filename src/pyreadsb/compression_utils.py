@@ -1,14 +1,27 @@
 import gzip
+import zlib
 from pathlib import Path
-from typing import BinaryIO, Final, Literal
+from typing import BinaryIO, Final, Literal, cast
 
 GZIP_MAGIC: Final[bytes] = b"\x1f\x8b"  # Gzip file header magic
+ZSTD_MAGIC: Final[bytes] = b"\x28\xb5\x2f\xfd"  # Zstandard frame magic
 
+# Errors raised by reading a missing, truncated or corrupt (compressed) file
+READ_ERRORS: Final[tuple[type[Exception], ...]] = (
+    OSError,
+    ValueError,
+    EOFError,
+    zlib.error,
+)
 
-def detect_compression(file_path: Path) -> Literal["gzip", "none"]:
+
+def detect_compression(file_path: Path) -> Literal["gzip", "zstd", "none"]:
     """Detect file compression type."""
-    if file_path.suffix.lower() == ".gz":
+    suffix = file_path.suffix.lower()
+    if suffix == ".gz":
         return "gzip"
+    if suffix in (".zst", ".zstd"):
+        return "zstd"
 
     # Check magic bytes
     with open(file_path, "rb") as f:
@@ -16,15 +29,42 @@ def detect_compression(file_path: Path) -> Literal["gzip", "none"]:
 
     if magic.startswith(GZIP_MAGIC):
         return "gzip"
+    elif magic == ZSTD_MAGIC:
+        return "zstd"
     else:
         return "none"
 
 
+def open_zstd(
+    file_path: Path, mode: Literal["rb", "wb"] = "rb", level: int | None = None
+) -> BinaryIO:
+    """Open a Zstandard file, with ``compression.zstd`` or the zstandard package."""
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "Zstandard files require Python 3.14 or the zstandard package: "
+                "pip install 'pyreadsb[zstd]'"
+            ) from e
+        compressor = (
+            zstandard.ZstdCompressor(level=level)
+            if level is not None and mode == "wb"
+            else None
+        )
+        return cast(BinaryIO, zstandard.open(file_path, mode, cctx=compressor))
+    return cast(BinaryIO, zstd.open(file_path, mode, level=level))
+
+
 def open_file(file_path: Path) -> BinaryIO | gzip.GzipFile:
     """Open file with appropriate decompression."""
     compression: Final[str] = detect_compression(file_path)
 
     if compression == "gzip":
         return gzip.open(file_path, "rb")
+    elif compression == "zstd":
+        return open_zstd(file_path)
     else:
         return open(file_path, "rb")
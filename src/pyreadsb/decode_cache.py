@@ -0,0 +1,257 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Final
+
+import jiter
+
+from .heatmap_decoder import HeatmapColumns, HeatmapDecoder
+from .traces_decoder import TraceColumns, trace_columns_from_file
+
+# Bump whenever decoded column contents change, to invalidate existing entries
+DECODER_VERSION: Final[int] = 1
+
+_MAGIC: Final[bytes] = b"PRSBCOLS"
+_PREAMBLE: Final[struct.Struct] = struct.Struct("<8sI")
+_ALIGNMENT: Final[int] = 8
+_ENTRY_SUFFIXES: Final[tuple[str, ...]] = (".heatmap", ".trace")
+
+_HEATMAP_ARRAYS: Final[tuple[str, ...]] = (
+    "hex_values",
+    "latitudes",
+    "longitudes",
+    "altitudes",
+    "ground_speeds",
+)
+_TRACE_ARRAYS: Final[tuple[str, ...]] = (
+    "offsets",
+    "latitudes",
+    "longitudes",
+    "altitudes",
+    "ground_speeds",
+    "tracks",
+    "flags",
+    "vertical_rates",
+    "geometric_altitudes",
+    "geometric_vertical_rates",
+    "indicated_airspeeds",
+    "roll_angles",
+)
+
+
+class DecodeCache:
+    """On-disk cache of decoded heatmap and trace columns.
+
+    Entries are keyed by the source file's resolved path, size and
+    modification time, plus :data:`DECODER_VERSION`, so a changed file or
+    decoder never hits a stale entry. Columns are stored as raw native-endian
+    arrays after a small JSON header. A hit maps the file and copies each
+    column into an ``array`` in one bulk copy, so nothing is parsed, but the
+    returned columns are copies rather than views of the file.
+
+    The cache keeps a running estimate of its size, seeded by one directory
+    scan and grown by each write. Only when the estimate exceeds
+    ``max_bytes`` is the directory scanned again and the least recently used
+    entries deleted.
+    """
+
+    __slots__ = ("directory", "max_bytes", "logger", "size", "lock")
+
+    def __init__(self, directory: Path, max_bytes: int = 1 << 30) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.size: int | None = None
+        self.lock = threading.Lock()
+
+    def _entry_path(self, source: Path, kind: str) -> Path:
+        stat = source.stat()
+        key = (
+            f"{kind}\0{source.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}"
+            f"\0{DECODER_VERSION}"
+        )
+        digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+        return self.directory / f"{digest}.{kind}"
+
+    def heatmap_columns(self, heatmap_file: Path) -> HeatmapColumns:
+        """Return the columns of ``heatmap_file``, decoding it on a miss."""
+        entry = self._entry_path(heatmap_file, "heatmap")
+        cached = self._read(entry)
+        if cached is not None:
+            meta, arrays = cached
+            return HeatmapColumns(**arrays, big_endian=meta["big_endian"])
+
+        columns = HeatmapDecoder().decode_columns_from_file(heatmap_file)
+        self._write(
+            entry,
+            {"big_endian": columns.big_endian},
+            {name: getattr(columns, name) for name in _HEATMAP_ARRAYS},
+        )
+        return columns
+
+    def trace_columns(self, trace_file: Path) -> TraceColumns:
+        """Return the columns of ``trace_file``, decoding it on a miss."""
+        entry = self._entry_path(trace_file, "trace")
+        cached = self._read(entry)
+        if cached is not None:
+            meta, arrays = cached
+            return TraceColumns(
+                icao=meta["icao"],
+                timestamp=meta["timestamp"],
+                aircraft=meta["aircraft"],
+                sources=meta["sources"],
+                **arrays,
+            )
+
+        columns = trace_columns_from_file(trace_file)
+        self._write(
+            entry,
+            {
+                "icao": columns.icao,
+                "timestamp": columns.timestamp,
+                "aircraft": columns.aircraft,
+                "sources": columns.sources,
+            },
+            {name: getattr(columns, name) for name in _TRACE_ARRAYS},
+        )
+        return columns
+
+    def _read(self, entry: Path) -> tuple[dict[str, Any], dict[str, Any]] | None:
+        try:
+            with (
+                open(entry, "rb") as f,
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+            ):
+                magic, header_size = _PREAMBLE.unpack_from(mapped)
+                if magic != _MAGIC:
+                    raise ValueError("bad magic")
+                header_start = _PREAMBLE.size
+                header = jiter.from_json(
+                    mapped[header_start : header_start + header_size]
+                )
+                if header["byteorder"] != sys.byteorder:
+                    raise ValueError("foreign byte order")
+
+                view = memoryview(mapped)
+                try:
+                    arrays: dict[str, Any] = {}
+                    for name, typecode, start, size in header["columns"]:
+                        values = array(typecode)
+                        values.frombytes(view[start : start + size])
+                        arrays[name] = values
+                finally:
+                    view.release()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            self.logger.warning(f"Discarding unreadable cache entry {entry}: {e}")
+            entry.unlink(missing_ok=True)
+            return None
+
+        # Refresh the modification time, which drives LRU eviction. The data
+        # is already copied, so an entry evicted meanwhile is still a hit.
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            pass
+        return header["meta"], arrays
+
+    def _write(
+        self, entry: Path, meta: dict[str, Any], arrays: dict[str, array[Any]]
+    ) -> None:
+        layout: list[tuple[str, str, int, int]] = []
+        offset = 0
+        for name, values in arrays.items():
+            size = len(values) * values.itemsize
+            layout.append((name, values.typecode, offset, size))
+            offset += -(-size // _ALIGNMENT) * _ALIGNMENT
+
+        # Offsets in the header are absolute, so they depend on its own size
+        data_start = 0
+        while True:
+            columns = [(n, t, data_start + o, s) for n, t, o, s in layout]
+            header = {"byteorder": sys.byteorder, "meta": meta, "columns": columns}
+            header_bytes = json.dumps(header, separators=(",", ":")).encode()
+            end = _PREAMBLE.size + len(header_bytes)
+            aligned = -(-end // _ALIGNMENT) * _ALIGNMENT
+            if aligned == data_start:
+                break
+            data_start = aligned
+
+        # A unique name per writer: threads of one process may share a cache
+        try:
+            fd, tmp_name = tempfile.mkstemp(
+                dir=self.directory, prefix=f"{entry.name}.", suffix=".tmp"
+            )
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry {entry}: {e}")
+            return
+        tmp = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_PREAMBLE.pack(_MAGIC, len(header_bytes)))
+                f.write(header_bytes)
+                for (_, _, start, _), values in zip(
+                    columns, arrays.values(), strict=True
+                ):
+                    f.write(b"\0" * (start - f.tell()))
+                    f.write(values.tobytes())
+                written = f.tell()
+            os.replace(tmp, entry)
+        except OSError as e:
+            self.logger.warning(f"Could not write cache entry {entry}: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+
+        with self.lock:
+            if self.size is None:
+                self._evict()
+            else:
+                # Overwritten entries are counted twice, which only evicts early
+                self.size += written
+                if self.size > self.max_bytes:
+                    self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its budget.
+
+        Scans the whole directory and resets the running size estimate.
+        """
+        entries: list[tuple[int, int, Path]] = []
+        total = 0
+        for path in self.directory.iterdir():
+            if path.suffix not in _ENTRY_SUFFIXES:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self.size = total
+
+    def clear(self) -> None:
+        """Delete every cache entry."""
+        with self.lock:
+            for path in self.directory.iterdir():
+                if path.suffix in _ENTRY_SUFFIXES:
+                    path.unlink(missing_ok=True)
+            self.size = 0
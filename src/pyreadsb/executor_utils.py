@@ -0,0 +1,53 @@
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+
+
+def bounded_map[T, R](
+    executor: Executor,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    max_pending: int,
+    ordered: bool = True,
+) -> Generator[tuple[T, R]]:
+    """Yield ``(item, fn(item))`` for each item, computed on ``executor``.
+
+    Unlike :meth:`Executor.map`, items are consumed lazily and at most
+    ``max_pending`` of them are submitted but not yet yielded, which bounds
+    the memory held by results the consumer has not reached. With
+    ``ordered=False``, results are yielded as soon as they complete.
+    """
+    if max_pending < 1:
+        raise ValueError("max_pending must be at least 1")
+
+    item_iter = iter(items)
+    pending: deque[tuple[T, Future[R]]] = deque()
+
+    def submit_next() -> bool:
+        for item in item_iter:
+            pending.append((item, executor.submit(fn, item)))
+            return True
+        return False
+
+    while len(pending) < max_pending and submit_next():
+        pass
+
+    try:
+        while pending:
+            if ordered:
+                item, done_future = pending.popleft()
+            else:
+                done, _ = wait(
+                    [future for _, future in pending], return_when=FIRST_COMPLETED
+                )
+                entry = next(entry for entry in pending if entry[1] in done)
+                pending.remove(entry)
+                item, done_future = entry
+
+            submit_next()
+            yield item, done_future.result()
+    finally:
+        # Drop queued work if the consumer stops early
+        for _, future in pending:
+            future.cancel()
@@ -0,0 +1,7 @@
+from typing import Final
+
+# Mean Earth radius (IUGG), shared by all distance computations
+EARTH_RADIUS_M: Final[float] = 6_371_008.8
+
+BoundingBox = tuple[float, float, float, float]
+"""``(min_latitude, min_longitude, max_latitude, max_longitude)`` in degrees."""
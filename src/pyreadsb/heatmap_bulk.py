@@ -0,0 +1,80 @@
+import logging
+import os
+from collections.abc import Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .compression_utils import READ_ERRORS
+from .executor_utils import bounded_map
+from .heatmap_decoder import DecodeContext, HeatmapDecoder
+
+if TYPE_CHECKING:
+    from .decode_cache import DecodeCache
+
+logger = logging.getLogger(__name__)
+
+HeatmapEntry = (
+    HeatmapDecoder.HeatEntry
+    | HeatmapDecoder.CallsignEntry
+    | HeatmapDecoder.TimestampSeparator
+)
+
+
+def _decode_file(
+    decoder: HeatmapDecoder, path: Path, *, cache: "DecodeCache | None"
+) -> list[HeatmapEntry]:
+    """Worker entry point: decode one heatmap file with a private context."""
+    try:
+        return list(decoder.decode_from_file(path, cache, context=DecodeContext()))
+    except READ_ERRORS as e:
+        logger.warning(f"Skipping unreadable heatmap file {path}: {e}")
+        return []
+
+
+def decode_heatmap_files(
+    paths: Iterable[Path],
+    *,
+    max_workers: int | None = None,
+    ordered: bool = True,
+    max_pending_files: int | None = None,
+    decoder: HeatmapDecoder | None = None,
+    cache: "DecodeCache | None" = None,
+) -> Generator[tuple[Path, list[HeatmapEntry]]]:
+    """Decode many heatmap files on a thread pool.
+
+    All threads share one decoder; each call gets its own
+    :class:`DecodeContext`, so no state is shared between them. Threads avoid
+    the pickling cost of a process pool, but the per-record work only runs in
+    parallel on a free-threaded (``3.13t`` or later) interpreter; elsewhere,
+    only decompression and I/O overlap.
+
+    Args:
+        paths: Heatmap files to decode.
+        max_workers: Number of threads (default: ``os.cpu_count()``).
+        ordered: Yield results in input order. When False, files are yielded
+            as soon as they are decoded.
+        max_pending_files: Upper bound on submitted, unconsumed files
+            (default: twice the thread count).
+        decoder: Decoder to share (default: a new :class:`HeatmapDecoder`).
+        cache: Optional decode cache for the files.
+
+    Yields:
+        ``(path, entries)`` per file, entries as
+        :meth:`HeatmapDecoder.decode_from_file` would yield them.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending_files or 2 * workers
+    if max_pending < 1:
+        raise ValueError("max_pending_files must be at least 1")
+
+    decoder = decoder or HeatmapDecoder()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from bounded_map(
+            executor,
+            partial(_decode_file, decoder, cache=cache),
+            paths,
+            max_pending=max_pending,
+            ordered=ordered,
+        )
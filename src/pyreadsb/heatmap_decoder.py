@@ -1,16 +1,59 @@
 import logging
+import math
 import struct
-from collections.abc import Generator
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Container, Generator, Iterable, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     Final,
     Protocol,
+    overload,
     runtime_checkable,
 )
 
 from .compression_utils import open_file
+from .geo_utils import BoundingBox
+
+if TYPE_CHECKING:
+    from .decode_cache import DecodeCache
+
+# Raw int16 altitude codes (in 25 ft units) of readsb's special values
+ALT_GROUND: Final[int] = -123
+ALT_UNKNOWN: Final[int] = -124
+
+
+def signed_altitude(alt: int) -> int:
+    """Return the signed altitude code of a raw field, signed or unsigned."""
+    return alt - 0x10000 if alt >= 0x8000 else alt
+
+
+def decode_altitude(alt: int) -> int | str | None:
+    """Return the altitude of a raw field: feet, ``"ground"`` or None."""
+    if alt >= 0x8000:
+        alt -= 0x10000
+    if alt == ALT_GROUND:
+        return "ground"
+    if alt == ALT_UNKNOWN:
+        return None
+    return alt * 25
+
+
+def callsign_bytes(lon: int, alt: int, gs: int) -> bytes:
+    """Return the 8 callsign bytes a callsign record stores in lon, alt and gs."""
+    return struct.pack("<IHH", lon & 0xFFFFFFFF, alt & 0xFFFF, gs & 0xFFFF)
+
+
+def decode_callsign(lon: int, alt: int, gs: int) -> str | None:
+    """Return the callsign of a callsign record, or None if it is empty."""
+    return (
+        callsign_bytes(lon, alt, gs).rstrip(b"\x00").decode("ascii", errors="ignore")
+        or None
+    )
 
 
 @runtime_checkable
@@ -22,7 +65,140 @@ class FileProtocol(Protocol):
     def seek(self, offset: int, whence: int = 0, /) -> int: ...
 
 
+@dataclass(slots=True)
+class HeatmapColumns:
+    """Raw heatmap records as one array per ``<IiiHH`` field, in file order.
+
+    Values are kept exactly as stored so no information is lost: separators
+    are the rows whose ``hex_values`` equal ``HeatmapDecoder.MAGIC_NUMBER``
+    and callsign rows have bit 30 of ``latitudes`` set. ``big_endian``
+    records the byte order of the source file.
+    """
+
+    hex_values: array[int]
+    latitudes: array[int]
+    longitudes: array[int]
+    altitudes: array[int]
+    ground_speeds: array[int]
+    big_endian: bool = False
+
+    def __len__(self) -> int:
+        return len(self.hex_values)
+
+    def separator_indices(self) -> list[int]:
+        """Return the row indices of the timestamp separators."""
+        magic = HeatmapDecoder.MAGIC_NUMBER
+        return [i for i, hex_val in enumerate(self.hex_values) if hex_val == magic]
+
+    def separator_timestamp(self, index: int) -> float:
+        """Return the POSIX timestamp encoded by the separator at ``index``."""
+        return (self.longitudes[index] & 0xFFFFFFFF) / 1000.0 + (
+            self.latitudes[index] & 0xFFFFFFFF
+        ) * 4294967.296
+
+    def row_timestamps(self) -> array[float]:
+        """Return, for every row, the timestamp of the preceding separator.
+
+        Rows before the first separator get NaN.
+        """
+        timestamps = array("d")
+        previous, current = 0, math.nan
+        for index in self.separator_indices():
+            timestamps.extend(array("d", [current]) * (index - previous))
+            previous, current = index, self.separator_timestamp(index)
+        timestamps.extend(array("d", [current]) * (len(self) - previous))
+        return timestamps
+
+    def select_rows(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        *,
+        bbox: BoundingBox | None = None,
+        addresses: Container[int] | None = None,
+    ) -> list[int]:
+        """Return the rows of the chunks in ``[start, end]`` that match filters.
+
+        Chunks are selected by bisecting their separator timestamps, and the
+        separator of every selected chunk is kept. Positions must lie in
+        ``bbox`` (``min_lat, min_lon, max_lat, max_lon`` in degrees) and have
+        one of ``addresses``; callsign rows are only subject to
+        ``addresses``. Rows before the first separator have no time and are
+        never selected.
+        """
+        separators = self.separator_indices()
+        times = [self.separator_timestamp(i) for i in separators]
+        first = 0 if start is None else bisect_left(times, start)
+        last = len(times) if end is None else bisect_right(times, end, first)
+        separators.append(len(self))
+
+        min_lat = min_lon = max_lat = max_lon = 0
+        if bbox is not None:
+            # Compare raw microdegree integers, as stored in the file
+            min_lat, min_lon, max_lat, max_lon = (round(v * 1e6) for v in bbox)
+        info_bit = 1 << 30
+        hex_values = self.hex_values
+        latitudes = self.latitudes
+        longitudes = self.longitudes
+
+        rows: list[int] = []
+        for chunk in range(first, last):
+            row = separators[chunk]
+            rows.append(row)
+            for i in range(row + 1, separators[chunk + 1]):
+                if addresses is not None and hex_values[i] & 0xFFFFFF not in addresses:
+                    continue
+                lat = latitudes[i]
+                if (
+                    bbox is not None
+                    and not lat & info_bit
+                    and not (
+                        min_lat <= lat <= max_lat
+                        and min_lon <= longitudes[i] <= max_lon
+                    )
+                ):
+                    continue
+                rows.append(i)
+        return rows
+
+    def take(self, rows: Sequence[int]) -> "HeatmapColumns":
+        """Return the records at ``rows`` as a new :class:`HeatmapColumns`."""
+
+        def pick(column: array[int]) -> array[int]:
+            return array(column.typecode, [column[i] for i in rows])
+
+        return HeatmapColumns(
+            hex_values=pick(self.hex_values),
+            latitudes=pick(self.latitudes),
+            longitudes=pick(self.longitudes),
+            altitudes=pick(self.altitudes),
+            ground_speeds=pick(self.ground_speeds),
+            big_endian=self.big_endian,
+        )
+
+
+@dataclass(slots=True)
+class DecodeContext:
+    """Mutable state of a single decoding call.
+
+    Passing a context to the decode methods keeps their state out of the
+    :class:`HeatmapDecoder`, so one decoder can serve concurrent calls from
+    several threads.
+    """
+
+    current_timestamp: datetime | None = None
+
+
 class HeatmapDecoder:
+    """Decoder for readsb heatmap (``globe_history``) files.
+
+    Decoding methods store the last separator timestamp in
+    ``current_timestamp``. Concurrent calls on one instance should each pass
+    their own :class:`DecodeContext`, which receives that state instead; the
+    decoder itself is then never written to and is safe to share between
+    threads, including on free-threaded builds.
+    """
+
     # Constants from globe_index.h/c
     MAGIC_NUMBER: Final[int] = 0x0E7F7C9D  # Magic number for chunk/timestamp separation
 
@@ -151,54 +327,31 @@ class HeatmapDecoder:
     def _decode_heat_entry(
         self, hex_val: int, lat: int, lon: int, alt: int, gs: int
     ) -> HeatEntry | CallsignEntry:
-        """Decode a single heat entry."""
-        # Check if this is an info entry (bit 30 set in latitude)
-        is_info_entry = bool(lat & (1 << 30))
-
-        if is_info_entry:
-            # Combine lon and alt for 8-byte callsign
-            callsign_bytes: bytes = struct.pack("<IH", lon & 0xFFFFFFFF, alt & 0xFFFF)
-            callsign: str = callsign_bytes.rstrip(b"\x00").decode(
-                "ascii", errors="ignore"
-            )
-            addr: int = hex_val & 0xFFFFFF  # Extract address part
+        """Decode the raw fields of a position or callsign record.
+
+        Every decoding path goes through this method, so raw fields are
+        interpreted in one place.
+        """
+        # Info entries (bit 30 set in latitude) hold an 8-byte callsign
+        if lat & (1 << 30):
             return self.CallsignEntry(
-                hex_id=f"{addr:06x}",
-                callsign=callsign if callsign else None,
+                hex_id=f"{hex_val & 0xFFFFFF:06x}",
+                callsign=decode_callsign(lon, alt, gs),
             )
-        else:
-            # Regular position entry
-            # Convert coordinates
-            latitude: Final[float] = lat / 1e6
-            longitude: Final[float] = lon / 1e6
-
-            # Decode altitude
-            altitude: int | str | None
-            if alt == -123:
-                altitude = "ground"
-            elif alt == -124:
-                altitude = None
-            else:
-                altitude = alt * 25  # Altitude in feet
 
-            # Decode ground speed
-            if gs == 65535 or gs == -1:  # 0xFFFF or -1
-                ground_speed = None
-            else:
-                ground_speed = gs / 10.0  # Convert to knots
-
-            addr = hex_val & 0xFFFFFF
-
-            return self.HeatEntry(
-                hex_id=f"{addr:06x}",
-                lat=latitude,
-                lon=longitude,
-                alt=altitude,
-                ground_speed=ground_speed,
-            )
+        return self.HeatEntry(
+            hex_id=f"{hex_val & 0xFFFFFF:06x}",
+            lat=lat / 1e6,
+            lon=lon / 1e6,
+            alt=decode_altitude(alt),
+            ground_speed=None if gs == 0xFFFF or gs == -1 else gs / 10.0,
+        )
 
     def _decode_entry(
-        self, entry_struct: struct.Struct, data: bytes
+        self,
+        entry_struct: struct.Struct,
+        data: bytes,
+        context: DecodeContext | None = None,
     ) -> HeatEntry | CallsignEntry | TimestampSeparator:
         """
         Decode a single entry from binary data into the appropriate entry type.
@@ -211,6 +364,7 @@ class HeatmapDecoder:
             entry_struct: The struct object used for unpacking binary data.
             data: Raw binary data to decode, must be at least HEAT_ENTRY_SIZE bytes.
                 Only the first HEAT_ENTRY_SIZE bytes will be processed.
+            context: Receives the separator timestamp instead of the decoder.
 
         Returns:
             HeatEntry or CallsignEntry for regular aircraft data, or
@@ -220,33 +374,121 @@ class HeatmapDecoder:
             ValueError: If data is insufficient for decoding.
 
         Note:
-            Updates self.current_timestamp when a timestamp separator is encountered.
+            Updates current_timestamp (of ``context`` if given, else of the
+            decoder) when a timestamp separator is encountered.
         """
         if not data or len(data) < self.HEAT_ENTRY_SIZE:
             raise ValueError("Insufficient data for decoding.")
 
-        hex_val, lat, lon, alt, gs = entry_struct.unpack(data[: self.HEAT_ENTRY_SIZE])
+        return self._decode_record(
+            self if context is None else context,
+            entry_struct,
+            *entry_struct.unpack(data[: self.HEAT_ENTRY_SIZE]),
+        )
+
+    def _decode_separator(
+        self,
+        state: "HeatmapDecoder | DecodeContext",
+        entry_struct: struct.Struct,
+        lat: int,
+        lon: int,
+        alt: int,
+        gs: int,
+    ) -> TimestampSeparator:
+        """Decode a separator record and make its timestamp the current one."""
+        timestamp = self._decode_timestamp(lat, lon)
+        state.current_timestamp = timestamp
+        return self.TimestampSeparator(
+            timestamp=timestamp,
+            raw_data=entry_struct.pack(self.MAGIC_NUMBER, lat, lon, alt, gs),
+        )
+
+    def _decode_record(
+        self,
+        state: "HeatmapDecoder | DecodeContext",
+        entry_struct: struct.Struct,
+        hex_val: int,
+        lat: int,
+        lon: int,
+        alt: int,
+        gs: int,
+    ) -> HeatEntry | CallsignEntry | TimestampSeparator:
+        """Decode the raw fields of any record, separators included."""
         if hex_val == self.MAGIC_NUMBER:
-            # Timestamp separator
-            timestamp: datetime = self._decode_timestamp(lat, lon)
-            self.current_timestamp = timestamp
-
-            separator = self.TimestampSeparator(
-                timestamp=timestamp,
-                raw_data=data,
-            )
-            return separator
-        else:
-            # Heat entry or callsign entry
-            entry: HeatmapDecoder.HeatEntry | HeatmapDecoder.CallsignEntry = (
-                self._decode_heat_entry(hex_val, lat, lon, alt, gs)
+            return self._decode_separator(state, entry_struct, lat, lon, alt, gs)
+        return self._decode_heat_entry(hex_val, lat, lon, alt, gs)
+
+    def _decode_batch(
+        self,
+        records: Iterable[tuple[int, int, int, int, int]],
+        entry_struct: struct.Struct,
+        state: "HeatmapDecoder | DecodeContext",
+    ) -> list[HeatEntry | CallsignEntry | TimestampSeparator]:
+        """Decode the unsigned raw fields of ``records`` into a single list.
+
+        The list is built in one comprehension. Plain positions, with a
+        non-negative altitude and a known ground speed, are built inline;
+        every other record goes through :meth:`_decode_record`. Skipping the
+        per-record calls is what makes batches faster than single entries.
+        """
+        heat_entry = self.HeatEntry
+        decode = self._decode_record
+        magic = self.MAGIC_NUMBER
+        info_bit = 1 << 30
+        return [
+            heat_entry(
+                f"{hex_val & 0xFFFFFF:06x}", lat / 1e6, lon / 1e6, alt * 25, gs / 10.0
             )
-            return entry
+            if alt < 0x8000 and gs != 0xFFFF and hex_val != magic and not lat & info_bit
+            else decode(state, entry_struct, hex_val, lat, lon, alt, gs)
+            for hex_val, lat, lon, alt, gs in records
+        ]
+
+    def _block_size(self, batch_size: int) -> int:
+        """Return the size in bytes of a block of ``batch_size`` records."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        return batch_size * self.HEAT_ENTRY_SIZE
+
+    @overload
+    def decode_from_bytes(
+        self,
+        data: bytes,
+        *,
+        batch_size: None = None,
+        context: DecodeContext | None = None,
+    ) -> Generator[HeatEntry | CallsignEntry | TimestampSeparator, None, None]: ...
+
+    @overload
+    def decode_from_bytes(
+        self, data: bytes, *, batch_size: int, context: DecodeContext | None = None
+    ) -> Generator[
+        list[HeatEntry | CallsignEntry | TimestampSeparator], None, None
+    ]: ...
 
     def decode_from_bytes(
-        self, data: bytes
-    ) -> Generator[HeatEntry | CallsignEntry | TimestampSeparator, None, None]:
-        """Decode entries from a bytes object."""
+        self,
+        data: bytes,
+        *,
+        batch_size: int | None = None,
+        context: DecodeContext | None = None,
+    ) -> Generator[
+        HeatEntry
+        | CallsignEntry
+        | TimestampSeparator
+        | list[HeatEntry | CallsignEntry | TimestampSeparator],
+        None,
+        None,
+    ]:
+        """Decode entries from a bytes object.
+
+        With ``batch_size``, the same entries are grouped into lists of up to
+        ``batch_size`` entries; a few hundred is fastest, as larger lists give
+        the garbage collector more live entries to scan. With a ``context``,
+        the decoder's own state is left untouched.
+        """
+        block_size = None if batch_size is None else self._block_size(batch_size)
+        state: HeatmapDecoder | DecodeContext = self if context is None else context
         data_len = len(data)
         if data_len < self.HEAT_ENTRY_SIZE:
             if data:
@@ -254,64 +496,163 @@ class HeatmapDecoder:
             return
 
         entry_struct: Final[struct.Struct] = self._detect_endianness(data)
+
         unpack_from = entry_struct.unpack_from  # Cache method lookup
+        decode = self._decode_heat_entry
         entry_size = self.HEAT_ENTRY_SIZE
         magic = self.MAGIC_NUMBER
 
         # Use memoryview to avoid copying
         mv = memoryview(data)
-        max_pos = data_len - entry_size + 1
-
-        for pos in range(0, max_pos, entry_size):
-            hex_val, lat, lon, alt, gs = unpack_from(data, pos)
 
-            if hex_val == magic:
-                # Timestamp separator
-                timestamp_float = (lon & 0xFFFFFFFF) / 1000.0 + (
-                    lat & 0xFFFFFFFF
-                ) * 4294967.296
-                timestamp = datetime.fromtimestamp(timestamp_float, tz=UTC)
-                self.current_timestamp = timestamp
-                yield self.TimestampSeparator(
-                    timestamp=timestamp,
-                    raw_data=bytes(mv[pos : pos + entry_size]),
-                )
-            elif lat & (1 << 30):  # Info/callsign entry
-                callsign_bytes = struct.pack("<IH", lon & 0xFFFFFFFF, alt & 0xFFFF)
-                callsign = callsign_bytes.rstrip(b"\x00").decode(
-                    "ascii", errors="ignore"
-                )
-                yield self.CallsignEntry(
-                    hex_id=f"{hex_val & 0xFFFFFF:06x}",
-                    callsign=callsign if callsign else None,
+        if block_size is not None:
+            usable = data_len - data_len % entry_size
+            for pos in range(0, usable, block_size):
+                block = mv[pos : min(pos + block_size, usable)]
+                yield self._decode_batch(
+                    entry_struct.iter_unpack(block), entry_struct, state
                 )
-            else:
-                # Regular position entry
-                altitude: int | str | None
-                if alt == -123:
-                    altitude = "ground"
-                elif alt == -124:
-                    altitude = None
+        else:
+            for pos in range(0, data_len - entry_size + 1, entry_size):
+                hex_val, lat, lon, alt, gs = unpack_from(data, pos)
+                if hex_val == magic:
+                    yield self._decode_separator(state, entry_struct, lat, lon, alt, gs)
                 else:
-                    altitude = alt * 25
-
-                yield self.HeatEntry(
-                    hex_id=f"{hex_val & 0xFFFFFF:06x}",
-                    lat=lat / 1e6,
-                    lon=lon / 1e6,
-                    alt=altitude,
-                    ground_speed=None if gs == 65535 else gs / 10.0,
-                )
+                    yield decode(hex_val, lat, lon, alt, gs)
 
         # Check for trailing incomplete data
         remaining = data_len % entry_size
         if remaining:
             self.logger.warning(f"Incomplete entry at end: {remaining} bytes")
 
-    def decode_from_file(
-        self, file_path: Path
+    def decode_columns_from_bytes(self, data: bytes) -> HeatmapColumns:
+        """Decode a whole heatmap buffer into :class:`HeatmapColumns`.
+
+        Each field is extracted with a strided array slice, so the cost per
+        record stays in C.
+        """
+        usable = len(data) - len(data) % self.HEAT_ENTRY_SIZE
+        if usable != len(data):
+            self.logger.warning(f"Incomplete entry at end: {len(data) - usable} bytes")
+
+        entry_struct = self._detect_endianness(data) if usable else self.HEAT_ENTRY_LE
+        big_endian = entry_struct is self.HEAT_ENTRY_BE
+        swap = big_endian != (sys.byteorder == "big")
+
+        def fields(typecode: str) -> array[int]:
+            values = array(typecode)
+            values.frombytes(data[:usable])
+            if swap:
+                values.byteswap()
+            return values
+
+        words = fields("I")
+        signed_words = fields("i")
+        halves = fields("H")
+        return HeatmapColumns(
+            hex_values=words[0::4],
+            latitudes=signed_words[1::4],
+            longitudes=signed_words[2::4],
+            altitudes=halves[6::8],
+            ground_speeds=halves[7::8],
+            big_endian=big_endian,
+        )
+
+    def decode_columns_from_file(self, file_path: Path) -> HeatmapColumns:
+        """Decode a (possibly gzipped) heatmap file into :class:`HeatmapColumns`."""
+        with open_file(file_path) as f:
+            return self.decode_columns_from_bytes(f.read())
+
+    def entries_from_columns(
+        self, columns: HeatmapColumns, *, context: DecodeContext | None = None
     ) -> Generator[HeatEntry | CallsignEntry | TimestampSeparator, None, None]:
-        """Memory-efficient decoder that yields entries one by one."""
+        """Yield the entries :meth:`decode_from_bytes` would yield for ``columns``."""
+        state: HeatmapDecoder | DecodeContext = self if context is None else context
+        entry_struct = self.HEAT_ENTRY_BE if columns.big_endian else self.HEAT_ENTRY_LE
+        decode = self._decode_heat_entry
+        magic = self.MAGIC_NUMBER
+
+        for hex_val, lat, lon, alt, gs in zip(
+            columns.hex_values,
+            columns.latitudes,
+            columns.longitudes,
+            columns.altitudes,
+            columns.ground_speeds,
+            strict=True,
+        ):
+            if hex_val == magic:
+                yield self._decode_separator(state, entry_struct, lat, lon, alt, gs)
+            else:
+                yield decode(hex_val, lat, lon, alt, gs)
+
+    @overload
+    def decode_from_file(
+        self,
+        file_path: Path,
+        cache: "DecodeCache | None" = None,
+        *,
+        batch_size: None = None,
+        context: DecodeContext | None = None,
+    ) -> Generator[HeatEntry | CallsignEntry | TimestampSeparator, None, None]: ...
+
+    @overload
+    def decode_from_file(
+        self,
+        file_path: Path,
+        cache: "DecodeCache | None" = None,
+        *,
+        batch_size: int,
+        context: DecodeContext | None = None,
+    ) -> Generator[
+        list[HeatEntry | CallsignEntry | TimestampSeparator], None, None
+    ]: ...
+
+    def decode_from_file(
+        self,
+        file_path: Path,
+        cache: "DecodeCache | None" = None,
+        *,
+        batch_size: int | None = None,
+        context: DecodeContext | None = None,
+    ) -> Generator[
+        HeatEntry
+        | CallsignEntry
+        | TimestampSeparator
+        | list[HeatEntry | CallsignEntry | TimestampSeparator],
+        None,
+        None,
+    ]:
+        """Memory-efficient decoder that yields entries one by one.
+
+        With a ``cache``, the file is decoded to columns once and later calls
+        for the unchanged file are served from the cache. With ``batch_size``,
+        the same entries are grouped into lists of up to ``batch_size`` entries.
+        With a ``context``, the decoder's own state is left untouched.
+        """
+        block_size = None if batch_size is None else self._block_size(batch_size)
+        state: HeatmapDecoder | DecodeContext = self if context is None else context
+
+        if cache is not None:
+            columns = cache.heatmap_columns(file_path)
+            if batch_size is None:
+                yield from self.entries_from_columns(columns, context=context)
+                return
+            columns_struct = (
+                self.HEAT_ENTRY_BE if columns.big_endian else self.HEAT_ENTRY_LE
+            )
+            for start in range(0, len(columns), batch_size):
+                stop = start + batch_size
+                records = zip(
+                    columns.hex_values[start:stop],
+                    columns.latitudes[start:stop],
+                    columns.longitudes[start:stop],
+                    columns.altitudes[start:stop],
+                    columns.ground_speeds[start:stop],
+                    strict=True,
+                )
+                yield self._decode_batch(records, columns_struct, state)
+            return
+
         self.logger.info(f"Decoding file: {file_path}")
 
         # Read in chunks for better I/O performance (64KB = 4096 entries)
@@ -321,9 +662,38 @@ class HeatmapDecoder:
             # Detect endianness from file
             entry_struct: Final[struct.Struct] = self._detect_endianness(f)
             unpack_from = entry_struct.unpack_from  # Cache method lookup
+            decode = self._decode_heat_entry
             entry_size = self.HEAT_ENTRY_SIZE
             magic = self.MAGIC_NUMBER
 
+            if block_size is not None:
+                # Read whole blocks, carrying a partial one over to the next read
+                read_size = max(buffer_size // block_size, 1) * block_size
+                pending = b""
+                while chunk := f.read(read_size):
+                    if pending:
+                        chunk = pending + chunk
+                    full = len(chunk) - len(chunk) % block_size
+                    mv = memoryview(chunk)
+                    for pos in range(0, full, block_size):
+                        block = mv[pos : pos + block_size]
+                        yield self._decode_batch(
+                            entry_struct.iter_unpack(block), entry_struct, state
+                        )
+                    pending = chunk[full:]
+                usable = len(pending) - len(pending) % entry_size
+                if usable:
+                    yield self._decode_batch(
+                        entry_struct.iter_unpack(pending[:usable]), entry_struct, state
+                    )
+                if usable < len(pending):
+                    self.logger.warning(
+                        f"Incomplete entry at end: {len(pending) - usable} bytes"
+                    )
+                else:
+                    self.logger.info("Reached end of file.")
+                return
+
             leftover = b""
             while True:
                 chunk = f.read(buffer_size)
@@ -348,44 +718,11 @@ class HeatmapDecoder:
                     hex_val, lat, lon, alt, gs = unpack_from(chunk, pos)
 
                     if hex_val == magic:
-                        # Timestamp separator
-                        timestamp_float = (lon & 0xFFFFFFFF) / 1000.0 + (
-                            lat & 0xFFFFFFFF
-                        ) * 4294967.296
-                        timestamp = datetime.fromtimestamp(timestamp_float, tz=UTC)
-                        self.current_timestamp = timestamp
-                        yield self.TimestampSeparator(
-                            timestamp=timestamp,
-                            raw_data=chunk[pos : pos + entry_size],
-                        )
-                    elif lat & (1 << 30):  # Info/callsign entry
-                        callsign_bytes = struct.pack(
-                            "<IH", lon & 0xFFFFFFFF, alt & 0xFFFF
-                        )
-                        callsign = callsign_bytes.rstrip(b"\x00").decode(
-                            "ascii", errors="ignore"
-                        )
-                        yield self.CallsignEntry(
-                            hex_id=f"{hex_val & 0xFFFFFF:06x}",
-                            callsign=callsign if callsign else None,
+                        yield self._decode_separator(
+                            state, entry_struct, lat, lon, alt, gs
                         )
                     else:
-                        # Regular position entry
-                        altitude: int | str | None
-                        if alt == -123:
-                            altitude = "ground"
-                        elif alt == -124:
-                            altitude = None
-                        else:
-                            altitude = alt * 25
-
-                        yield self.HeatEntry(
-                            hex_id=f"{hex_val & 0xFFFFFF:06x}",
-                            lat=lat / 1e6,
-                            lon=lon / 1e6,
-                            alt=altitude,
-                            ground_speed=None if gs == 65535 else gs / 10.0,
-                        )
+                        yield decode(hex_val, lat, lon, alt, gs)
 
                 # Save leftover bytes for next iteration
                 processed = (chunk_len // entry_size) * entry_size
@@ -0,0 +1,334 @@
+import gzip
+import io
+import struct
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import batched
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Final, Literal, Self, cast
+
+from .compression_utils import open_zstd
+from .heatmap_decoder import HeatmapColumns, HeatmapDecoder
+
+Compression = Literal["auto", "none", "gzip", "zstd"]
+
+HeatmapEntry = (
+    HeatmapDecoder.HeatEntry
+    | HeatmapDecoder.CallsignEntry
+    | HeatmapDecoder.TimestampSeparator
+)
+
+# readsb stores altitude (in 25 ft units) and ground speed (in 0.1 kt) as
+# int16; these are the raw codes of its special values
+ALT_GROUND: Final[int] = -123 & 0xFFFF
+ALT_UNKNOWN: Final[int] = -124 & 0xFFFF
+GS_UNKNOWN: Final[int] = 0xFFFF
+
+_INFO_BIT: Final[int] = 1 << 30
+_NON_ICAO_BIT: Final[int] = 1 << 24
+_FLUSH_BYTES: Final[int] = 1 << 16
+_COLUMN_BATCH: Final[int] = 1 << 14
+
+
+def _signed32(value: int) -> int:
+    return value - (1 << 32) if value & (1 << 31) else value
+
+
+def _address(hex_id: str | int) -> int:
+    """Return the raw ``hex`` field of an ICAO address like ``"abc123"``.
+
+    A leading ``~`` marks a non-ICAO address, as in readsb's JSON output.
+    Integers are taken as raw field values, flag bits included.
+    """
+    if isinstance(hex_id, int):
+        address = hex_id
+    else:
+        address = int(hex_id.lstrip("~"), 16)
+        if address >> 24:
+            raise ValueError(f"Invalid ICAO address: {hex_id!r}")
+        if hex_id.startswith("~"):
+            address |= _NON_ICAO_BIT
+    if not 0 <= address <= 0xFFFFFFFF or address == HeatmapDecoder.MAGIC_NUMBER:
+        raise ValueError(f"Invalid heatmap address: {hex_id!r}")
+    return address
+
+
+def _compression_of(path: Path) -> Literal["none", "gzip", "zstd"]:
+    suffix = path.suffix.lower()
+    # readsb writes its .bin.ttf slots gzipped
+    if suffix in (".gz", ".ttf"):
+        return "gzip"
+    if suffix in (".zst", ".zstd"):
+        return "zstd"
+    return "none"
+
+
+class HeatmapEncoder:
+    """Writer of readsb heatmap (``globe_history``) files.
+
+    Records use the same 16-byte ``<IiiHH`` layout as readsb, so the output
+    is read back by :class:`HeatmapDecoder` and by readsb's own tools.
+    Entries from the decoder (single or in ``batch_size`` lists) and
+    :class:`HeatmapColumns` batches can be mixed freely; records are written
+    in the order given, so a chunk starts with :meth:`write_separator`.
+
+    Records are buffered and written in blocks of about 64 KiB. The encoder
+    is a context manager; it closes streams it opened and only flushes the
+    others.
+
+    Args:
+        stream: Binary stream to write to.
+        big_endian: Write big-endian records instead of little-endian ones.
+    """
+
+    __slots__ = ("stream", "entry_struct", "records", "buffer", "owned")
+
+    def __init__(self, stream: BinaryIO, *, big_endian: bool = False) -> None:
+        self.stream = stream
+        self.entry_struct = (
+            HeatmapDecoder.HEAT_ENTRY_BE if big_endian else HeatmapDecoder.HEAT_ENTRY_LE
+        )
+        self.records = 0
+        self.buffer = bytearray()
+        self.owned = False
+
+    @classmethod
+    def open(
+        cls,
+        file_path: Path,
+        *,
+        compression: Compression = "auto",
+        level: int | None = None,
+        big_endian: bool = False,
+    ) -> Self:
+        """Create ``file_path`` and return an encoder writing to it.
+
+        With ``"auto"``, ``.gz`` and ``.ttf`` files are gzipped, as readsb
+        does, ``.zst`` files are Zstandard-compressed and other files are
+        left uncompressed. ``level`` is the compression level (default: the
+        compressor's own). Zstandard needs Python 3.14 or the ``zstandard``
+        package.
+        """
+        if compression == "auto":
+            compression = _compression_of(file_path)
+        stream: BinaryIO
+        if compression == "gzip":
+            stream = cast(
+                BinaryIO,
+                gzip.open(file_path, "wb", compresslevel=9 if level is None else level),
+            )
+        elif compression == "zstd":
+            stream = open_zstd(file_path, "wb", level)
+        elif compression == "none":
+            stream = open(file_path, "wb")
+        else:
+            raise ValueError(f"Unknown compression: {compression!r}")
+        encoder = cls(stream, big_endian=big_endian)
+        encoder.owned = True
+        return encoder
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _append(self, record: bytes) -> None:
+        self.buffer += record
+        self.records += 1
+        if len(self.buffer) >= _FLUSH_BYTES:
+            self._drain()
+
+    def _drain(self) -> None:
+        if self.buffer:
+            self.stream.write(self.buffer)
+            self.buffer = bytearray()
+
+    def write_separator(self, timestamp: datetime | float) -> None:
+        """Start a chunk: write a separator for ``timestamp`` (a POSIX time)."""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        ms = round(timestamp * 1000)
+        if not 0 <= ms < 1 << 64:
+            raise ValueError(f"Timestamp out of range: {timestamp}")
+        self._append(
+            self.entry_struct.pack(
+                HeatmapDecoder.MAGIC_NUMBER,
+                _signed32(ms >> 32),
+                _signed32(ms & 0xFFFFFFFF),
+                0,
+                0,
+            )
+        )
+
+    def write_position(
+        self,
+        hex_id: str | int,
+        lat: float,
+        lon: float,
+        alt: int | str | None,
+        ground_speed: float | None,
+    ) -> None:
+        """Write a position, in the units of :class:`HeatmapDecoder.HeatEntry`.
+
+        ``alt`` is in feet, ``"ground"`` or ``None``; it is stored in 25 ft
+        steps. ``ground_speed`` is in knots, stored in 0.1 kt steps.
+        """
+        if alt == "ground":
+            alt_code = ALT_GROUND
+        elif alt is None:
+            alt_code = ALT_UNKNOWN
+        elif isinstance(alt, int):
+            steps = round(alt / 25)
+            if not -0x8000 <= steps <= 0x7FFF:
+                raise ValueError(f"Altitude out of range: {alt}")
+            alt_code = steps & 0xFFFF
+        else:
+            raise ValueError(f"Invalid altitude: {alt!r}")
+
+        if ground_speed is None:
+            gs_code = GS_UNKNOWN
+        else:
+            gs_code = round(ground_speed * 10)
+            if not 0 <= gs_code < GS_UNKNOWN:
+                raise ValueError(f"Ground speed out of range: {ground_speed}")
+
+        lat_code = round(lat * 1e6)
+        lon_code = round(lon * 1e6)
+        if not (-90_000_000 <= lat_code <= 90_000_000):
+            raise ValueError(f"Latitude out of range: {lat}")
+        if not (-180_000_000 <= lon_code <= 180_000_000):
+            raise ValueError(f"Longitude out of range: {lon}")
+        self._append(
+            self.entry_struct.pack(
+                _address(hex_id), lat_code, lon_code, alt_code, gs_code
+            )
+        )
+
+    def write_callsign(self, hex_id: str | int, callsign: str | None) -> None:
+        """Write a callsign record of up to 8 ASCII characters."""
+        raw = (callsign or "").encode("ascii")
+        if len(raw) > 8:
+            raise ValueError(f"Callsign longer than 8 characters: {callsign!r}")
+        lon, alt, gs = struct.unpack("<IHH", raw.ljust(8, b"\x00"))
+        self._append(
+            self.entry_struct.pack(_address(hex_id), _INFO_BIT, _signed32(lon), alt, gs)
+        )
+
+    def write(self, entry: HeatmapEntry) -> None:
+        """Write one entry yielded by :class:`HeatmapDecoder`.
+
+        Separators whose ``raw_data`` is a record in this encoder's byte
+        order are copied unchanged; others are rebuilt from their timestamp.
+        """
+        if isinstance(entry, HeatmapDecoder.HeatEntry):
+            self.write_position(
+                entry.hex_id, entry.lat, entry.lon, entry.alt, entry.ground_speed
+            )
+        elif isinstance(entry, HeatmapDecoder.CallsignEntry):
+            self.write_callsign(entry.hex_id, entry.callsign)
+        else:
+            raw = bytes(entry.raw_data[: HeatmapDecoder.HEAT_ENTRY_SIZE])
+            if (
+                len(raw) == HeatmapDecoder.HEAT_ENTRY_SIZE
+                and self.entry_struct.unpack(raw)[0] == HeatmapDecoder.MAGIC_NUMBER
+            ):
+                self._append(raw)
+            else:
+                self.write_separator(entry.timestamp)
+
+    def write_entries(
+        self, entries: Iterable[HeatmapEntry | list[HeatmapEntry]]
+    ) -> None:
+        """Write a stream of decoder entries, or of ``batch_size`` lists of them."""
+        write = self.write
+        for item in entries:
+            if isinstance(item, list):
+                for entry in item:
+                    write(entry)
+            else:
+                write(item)
+
+    def write_columns(
+        self, columns: HeatmapColumns, rows: Iterable[int] | None = None
+    ) -> None:
+        """Copy raw records from ``columns``, all of them or only ``rows``.
+
+        Values are written exactly as decoded, so no precision or flag bit is
+        lost, whatever the byte order of the source file.
+        """
+        self._drain()
+        pack = self.entry_struct.pack
+        hex_values = columns.hex_values
+        latitudes = columns.latitudes
+        longitudes = columns.longitudes
+        altitudes = columns.altitudes
+        ground_speeds = columns.ground_speeds
+        write = self.stream.write
+        if rows is None:
+            for start in range(0, len(columns), _COLUMN_BATCH):
+                stop = start + _COLUMN_BATCH
+                block = b"".join(
+                    map(
+                        pack,
+                        hex_values[start:stop],
+                        latitudes[start:stop],
+                        longitudes[start:stop],
+                        altitudes[start:stop],
+                        ground_speeds[start:stop],
+                    )
+                )
+                write(block)
+                self.records += len(block) // HeatmapDecoder.HEAT_ENTRY_SIZE
+            return
+
+        for batch in batched(rows, _COLUMN_BATCH):
+            write(
+                b"".join(
+                    [
+                        pack(
+                            hex_values[i],
+                            latitudes[i],
+                            longitudes[i],
+                            altitudes[i],
+                            ground_speeds[i],
+                        )
+                        for i in batch
+                    ]
+                )
+            )
+            self.records += len(batch)
+
+    def flush(self) -> None:
+        """Write buffered records to the stream and flush it."""
+        self._drain()
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Flush the encoder, closing the stream if it opened it."""
+        if self.stream.closed:
+            return
+        self.flush()
+        if self.owned:
+            self.stream.close()
+
+
+def encode_heatmap_bytes(
+    entries: Iterable[HeatmapEntry | list[HeatmapEntry]] | HeatmapColumns,
+    *,
+    big_endian: bool = False,
+) -> bytes:
+    """Return the uncompressed heatmap records of ``entries`` or columns."""
+    buffer = io.BytesIO()
+    with HeatmapEncoder(buffer, big_endian=big_endian) as encoder:
+        if isinstance(entries, HeatmapColumns):
+            encoder.write_columns(entries)
+        else:
+            encoder.write_entries(entries)
+    return buffer.getvalue()
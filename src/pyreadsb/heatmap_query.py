@@ -0,0 +1,134 @@
+import logging
+from collections.abc import Generator, Iterable
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+from .geo_utils import BoundingBox
+from .heatmap_decoder import DecodeContext, HeatmapDecoder
+
+if TYPE_CHECKING:
+    from .decode_cache import DecodeCache
+
+SLOT_DURATION: Final[timedelta] = timedelta(minutes=30)
+
+logger = logging.getLogger(__name__)
+
+
+def slot_path(root: Path, slot_start: datetime) -> Path:
+    """Return the ``YYYY/MM/DD/heatmap/NN.bin.ttf`` file of a half-hour slot."""
+    slot_start = slot_start.astimezone(UTC)
+    slot = (slot_start.hour * 60 + slot_start.minute) // 30
+    return (
+        root
+        / f"{slot_start:%Y}"
+        / f"{slot_start:%m}"
+        / f"{slot_start:%d}"
+        / "heatmap"
+        / f"{slot:02d}.bin.ttf"
+    )
+
+
+def slot_files(
+    root: Path, start: datetime, end: datetime
+) -> list[tuple[datetime, Path]]:
+    """Return the existing slot files overlapping ``[start, end]``, in time order.
+
+    Naive datetimes are taken as local time, as :meth:`datetime.timestamp` does.
+    """
+    start = start.astimezone(UTC)
+    end = end.astimezone(UTC)
+    slot_start = start.replace(
+        minute=start.minute - start.minute % 30, second=0, microsecond=0
+    )
+
+    files: list[tuple[datetime, Path]] = []
+    while slot_start <= end:
+        path = slot_path(root, slot_start)
+        if path.exists():
+            files.append((slot_start, path))
+        else:
+            logger.debug(f"No heatmap slot file at {path}")
+        slot_start += SLOT_DURATION
+    return files
+
+
+def query_heatmap(
+    root: Path,
+    start: datetime,
+    end: datetime,
+    *,
+    bbox: BoundingBox | None = None,
+    hex_ids: Iterable[str] | None = None,
+    decoder: HeatmapDecoder | None = None,
+    cache: "DecodeCache | None" = None,
+    context: DecodeContext | None = None,
+) -> Generator[
+    HeatmapDecoder.HeatEntry
+    | HeatmapDecoder.CallsignEntry
+    | HeatmapDecoder.TimestampSeparator,
+    None,
+    None,
+]:
+    """Stream the heatmap entries of a ``globe_history`` archive in a time range.
+
+    Only the slot files overlapping ``[start, end]`` are opened. Within them,
+    chunks are selected by bisecting their separator timestamps, so boundary
+    slots are trimmed to the chunks whose separator falls in the window.
+    Entries are yielded in time order, as :meth:`HeatmapDecoder.decode_from_file`
+    would, each selected chunk starting with its separator.
+
+    Args:
+        root: The ``globe_history`` directory holding ``YYYY/MM/DD`` folders.
+        start: Start of the window (inclusive).
+        end: End of the window (inclusive).
+        bbox: Only yield positions inside this box.
+        hex_ids: Only yield positions and callsigns of these aircraft.
+        decoder: Decoder to use (default: a new :class:`HeatmapDecoder`).
+        cache: Optional decode cache for the slot files.
+        context: Receives the current separator timestamp instead of
+            ``decoder``, as for :meth:`HeatmapDecoder.decode_from_file`.
+    """
+    decoder = decoder or HeatmapDecoder()
+    state: HeatmapDecoder | DecodeContext = decoder if context is None else context
+    magic = decoder.MAGIC_NUMBER
+    addresses = None if hex_ids is None else {int(h, 16) for h in hex_ids}
+
+    for _, path in slot_files(root, start, end):
+        columns = (
+            cache.heatmap_columns(path)
+            if cache is not None
+            else decoder.decode_columns_from_file(path)
+        )
+        entry_struct = (
+            decoder.HEAT_ENTRY_BE if columns.big_endian else decoder.HEAT_ENTRY_LE
+        )
+        hex_values = columns.hex_values
+        latitudes = columns.latitudes
+        longitudes = columns.longitudes
+        altitudes = columns.altitudes
+        ground_speeds = columns.ground_speeds
+
+        for i in columns.select_rows(
+            start.timestamp(), end.timestamp(), bbox=bbox, addresses=addresses
+        ):
+            hex_val = hex_values[i]
+            if hex_val == magic:
+                timestamp = datetime.fromtimestamp(
+                    columns.separator_timestamp(i), tz=UTC
+                )
+                state.current_timestamp = timestamp
+                yield decoder.TimestampSeparator(
+                    timestamp=timestamp,
+                    raw_data=entry_struct.pack(
+                        magic,
+                        latitudes[i],
+                        longitudes[i],
+                        altitudes[i],
+                        ground_speeds[i],
+                    ),
+                )
+                continue
+            yield decoder._decode_heat_entry(
+                hex_val, latitudes[i], longitudes[i], altitudes[i], ground_speeds[i]
+            )
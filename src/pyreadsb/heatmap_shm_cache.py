@@ -0,0 +1,343 @@
+import logging
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, util
+from multiprocessing.managers import BaseManager
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Final, Literal, Protocol
+
+from .heatmap_decoder import HeatmapColumns, HeatmapDecoder
+
+logger = logging.getLogger(__name__)
+
+_MAGIC: Final[bytes] = b"PRSBSHM1"
+# Magic, row count, big-endian flag of the source file
+_HEADER: Final[struct.Struct] = struct.Struct("<8sQ?7x")
+_ALIGNMENT: Final[int] = 8
+_Format = Literal["I", "i", "H"]
+_COLUMNS: Final[tuple[tuple[str, _Format, int], ...]] = (
+    ("hex_values", "I", 4),
+    ("latitudes", "i", 4),
+    ("longitudes", "i", 4),
+    ("altitudes", "H", 2),
+    ("ground_speeds", "H", 2),
+)
+
+
+def _layout(rows: int) -> tuple[list[tuple[str, _Format, int, int]], int]:
+    """Return ``(name, format, offset, size)`` per column and the segment size."""
+    layout: list[tuple[str, _Format, int, int]] = []
+    offset = _HEADER.size
+    for name, fmt, itemsize in _COLUMNS:
+        size = rows * itemsize
+        layout.append((name, fmt, offset, size))
+        offset += -(-size // _ALIGNMENT) * _ALIGNMENT
+    return layout, offset
+
+
+def _buffer(shm: SharedMemory) -> memoryview:
+    buf = shm.buf
+    if buf is None:
+        raise ValueError(f"Shared memory segment {shm.name} is closed")
+    return buf
+
+
+def _write_segment(columns: HeatmapColumns) -> SharedMemory:
+    layout, total = _layout(len(columns))
+    shm = _open_segment(size=total)
+    try:
+        buf = _buffer(shm)
+        _HEADER.pack_into(buf, 0, _MAGIC, len(columns), columns.big_endian)
+        for name, _, offset, size in layout:
+            buf[offset : offset + size] = memoryview(getattr(columns, name)).cast("B")
+    except BaseException:
+        shm.close()
+        _unlink_segment(shm)
+        raise
+    return shm
+
+
+# Segments are owned by the registry, which unlinks them itself. The resource
+# tracker must not see them: before Python 3.13 it also tracks segments that
+# are merely attached to, and unlinks them when the attaching process exits.
+_TRACKED: Final[bool] = os.name == "posix" and sys.version_info < (3, 13)
+
+
+def _open_segment(name: str | None = None, size: int = 0) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, create=name is None, size=size, track=False)
+    shm = SharedMemory(name, create=name is None, size=size)
+    if _TRACKED:
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+def _unlink_segment(shm: SharedMemory) -> None:
+    if _TRACKED:
+        # unlink() unregisters the segment, which must be registered for that
+        resource_tracker.register(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    shm.unlink()
+
+
+def _columns_view(shm: SharedMemory) -> HeatmapColumns:
+    """Return columns backed directly by the memory of a segment."""
+    buf = _buffer(shm)
+    magic, rows, big_endian = _HEADER.unpack_from(buf)
+    if magic != _MAGIC:
+        raise ValueError(f"Shared memory segment {shm.name} is not a heatmap slot")
+    layout, _ = _layout(rows)
+    views: dict[str, Any] = {
+        name: buf[offset : offset + size].toreadonly().cast(fmt)
+        for name, fmt, offset, size in layout
+    }
+    return HeatmapColumns(**views, big_endian=big_endian)
+
+
+@dataclass(slots=True)
+class _Segment:
+    shm: SharedMemory
+    source_size: int
+    source_mtime_ns: int
+
+
+class HeatmapSlotRegistry:
+    """Owner of the shared memory segments holding decoded heatmap slots.
+
+    Each slot file is decoded once into a segment, keyed by its resolved
+    path. A segment is replaced when its file's size or modification time
+    changes, e.g. when readsb appends to the current slot. When the segments
+    exceed ``max_bytes``, the least recently used ones are unlinked; processes
+    that are still attached keep their mapping until they detach.
+
+    The registry lives in a single process. Other processes reach it through a
+    :class:`HeatmapCacheManager` and read the segments through a
+    :class:`SharedHeatmapCache`. Segments are only unlinked by eviction,
+    :meth:`clear` or the shutdown of the manager's server.
+    """
+
+    __slots__ = (
+        "max_bytes",
+        "segments",
+        "used_bytes",
+        "hits",
+        "misses",
+        "lock",
+        "pending",
+    )
+
+    def __init__(self, max_bytes: int = 1 << 30) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.segments: OrderedDict[str, _Segment] = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.pending: dict[str, threading.Lock] = {}
+
+    def _lookup(self, key: str, stat: os.stat_result) -> str | None:
+        segment = self.segments.get(key)
+        if segment is None:
+            return None
+        if (
+            segment.source_size == stat.st_size
+            and segment.source_mtime_ns == stat.st_mtime_ns
+        ):
+            self.segments.move_to_end(key)
+            self.hits += 1
+            return segment.shm.name
+        logger.debug(f"Heatmap slot {key} changed, dropping its segment")
+        self._drop(key)
+        return None
+
+    def acquire(self, heatmap_file: str) -> str:
+        """Return the name of the segment holding ``heatmap_file``'s columns.
+
+        The file is decoded on a miss. Concurrent misses for the same file
+        decode it once; misses for different files decode in parallel.
+        """
+        key = str(Path(heatmap_file).resolve())
+        with self.lock:
+            name = self._lookup(key, os.stat(key))
+            if name is not None:
+                return name
+            file_lock = self.pending.setdefault(key, threading.Lock())
+
+        with file_lock:
+            stat = os.stat(key)
+            with self.lock:
+                name = self._lookup(key, stat)
+                if name is not None:
+                    return name
+
+            columns = HeatmapDecoder().decode_columns_from_file(Path(key))
+            shm = _write_segment(columns)
+
+            with self.lock:
+                self.misses += 1
+                self.segments[key] = _Segment(shm, stat.st_size, stat.st_mtime_ns)
+                self.used_bytes += shm.size
+                self.pending.pop(key, None)
+                self._evict()
+                return shm.name
+
+    def _drop(self, key: str) -> None:
+        segment = self.segments.pop(key)
+        self.used_bytes -= segment.shm.size
+        segment.shm.close()
+        _unlink_segment(segment.shm)
+
+    def _evict(self) -> None:
+        """Unlink least recently used segments until the budget is met.
+
+        The most recent segment is always kept, even if it alone exceeds it.
+        """
+        while self.used_bytes > self.max_bytes and len(self.segments) > 1:
+            key = next(iter(self.segments))
+            logger.debug(f"Evicting heatmap slot {key}")
+            self._drop(key)
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of entries, bytes in use, hits and misses."""
+        with self.lock:
+            return {
+                "entries": len(self.segments),
+                "bytes": self.used_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        """Unlink every segment."""
+        with self.lock:
+            for key in list(self.segments):
+                self._drop(key)
+
+
+class SlotRegistry(Protocol):
+    """What :class:`SharedHeatmapCache` needs from a registry or its proxy."""
+
+    def acquire(self, heatmap_file: str) -> str: ...
+
+
+class SharedHeatmapCache:
+    """Zero-copy access to heatmap slots decoded into shared memory.
+
+    The returned :class:`HeatmapColumns` hold read-only memoryviews over the
+    shared segments instead of arrays; they index, iterate and report their
+    length like arrays. The cache stays attached to the ``max_attached`` most
+    recently used segments. A segment it detaches from, because it was
+    replaced, fell out of that set or :meth:`close` was called, remains
+    mapped for as long as columns handed out for it are referenced.
+
+    Args:
+        registry: A :class:`HeatmapSlotRegistry`, or a proxy to one from
+            :meth:`HeatmapCacheManager.registry`.
+        max_attached: Number of segments to stay attached to.
+    """
+
+    __slots__ = ("registry", "max_attached", "attached", "names", "retired")
+
+    def __init__(self, registry: SlotRegistry, max_attached: int = 32) -> None:
+        if max_attached < 1:
+            raise ValueError("max_attached must be at least 1")
+        self.registry = registry
+        self.max_attached = max_attached
+        self.attached: OrderedDict[str, tuple[SharedMemory, HeatmapColumns]] = (
+            OrderedDict()
+        )
+        self.names: dict[str, str] = {}
+        self.retired: list[SharedMemory] = []
+
+    def heatmap_columns(self, heatmap_file: Path) -> HeatmapColumns:
+        """Return the columns of ``heatmap_file``, decoding it once per host."""
+        key = str(heatmap_file.resolve())
+        for _ in range(3):
+            name = self.registry.acquire(key)
+            attached = self.attached.get(name)
+            if attached is not None:
+                self.attached.move_to_end(name)
+                return attached[1]
+            try:
+                shm = _open_segment(name)
+            except FileNotFoundError:
+                # Evicted between acquire and attach; ask again
+                continue
+
+            columns = _columns_view(shm)
+            self.attached[name] = (shm, columns)
+            previous = self.names.get(key)
+            self.names[key] = name
+            if previous is not None and previous in self.attached:
+                self._detach(previous)
+            while len(self.attached) > self.max_attached:
+                self._detach(next(iter(self.attached)))
+            self._close_retired()
+            return columns
+        raise RuntimeError(f"Could not attach to the segment of {heatmap_file}")
+
+    def _detach(self, name: str) -> None:
+        shm, _ = self.attached.pop(name)
+        self.retired.append(shm)
+
+    def _close_retired(self) -> None:
+        still_used: list[SharedMemory] = []
+        for shm in self.retired:
+            try:
+                shm.close()
+            except BufferError:
+                # Columns handed out earlier still reference the segment
+                still_used.append(shm)
+        self.retired = still_used
+
+    def close(self) -> None:
+        """Detach from every segment."""
+        for name in list(self.attached):
+            self._detach(name)
+        self.names.clear()
+        self._close_retired()
+
+
+_registry: HeatmapSlotRegistry | None = None
+
+
+def _start_registry(max_bytes: int) -> None:
+    """Manager server initializer: create the registry of this host."""
+    global _registry
+    registry = _registry = HeatmapSlotRegistry(max_bytes)
+    # Unlink the segments when the server shuts down
+    util.Finalize(None, registry.clear, exitpriority=10)
+
+
+def _get_registry() -> HeatmapSlotRegistry:
+    if _registry is None:
+        raise RuntimeError("The heatmap slot registry was not started")
+    return _registry
+
+
+class HeatmapCacheManager(BaseManager):
+    """Manager serving one :class:`HeatmapSlotRegistry` to the processes of a host.
+
+    One process starts the server with :meth:`start_registry`; workers create
+    a manager with the same ``address`` and ``authkey``, call ``connect()``
+    and wrap :meth:`registry` in a :class:`SharedHeatmapCache`.
+    """
+
+    def start_registry(self, max_bytes: int = 1 << 30) -> None:
+        """Start the server process, holding a registry of ``max_bytes``."""
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.start(_start_registry, (max_bytes,))
+
+    if TYPE_CHECKING:
+
+        def registry(self) -> HeatmapSlotRegistry: ...
+
+
+HeatmapCacheManager.register("registry", callable=_get_registry)
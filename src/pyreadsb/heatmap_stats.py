@@ -0,0 +1,295 @@
+import hashlib
+import math
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Final
+
+from .geo_utils import EARTH_RADIUS_M
+from .heatmap_decoder import (
+    HeatmapColumns,
+    HeatmapDecoder,
+    decode_altitude,
+    decode_callsign,
+)
+
+if TYPE_CHECKING:
+    from .decode_cache import DecodeCache
+
+# Altitude band edges in feet; ground positions are counted separately
+ALTITUDE_BANDS_FT: Final[tuple[float, ...]] = (
+    1000.0,
+    5000.0,
+    10000.0,
+    20000.0,
+    30000.0,
+    40000.0,
+)
+# Distance band edges in kilometres from the reference point
+DISTANCE_BANDS_KM: Final[tuple[float, ...]] = tuple(
+    float(km) for km in range(50, 501, 50)
+)
+
+_MASK64: Final[int] = (1 << 64) - 1
+_EARTH_RADIUS_KM: Final[float] = EARTH_RADIUS_M / 1000.0
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finaliser: a stable, well-distributed 64-bit integer hash."""
+    z = (value + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _hash_str(value: str) -> int:
+    digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+@dataclass(slots=True)
+class HyperLogLog:
+    """Mergeable distinct-count sketch using ``2 ** precision`` one-byte registers.
+
+    Hashes are stable across processes, so sketches built by different
+    workers can be merged. The relative standard error is about
+    ``1.04 / sqrt(2 ** precision)`` (1.6% at the default precision).
+    """
+
+    precision: int = 12
+    registers: bytearray = field(default_factory=bytearray)
+
+    def __post_init__(self) -> None:
+        if not 4 <= self.precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        if not self.registers:
+            self.registers = bytearray(1 << self.precision)
+        elif len(self.registers) != 1 << self.precision:
+            raise ValueError("registers do not match precision")
+
+    def add_hash(self, hashed: int) -> None:
+        """Add a 64-bit hash value."""
+        precision = self.precision
+        width = 64 - precision
+        index = hashed >> width
+        rank = width - (hashed & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add_int(self, value: int) -> None:
+        self.add_hash(_mix64(value))
+
+    def add_str(self, value: str) -> None:
+        self.add_hash(_hash_str(value))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold ``other`` into this sketch, as if its values were added here."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> float:
+        """Return the estimated number of distinct values added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        raw = alpha * m * m / math.fsum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return raw
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Counts of values in fixed bins.
+
+    Bin ``0`` holds values below ``edges[0]``, bin ``i`` values in
+    ``[edges[i - 1], edges[i])`` and the last bin values from ``edges[-1]``.
+    """
+
+    edges: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if list(self.edges) != sorted(self.edges):
+            raise ValueError("Histogram edges must be sorted")
+        if not self.counts:
+            self.counts = [0] * (len(self.edges) + 1)
+        elif len(self.counts) != len(self.edges) + 1:
+            raise ValueError("counts do not match edges")
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_right(self.edges, value)] += 1
+
+    def merge(self, other: "Histogram") -> None:
+        if other.edges != self.edges:
+            raise ValueError("Cannot merge histograms with different edges")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts, strict=True)]
+
+    def total(self) -> int:
+        return sum(self.counts)
+
+
+def _distance_km(lat0: float, lon0: float, lat1: float, lon1: float) -> float:
+    """Great-circle (haversine) distance between two positions in degrees."""
+    phi0, phi1 = math.radians(lat0), math.radians(lat1)
+    dphi = phi1 - phi0
+    dlam = math.radians(lon1 - lon0)
+    h = (
+        math.sin(dphi / 2) ** 2
+        + math.cos(phi0) * math.cos(phi1) * math.sin(dlam / 2) ** 2
+    )
+    return 2.0 * _EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+@dataclass(slots=True)
+class CoverageStats:
+    """Streaming receiver coverage statistics over heatmap positions.
+
+    Memory use is fixed by the sketch precision and the histogram edges, not
+    by the amount of data. Statistics of different slots, days or workers
+    combine with :meth:`merge` as long as they share their configuration.
+
+    Distances are only computed when ``reference`` (latitude, longitude) is
+    set. ``start`` and ``end`` are the first and last separator timestamps
+    seen.
+    """
+
+    reference: tuple[float, float] | None = None
+    precision: int = 12
+    altitude_edges: tuple[float, ...] = ALTITUDE_BANDS_FT
+    distance_edges: tuple[float, ...] = DISTANCE_BANDS_KM
+    positions: int = 0
+    ground_positions: int = 0
+    unknown_altitudes: int = 0
+    callsign_records: int = 0
+    max_distance_km: float = 0.0
+    start: float | None = None
+    end: float | None = None
+    aircraft: HyperLogLog = field(init=False)
+    callsigns: HyperLogLog = field(init=False)
+    altitudes: Histogram = field(init=False)
+    distances: Histogram = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.aircraft = HyperLogLog(self.precision)
+        self.callsigns = HyperLogLog(self.precision)
+        self.altitudes = Histogram(self.altitude_edges)
+        self.distances = Histogram(self.distance_edges)
+
+    @property
+    def distinct_aircraft(self) -> int:
+        return round(self.aircraft.estimate())
+
+    @property
+    def distinct_callsigns(self) -> int:
+        return round(self.callsigns.estimate())
+
+    def _add_timestamp(self, timestamp: float) -> None:
+        if self.start is None or timestamp < self.start:
+            self.start = timestamp
+        if self.end is None or timestamp > self.end:
+            self.end = timestamp
+
+    def _add_position(self, lat: float, lon: float, altitude: int | str | None) -> None:
+        self.positions += 1
+        if altitude is None:
+            self.unknown_altitudes += 1
+        elif altitude == "ground":
+            self.ground_positions += 1
+        else:
+            self.altitudes.add(float(altitude))
+        if self.reference is not None:
+            distance = _distance_km(self.reference[0], self.reference[1], lat, lon)
+            self.distances.add(distance)
+            if distance > self.max_distance_km:
+                self.max_distance_km = distance
+
+    def update(
+        self,
+        entries: Iterable[
+            HeatmapDecoder.HeatEntry
+            | HeatmapDecoder.CallsignEntry
+            | HeatmapDecoder.TimestampSeparator
+        ],
+    ) -> None:
+        """Add the output of a :class:`HeatmapDecoder` in a single pass."""
+        for entry in entries:
+            if isinstance(entry, HeatmapDecoder.HeatEntry):
+                self.aircraft.add_int(int(entry.hex_id, 16))
+                self._add_position(entry.lat, entry.lon, entry.alt)
+            elif isinstance(entry, HeatmapDecoder.CallsignEntry):
+                self.callsign_records += 1
+                if entry.callsign:
+                    self.callsigns.add_str(entry.callsign)
+            else:
+                self._add_timestamp(entry.timestamp.timestamp())
+
+    def update_from_columns(self, columns: HeatmapColumns) -> None:
+        """Add decoded heatmap columns, without building entry objects."""
+        magic = HeatmapDecoder.MAGIC_NUMBER
+        info_bit = 1 << 30
+        add_aircraft = self.aircraft.add_int
+        for i, (hex_val, lat, lon, alt, gs) in enumerate(
+            zip(
+                columns.hex_values,
+                columns.latitudes,
+                columns.longitudes,
+                columns.altitudes,
+                columns.ground_speeds,
+                strict=True,
+            )
+        ):
+            if hex_val == magic:
+                self._add_timestamp(columns.separator_timestamp(i))
+            elif lat & info_bit:
+                self.callsign_records += 1
+                callsign = decode_callsign(lon, alt, gs)
+                if callsign:
+                    self.callsigns.add_str(callsign)
+            else:
+                add_aircraft(hex_val & 0xFFFFFF)
+                self._add_position(lat / 1e6, lon / 1e6, decode_altitude(alt))
+
+    def merge(self, other: "CoverageStats") -> None:
+        """Fold the statistics of ``other`` into these."""
+        if other.reference != self.reference:
+            raise ValueError("Cannot merge statistics with different references")
+        self.aircraft.merge(other.aircraft)
+        self.callsigns.merge(other.callsigns)
+        self.altitudes.merge(other.altitudes)
+        self.distances.merge(other.distances)
+        self.positions += other.positions
+        self.ground_positions += other.ground_positions
+        self.unknown_altitudes += other.unknown_altitudes
+        self.callsign_records += other.callsign_records
+        self.max_distance_km = max(self.max_distance_km, other.max_distance_km)
+        for timestamp in (other.start, other.end):
+            if timestamp is not None:
+                self._add_timestamp(timestamp)
+
+
+def coverage_stats_from_files(
+    paths: Iterable[Path],
+    *,
+    reference: tuple[float, float] | None = None,
+    precision: int = 12,
+    decoder: HeatmapDecoder | None = None,
+    cache: "DecodeCache | None" = None,
+) -> CoverageStats:
+    """Compute the combined coverage statistics of several heatmap files.
+
+    Each file is decoded to columns and streamed into the statistics once.
+    """
+    decoder = decoder or HeatmapDecoder()
+    stats = CoverageStats(reference=reference, precision=precision)
+    for path in paths:
+        columns = (
+            cache.heatmap_columns(path)
+            if cache is not None
+            else decoder.decode_columns_from_file(path)
+        )
+        stats.update_from_columns(columns)
+    return stats
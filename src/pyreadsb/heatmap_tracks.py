@@ -0,0 +1,226 @@
+import math
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .heatmap_decoder import (
+    HeatmapColumns,
+    HeatmapDecoder,
+    decode_altitude,
+    decode_callsign,
+)
+
+if TYPE_CHECKING:
+    from .decode_cache import DecodeCache
+
+
+@dataclass(slots=True)
+class HeatmapTrajectories:
+    """Heatmap positions grouped into one contiguous span per aircraft.
+
+    Point columns are shared by all tracks: track ``k`` is made of rows
+    ``offsets[k]:offsets[k + 1]``, sorted by time. Altitudes are in feet with
+    -1 for "ground" and NaN when unknown; ground speeds are in knots with NaN
+    when unknown.
+    """
+
+    addresses: array[int]
+    callsigns: list[str | None]
+    offsets: array[int]
+    timestamps: array[float]
+    latitudes: array[float]
+    longitudes: array[float]
+    altitudes: array[float]
+    ground_speeds: array[float]
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def hex_id(self, track: int) -> str:
+        return f"{self.addresses[track]:06x}"
+
+    def span(self, track: int) -> slice:
+        """Return the slice of the point columns belonging to ``track``."""
+        return slice(self.offsets[track], self.offsets[track + 1])
+
+    def find(self, hex_id: str) -> int | None:
+        """Return the track index of an aircraft, or None if it has no track."""
+        address = int(hex_id, 16)
+        track = bisect_left(self.addresses, address)
+        if track < len(self.addresses) and self.addresses[track] == address:
+            return track
+        return None
+
+
+def _decode_altitude(alt: int) -> float:
+    altitude = decode_altitude(alt)
+    if altitude == "ground":
+        return -1.0
+    if altitude is None:
+        return math.nan
+    return float(altitude)
+
+
+def _group(
+    addresses: array[int],
+    timestamps: array[float],
+    latitudes: array[float],
+    longitudes: array[float],
+    altitudes: array[float],
+    ground_speeds: array[float],
+    callsigns: dict[int, str],
+    order: list[int],
+) -> HeatmapTrajectories:
+    """Gather point columns in ``order`` (grouped by address) into tracks."""
+
+    def gather(column: array[float]) -> array[float]:
+        return array(column.typecode, [column[i] for i in order])
+
+    sorted_addresses = array("I", [addresses[i] for i in order])
+    starts = [
+        i
+        for i, (previous, current) in enumerate(
+            zip(sorted_addresses, sorted_addresses[1:], strict=False), start=1
+        )
+        if previous != current
+    ]
+    bounds = array("q", [0, *starts, len(order)] if order else [0])
+    track_addresses = array("I", [sorted_addresses[i] for i in bounds[:-1]])
+
+    return HeatmapTrajectories(
+        addresses=track_addresses,
+        callsigns=[callsigns.get(address) for address in track_addresses],
+        offsets=bounds,
+        timestamps=gather(timestamps),
+        latitudes=gather(latitudes),
+        longitudes=gather(longitudes),
+        altitudes=gather(altitudes),
+        ground_speeds=gather(ground_speeds),
+    )
+
+
+def build_trajectories(columns: HeatmapColumns) -> HeatmapTrajectories:
+    """Group the positions of a decoded heatmap slot by aircraft.
+
+    Every position is tagged with the timestamp of the separator preceding it,
+    then positions are ordered by 24-bit address with a stable sort, which
+    keeps each aircraft's positions in file (time) order. Rows before the
+    first separator have no timestamp and are skipped.
+    """
+    magic = HeatmapDecoder.MAGIC_NUMBER
+    info_bit = 1 << 30
+    separators = columns.separator_indices()
+    row_timestamps = columns.row_timestamps()
+    first = separators[0] if separators else len(columns)
+
+    callsigns: dict[int, str] = {}
+    rows: list[int] = []
+    for i, (hex_val, lat) in enumerate(
+        zip(columns.hex_values[first:], columns.latitudes[first:], strict=True),
+        start=first,
+    ):
+        if hex_val == magic:
+            continue
+        if lat & info_bit:
+            callsign = decode_callsign(
+                columns.longitudes[i], columns.altitudes[i], columns.ground_speeds[i]
+            )
+            if callsign:
+                callsigns[hex_val & 0xFFFFFF] = callsign
+            continue
+        rows.append(i)
+
+    addresses = array("I", [columns.hex_values[i] & 0xFFFFFF for i in rows])
+    timestamps = array("d", [row_timestamps[i] for i in rows])
+    latitudes = array("d", [columns.latitudes[i] / 1e6 for i in rows])
+    longitudes = array("d", [columns.longitudes[i] / 1e6 for i in rows])
+    altitudes = array("d", [_decode_altitude(columns.altitudes[i]) for i in rows])
+    ground_speeds = array(
+        "d",
+        [
+            math.nan if (gs := columns.ground_speeds[i]) == 65535 else gs / 10.0
+            for i in rows
+        ],
+    )
+
+    order = sorted(range(len(rows)), key=addresses.__getitem__)
+    return _group(
+        addresses,
+        timestamps,
+        latitudes,
+        longitudes,
+        altitudes,
+        ground_speeds,
+        callsigns,
+        order,
+    )
+
+
+def merge_trajectories(
+    groupings: Iterable[HeatmapTrajectories],
+) -> HeatmapTrajectories:
+    """Merge trajectories built from several slot files.
+
+    Points are ordered by address, then by timestamp, so inputs may be given
+    in any order. When groupings disagree on a callsign, the one from the
+    track whose last point is latest wins.
+    """
+    addresses = array("I")
+    timestamps = array("d")
+    latitudes = array("d")
+    longitudes = array("d")
+    altitudes = array("d")
+    ground_speeds = array("d")
+    callsigns: dict[int, str] = {}
+    callsign_times: dict[int, float] = {}
+
+    for grouping in groupings:
+        for track, address in enumerate(grouping.addresses):
+            start, stop = grouping.offsets[track], grouping.offsets[track + 1]
+            addresses.extend(array("I", [address]) * (stop - start))
+            callsign = grouping.callsigns[track]
+            if callsign is None:
+                continue
+            last_seen = grouping.timestamps[stop - 1] if stop > start else -math.inf
+            if last_seen >= callsign_times.get(address, -math.inf):
+                callsign_times[address] = last_seen
+                callsigns[address] = callsign
+        timestamps.extend(grouping.timestamps)
+        latitudes.extend(grouping.latitudes)
+        longitudes.extend(grouping.longitudes)
+        altitudes.extend(grouping.altitudes)
+        ground_speeds.extend(grouping.ground_speeds)
+
+    # Two stable sorts: by time, then by address, keeps each track in time order
+    order = sorted(range(len(addresses)), key=timestamps.__getitem__)
+    order.sort(key=addresses.__getitem__)
+    return _group(
+        addresses,
+        timestamps,
+        latitudes,
+        longitudes,
+        altitudes,
+        ground_speeds,
+        callsigns,
+        order,
+    )
+
+
+def trajectories_from_files(
+    heatmap_files: Iterable[Path],
+    decoder: HeatmapDecoder | None = None,
+    cache: "DecodeCache | None" = None,
+) -> HeatmapTrajectories:
+    """Build merged per-aircraft trajectories from several slot files."""
+    decoder = decoder or HeatmapDecoder()
+    return merge_trajectories(
+        build_trajectories(
+            cache.heatmap_columns(path)
+            if cache is not None
+            else decoder.decode_columns_from_file(path)
+        )
+        for path in heatmap_files
+    )
@@ -0,0 +1,98 @@
+import logging
+import os
+from collections.abc import Generator, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Final
+
+from .compression_utils import READ_ERRORS
+from .executor_utils import bounded_map
+from .traces_decoder import TraceColumns, trace_columns_from_file
+
+TRACE_FILE_PATTERN: Final[str] = "trace_full_*.json"
+
+logger = logging.getLogger(__name__)
+
+
+def iter_trace_files(root: Path, pattern: str = TRACE_FILE_PATTERN) -> Iterator[Path]:
+    """Walk a readsb ``traces/`` tree and yield trace files in a stable order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        directory = Path(dirpath)
+        for name in sorted(filenames):
+            path = directory / name
+            if path.match(pattern):
+                yield path
+
+
+def icao_from_trace_path(trace_file: Path) -> str:
+    """Return the ICAO address encoded in a ``trace_full_<icao>.json`` name."""
+    stem = trace_file.name.split(".", 1)[0]
+    return stem.rsplit("_", 1)[-1].lower()
+
+
+def _decode_chunk(paths: list[Path]) -> list[TraceColumns]:
+    """Worker entry point: decode a chunk of trace files into columns."""
+    batches: list[TraceColumns] = []
+    for path in paths:
+        try:
+            columns = trace_columns_from_file(path)
+        except READ_ERRORS as e:
+            logger.warning(f"Skipping unreadable trace file {path}: {e}")
+            continue
+        if not columns.icao:
+            columns.icao = icao_from_trace_path(path)
+        batches.append(columns)
+    return batches
+
+
+def _chunked(paths: Iterable[Path], chunk_size: int) -> Iterator[list[Path]]:
+    iterator = iter(paths)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def decode_trace_directory(
+    root: Path | Iterable[Path],
+    *,
+    max_workers: int | None = None,
+    chunk_size: int = 64,
+    ordered: bool = True,
+    max_pending_chunks: int | None = None,
+) -> Generator[TraceColumns]:
+    """Decode every trace file of a directory tree across a process pool.
+
+    Files are dispatched to workers in chunks of ``chunk_size`` paths so that
+    per-task overhead is amortised over many small files. At most
+    ``max_pending_chunks`` chunks (default: twice the worker count) are in
+    flight at once, which bounds the memory held by decoded but not yet
+    consumed results.
+
+    Args:
+        root: A ``traces/`` directory, or an explicit iterable of trace files.
+        max_workers: Number of worker processes (default: ``os.cpu_count()``).
+        chunk_size: Number of files decoded per worker task.
+        ordered: Yield results in file order. When False, chunks are yielded
+            as soon as they complete, which keeps all workers busy.
+        max_pending_chunks: Upper bound on submitted, unconsumed chunks.
+
+    Yields:
+        One :class:`TraceColumns` per trace file, tagged with its ICAO address.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending_chunks or 2 * workers
+    if max_pending < 1:
+        raise ValueError("max_pending_chunks must be at least 1")
+
+    paths = iter_trace_files(root) if isinstance(root, Path) else iter(root)
+    chunks = _chunked(paths, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _, batches in bounded_map(
+            executor, _decode_chunk, chunks, max_pending=max_pending, ordered=ordered
+        ):
+            yield from batches
@@ -1,13 +1,21 @@
-from collections.abc import Generator
+import math
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Generator, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Final, cast
+from typing import TYPE_CHECKING, Any, Final, cast, overload
 
 import jiter
 
 from .compression_utils import open_file
 
+if TYPE_CHECKING:
+    from .decode_cache import DecodeCache
+
 
 @dataclass(slots=True)
 class AircraftRecord:
@@ -43,6 +51,105 @@ class TraceEntry:
     timestamp: datetime
 
 
+@dataclass(slots=True)
+class TraceColumns:
+    """Column-oriented trace points of a single aircraft.
+
+    Numeric columns are ``array.array`` of doubles in which missing values are
+    stored as NaN. ``altitudes`` uses -1 for "ground", like :class:`TraceEntry`.
+    ``offsets`` are seconds relative to ``timestamp`` (POSIX seconds).
+    """
+
+    icao: str
+    timestamp: float
+    offsets: array[float]
+    latitudes: array[float]
+    longitudes: array[float]
+    altitudes: array[float]
+    ground_speeds: array[float]
+    tracks: array[float]
+    flags: array[int]
+    vertical_rates: array[float]
+    aircraft: list[dict[str, Any] | None]
+    sources: list[str | None]
+    geometric_altitudes: array[float]
+    geometric_vertical_rates: array[float]
+    indicated_airspeeds: array[float]
+    roll_angles: array[float]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def slice(self, start: int, stop: int) -> "TraceColumns":
+        """Return the points in ``[start, stop)`` as a new :class:`TraceColumns`."""
+        return TraceColumns(
+            icao=self.icao,
+            timestamp=self.timestamp,
+            offsets=self.offsets[start:stop],
+            latitudes=self.latitudes[start:stop],
+            longitudes=self.longitudes[start:stop],
+            altitudes=self.altitudes[start:stop],
+            ground_speeds=self.ground_speeds[start:stop],
+            tracks=self.tracks[start:stop],
+            flags=self.flags[start:stop],
+            vertical_rates=self.vertical_rates[start:stop],
+            aircraft=self.aircraft[start:stop],
+            sources=self.sources[start:stop],
+            geometric_altitudes=self.geometric_altitudes[start:stop],
+            geometric_vertical_rates=self.geometric_vertical_rates[start:stop],
+            indicated_airspeeds=self.indicated_airspeeds[start:stop],
+            roll_angles=self.roll_angles[start:stop],
+        )
+
+    def take(self, indices: Sequence[int]) -> "TraceColumns":
+        """Return the points at ``indices`` as a new :class:`TraceColumns`."""
+
+        def pick(column: array[float]) -> array[float]:
+            return array(column.typecode, [column[i] for i in indices])
+
+        return TraceColumns(
+            icao=self.icao,
+            timestamp=self.timestamp,
+            offsets=pick(self.offsets),
+            latitudes=pick(self.latitudes),
+            longitudes=pick(self.longitudes),
+            altitudes=pick(self.altitudes),
+            ground_speeds=pick(self.ground_speeds),
+            tracks=pick(self.tracks),
+            flags=array("i", [self.flags[i] for i in indices]),
+            vertical_rates=pick(self.vertical_rates),
+            aircraft=[self.aircraft[i] for i in indices],
+            sources=[self.sources[i] for i in indices],
+            geometric_altitudes=pick(self.geometric_altitudes),
+            geometric_vertical_rates=pick(self.geometric_vertical_rates),
+            indicated_airspeeds=pick(self.indicated_airspeeds),
+            roll_angles=pick(self.roll_angles),
+        )
+
+
+@dataclass(slots=True)
+class TraceLeg:
+    """Boundaries and extent of a single flight leg within a trace.
+
+    ``start`` is inclusive and ``end`` exclusive, so a leg's points are
+    ``columns.slice(leg.start, leg.end)``.
+    """
+
+    start: int
+    end: int
+    start_time: datetime
+    end_time: datetime
+    min_latitude: float
+    max_latitude: float
+    min_longitude: float
+    max_longitude: float
+    stale_points: int
+
+    @property
+    def point_count(self) -> int:
+        return self.end - self.start
+
+
 TRACE_FLAG_STALE: Final[int] = 1
 TRACE_FLAG_NEW_LEG: Final[int] = 2
 TRACE_FLAG_VERTICAL_RATE_GEOMETRIC: Final[int] = 4
@@ -114,8 +221,139 @@ def _create_trace_entry(trace: list[Any], timestamp_dt: datetime) -> TraceEntry:
     )
 
 
-def process_traces_from_json_bytes(trace_bytes: bytes) -> Generator[TraceEntry]:
-    """Process traces from JSON bytes."""
+_MISSING: Final[object] = object()
+
+
+class TraceInterner:
+    """Share repeated strings and detail dicts between trace points.
+
+    Sources and detail keys are interned with :func:`sys.intern`, so they are
+    shared across files too. Values equal to, and of the same type as, the
+    previous dict's value for the same key reuse the previous value object;
+    when every value does, the previous dict itself is returned.
+    """
+
+    __slots__ = ("previous",)
+
+    def __init__(self) -> None:
+        self.previous: dict[str, Any] | None = None
+
+    def source(self, source: str | None) -> str | None:
+        return None if source is None else sys.intern(source)
+
+    def details(self, details: dict[str, Any] | None) -> dict[str, Any] | None:
+        if details is None:
+            return None
+
+        previous = self.previous
+        if previous is None:
+            shared = {sys.intern(key): value for key, value in details.items()}
+        else:
+            shared = {}
+            unchanged = len(details) == len(previous)
+            for key, value in details.items():
+                old = previous.get(key, _MISSING)
+                # Compare types too so that e.g. 1 never becomes True
+                if old is value or (type(old) is type(value) and old == value):
+                    value = old
+                else:
+                    unchanged = False
+                shared[sys.intern(key)] = value
+            if unchanged:
+                return previous
+
+        self.previous = shared
+        return shared
+
+
+_row_offset = itemgetter(0)
+
+# Datetimes have microsecond resolution; widen windows by half of it so that
+# a bound taken from a decoded point's timestamp still includes that point
+_WINDOW_EPSILON: Final[float] = 5e-7
+
+
+def _window_bounds(
+    offsets: Sequence[Any],
+    timestamp: float,
+    start: datetime | None,
+    end: datetime | None,
+    key: Callable[[Any], float] | None = None,
+) -> tuple[int, int]:
+    """Return the index range of time-ordered points within ``[start, end]``.
+
+    The window is converted once to raw offsets from the trace ``timestamp``
+    and located by bisection, so points outside it are never touched.
+    """
+    lo = (
+        0
+        if start is None
+        else bisect_left(
+            offsets, start.timestamp() - timestamp - _WINDOW_EPSILON, key=key
+        )
+    )
+    hi = (
+        len(offsets)
+        if end is None
+        else bisect_right(
+            offsets, end.timestamp() - timestamp + _WINDOW_EPSILON, lo, key=key
+        )
+    )
+    return lo, hi
+
+
+def _check_batch_size(batch_size: int) -> int:
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    return batch_size
+
+
+@overload
+def process_traces_from_json_bytes(
+    trace_bytes: bytes,
+    *,
+    intern: bool = False,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: None = None,
+) -> Generator[TraceEntry]: ...
+
+
+@overload
+def process_traces_from_json_bytes(
+    trace_bytes: bytes,
+    *,
+    intern: bool = False,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int,
+) -> Generator[list[TraceEntry]]: ...
+
+
+def process_traces_from_json_bytes(
+    trace_bytes: bytes,
+    *,
+    intern: bool = False,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int | None = None,
+) -> Generator[TraceEntry | list[TraceEntry]]:
+    """Process traces from JSON bytes.
+
+    With ``intern=True``, repeated sources, detail keys and values, and
+    identical consecutive detail dicts are shared between entries (see
+    :class:`TraceInterner`). Only those are shared: every entry still holds
+    its own timestamp and numbers, so this saves about 5% of the memory the
+    entries retain, which stays well above that of the same points as
+    :class:`TraceColumns`. Decode columns when memory matters.
+
+    ``start`` and ``end`` restrict the output to points within that inclusive
+    time window; points outside it are skipped without being converted.
+
+    With ``batch_size``, entries are yielded as lists of up to ``batch_size``
+    entries instead of one by one. Keep batches to a few hundred entries:
+    longer lists cost more in garbage collection than they save.
+    """
     data = _load_json_object(trace_bytes)
 
     timestamp_val = data.get("timestamp")
@@ -123,13 +361,292 @@ def process_traces_from_json_bytes(trace_bytes: bytes) -> Generator[TraceEntry]:
         raise ValueError("No timestamp found in JSON")
 
     timestamp_dt = datetime.fromtimestamp(float(timestamp_val), tz=UTC)
+    interner = TraceInterner() if intern else None
+
+    rows = cast(list[list[Any]], data.get("trace", []))
+    lo, hi = _window_bounds(rows, float(timestamp_val), start, end, key=_row_offset)
 
-    for trace in data.get("trace", []):
-        trace_list = cast(list[Any], trace)
+    if interner is not None:
+        for trace_list in rows[lo:hi]:
+            trace_list[8] = interner.details(trace_list[8])
+            trace_list[9] = interner.source(trace_list[9])
+
+    if batch_size is not None:
+        step = _check_batch_size(batch_size)
+        for batch_start in range(lo, hi, step):
+            yield [
+                _create_trace_entry(row, timestamp_dt)
+                for row in rows[batch_start : min(batch_start + step, hi)]
+            ]
+        return
+
+    for trace_list in rows[lo:hi]:
         yield _create_trace_entry(trace_list, timestamp_dt)
 
 
-def process_traces_from_file(trace_file: Path) -> Generator[TraceEntry]:
-    """Process traces from a gzipped JSON file."""
+@overload
+def process_traces_from_file(
+    trace_file: Path,
+    *,
+    intern: bool = False,
+    cache: "DecodeCache | None" = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: None = None,
+) -> Generator[TraceEntry]: ...
+
+
+@overload
+def process_traces_from_file(
+    trace_file: Path,
+    *,
+    intern: bool = False,
+    cache: "DecodeCache | None" = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int,
+) -> Generator[list[TraceEntry]]: ...
+
+
+def process_traces_from_file(
+    trace_file: Path,
+    *,
+    intern: bool = False,
+    cache: "DecodeCache | None" = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int | None = None,
+) -> Generator[TraceEntry | list[TraceEntry]]:
+    """Process traces from a gzipped JSON file.
+
+    With a ``cache``, the file is decoded to columns once and later calls for
+    the unchanged file are served from the cache.
+    """
+    if cache is not None:
+        columns = trace_columns_from_file(trace_file, intern=intern, cache=cache)
+        lo, hi = _window_bounds(columns.offsets, columns.timestamp, start, end)
+        if batch_size is None:
+            yield from trace_entries_from_columns(columns, lo, hi)
+            return
+        step = _check_batch_size(batch_size)
+        timestamp_dt = datetime.fromtimestamp(columns.timestamp, tz=UTC)
+        for batch_start in range(lo, hi, step):
+            yield [
+                _entry_from_columns(columns, i, timestamp_dt)
+                for i in range(batch_start, min(batch_start + step, hi))
+            ]
+        return
+
+    with open_file(trace_file) as f:
+        payload = f.read()
+    if batch_size is None:
+        yield from process_traces_from_json_bytes(
+            payload, intern=intern, start=start, end=end
+        )
+    else:
+        yield from process_traces_from_json_bytes(
+            payload, intern=intern, start=start, end=end, batch_size=batch_size
+        )
+
+
+_NAN: Final[float] = math.nan
+
+
+def _float_column(values: Sequence[Any]) -> array[float]:
+    """Build a double column, mapping None to NaN."""
+    return array("d", [_NAN if v is None else v for v in values])
+
+
+def _intern_details_and_sources(
+    aircraft: list[dict[str, Any] | None], sources: list[str | None]
+) -> tuple[list[dict[str, Any] | None], list[str | None]]:
+    interner = TraceInterner()
+    return (
+        [interner.details(details) for details in aircraft],
+        [interner.source(source) for source in sources],
+    )
+
+
+def trace_columns_from_json_bytes(
+    trace_bytes: bytes,
+    *,
+    intern: bool = False,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> TraceColumns:
+    """Decode a trace JSON document into a :class:`TraceColumns`.
+
+    Rows are transposed in a single pass, so no per-point objects are created.
+    ``intern`` shares repeated sources and detail dicts, and ``start``/``end``
+    restrict the points to a time window, as in
+    :func:`process_traces_from_json_bytes`.
+    """
+    data = _load_json_object(trace_bytes)
+
+    timestamp_val = data.get("timestamp")
+    if timestamp_val is None:
+        raise ValueError("No timestamp found in JSON")
+
+    rows = cast(list[list[Any]], data.get("trace", []))
+    if start is not None or end is not None:
+        lo, hi = _window_bounds(rows, float(timestamp_val), start, end, key=_row_offset)
+        rows = rows[lo:hi]
+    if rows:
+        columns: list[Sequence[Any]] = list(zip(*rows, strict=False))
+    else:
+        columns = [()] * 14
+
+    aircraft = list(columns[8])
+    sources = list(columns[9])
+    if intern:
+        aircraft, sources = _intern_details_and_sources(aircraft, sources)
+
+    return TraceColumns(
+        icao=str(data.get("icao", "")),
+        timestamp=float(timestamp_val),
+        offsets=array("d", columns[0]),
+        latitudes=array("d", columns[1]),
+        longitudes=array("d", columns[2]),
+        altitudes=_float_column([-1 if v == "ground" else v for v in columns[3]]),
+        ground_speeds=_float_column(columns[4]),
+        tracks=_float_column(columns[5]),
+        flags=array("i", columns[6]),
+        vertical_rates=_float_column(columns[7]),
+        aircraft=aircraft,
+        sources=sources,
+        geometric_altitudes=_float_column(columns[10]),
+        geometric_vertical_rates=_float_column(columns[11]),
+        indicated_airspeeds=_float_column(columns[12]),
+        roll_angles=_float_column(columns[13]),
+    )
+
+
+def trace_columns_from_file(
+    trace_file: Path,
+    *,
+    intern: bool = False,
+    cache: "DecodeCache | None" = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> TraceColumns:
+    """Decode a (possibly gzipped) trace JSON file into a :class:`TraceColumns`."""
+    if cache is not None:
+        columns = cache.trace_columns(trace_file)
+        if start is not None or end is not None:
+            columns = columns.slice(
+                *_window_bounds(columns.offsets, columns.timestamp, start, end)
+            )
+        if intern:
+            columns.aircraft, columns.sources = _intern_details_and_sources(
+                columns.aircraft, columns.sources
+            )
+        return columns
+
     with open_file(trace_file) as f:
-        yield from process_traces_from_json_bytes(f.read())
+        return trace_columns_from_json_bytes(
+            f.read(), intern=intern, start=start, end=end
+        )
+
+
+def _nullable_int(value: float) -> int | None:
+    return None if math.isnan(value) else int(value)
+
+
+def _nullable_float(value: float) -> float | None:
+    return None if math.isnan(value) else value
+
+
+def _entry_from_columns(
+    columns: TraceColumns, i: int, timestamp_dt: datetime
+) -> TraceEntry:
+    """Create the TraceEntry of point ``i`` of ``columns``."""
+    return TraceEntry(
+        latitude=columns.latitudes[i],
+        longitude=columns.longitudes[i],
+        altitude=cast(int, _nullable_int(columns.altitudes[i])),
+        ground_speed=_nullable_float(columns.ground_speeds[i]),
+        track=_nullable_float(columns.tracks[i]),
+        flags=columns.flags[i],
+        vertical_rate=_nullable_int(columns.vertical_rates[i]),
+        aircraft=cast(dict[str, Any], columns.aircraft[i]),
+        source=columns.sources[i],
+        geometric_altitude=_nullable_int(columns.geometric_altitudes[i]),
+        geometric_vertical_rate=_nullable_int(columns.geometric_vertical_rates[i]),
+        indicated_airspeed=_nullable_int(columns.indicated_airspeeds[i]),
+        roll_angle=_nullable_int(columns.roll_angles[i]),
+        timestamp=timestamp_dt + timedelta(seconds=columns.offsets[i]),
+    )
+
+
+def trace_entries_from_columns(
+    columns: TraceColumns, start: int = 0, stop: int | None = None
+) -> Generator[TraceEntry]:
+    """Materialise :class:`TraceEntry` objects for the points in ``[start, stop)``."""
+    timestamp_dt = datetime.fromtimestamp(columns.timestamp, tz=UTC)
+    stop = len(columns) if stop is None else stop
+
+    for i in range(start, stop):
+        yield _entry_from_columns(columns, i, timestamp_dt)
+
+
+def leg_break_indices(columns: TraceColumns, max_gap: float | None = None) -> list[int]:
+    """Return the indices at which a new leg starts, excluding index 0.
+
+    A leg starts at every point flagged with :data:`TRACE_FLAG_NEW_LEG` and,
+    when ``max_gap`` is given, after every gap longer than ``max_gap`` seconds.
+    """
+    new_leg = TRACE_FLAG_NEW_LEG
+    breaks = {i for i, flag in enumerate(columns.flags) if flag & new_leg and i}
+
+    if max_gap is not None:
+        offsets = columns.offsets
+        breaks.update(
+            i
+            for i, (previous, current) in enumerate(
+                zip(offsets, offsets[1:], strict=False), start=1
+            )
+            if current - previous > max_gap
+        )
+
+    return sorted(breaks)
+
+
+def compute_trace_legs(
+    columns: TraceColumns, max_gap: float | None = None
+) -> list[TraceLeg]:
+    """Split a trace into legs and compute each leg's time range and extent.
+
+    Args:
+        columns: Decoded trace columns.
+        max_gap: Optionally also split where consecutive points are more than
+            this many seconds apart.
+
+    Returns:
+        Legs in time order; an empty trace has no legs.
+    """
+    count = len(columns)
+    if not count:
+        return []
+
+    timestamp_dt = datetime.fromtimestamp(columns.timestamp, tz=UTC)
+    stale = TRACE_FLAG_STALE
+    bounds = [0, *leg_break_indices(columns, max_gap), count]
+
+    legs: list[TraceLeg] = []
+    for start, end in zip(bounds, bounds[1:], strict=False):
+        latitudes = columns.latitudes[start:end]
+        longitudes = columns.longitudes[start:end]
+        legs.append(
+            TraceLeg(
+                start=start,
+                end=end,
+                start_time=timestamp_dt + timedelta(seconds=columns.offsets[start]),
+                end_time=timestamp_dt + timedelta(seconds=columns.offsets[end - 1]),
+                min_latitude=min(latitudes),
+                max_latitude=max(latitudes),
+                min_longitude=min(longitudes),
+                max_longitude=max(longitudes),
+                stale_points=sum(1 for f in columns.flags[start:end] if f & stale),
+            )
+        )
+    return legs
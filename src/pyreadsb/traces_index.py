@@ -0,0 +1,384 @@
+import logging
+import math
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Final
+
+from .compression_utils import READ_ERRORS
+from .geo_utils import BoundingBox
+from .traces_bulk import iter_trace_files
+from .traces_decoder import TraceColumns, compute_trace_legs, trace_columns_from_file
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class IndexedLeg:
+    """Time range, extent and grid cells of one leg of an indexed trace file."""
+
+    file_id: int
+    start: int
+    end: int
+    start_time: float
+    end_time: float
+    min_latitude: float
+    max_latitude: float
+    min_longitude: float
+    max_longitude: float
+    cells: array[int]
+
+
+def _grid_columns(cell_degrees: float) -> int:
+    return math.ceil(360.0 / cell_degrees)
+
+
+def _cell_ids(
+    latitudes: array[float], longitudes: array[float], cell_degrees: float
+) -> array[int]:
+    """Return the sorted ids of the grid cells visited by the given positions."""
+    columns = _grid_columns(cell_degrees)
+    cells = {
+        int((lat + 90.0) // cell_degrees) * columns + int((lon + 180.0) // cell_degrees)
+        for lat, lon in zip(latitudes, longitudes, strict=True)
+    }
+    return array("I", sorted(cells))
+
+
+def _index_file(
+    task: tuple[int, Path, float, float | None],
+) -> tuple[tuple[int, int], list[IndexedLeg]]:
+    """Worker entry point: compute the stamp and leg records of one trace file.
+
+    The stamp is the file's ``(st_size, st_mtime_ns)``, taken before reading
+    it, so a file written to while it is indexed never matches its stamp.
+    """
+    file_id, path, cell_degrees, max_gap = task
+    try:
+        stat = path.stat()
+        columns = trace_columns_from_file(path)
+    except READ_ERRORS as e:
+        logger.warning(f"Skipping unreadable trace file {path}: {e}")
+        return (0, 0), []
+
+    records: list[IndexedLeg] = []
+    for leg in compute_trace_legs(columns, max_gap):
+        records.append(
+            IndexedLeg(
+                file_id=file_id,
+                start=leg.start,
+                end=leg.end,
+                start_time=leg.start_time.timestamp(),
+                end_time=leg.end_time.timestamp(),
+                min_latitude=leg.min_latitude,
+                max_latitude=leg.max_latitude,
+                min_longitude=leg.min_longitude,
+                max_longitude=leg.max_longitude,
+                cells=_cell_ids(
+                    columns.latitudes[leg.start : leg.end],
+                    columns.longitudes[leg.start : leg.end],
+                    cell_degrees,
+                ),
+            )
+        )
+    return (stat.st_size, stat.st_mtime_ns), records
+
+
+class TraceIndex:
+    """Per-leg time and spatial index over a readsb ``traces/`` directory.
+
+    The index records, for every leg of every trace file, its time range,
+    bounding box and the grid cells (``cell_degrees`` wide) it visits. Queries
+    use it to decode only the files, and only the points, that can match.
+    Each file's size and modification time are recorded as its stamp, so
+    queries can tell when a file has changed since it was indexed.
+    """
+
+    MAGIC: Final[bytes] = b"PRSBTIDX"
+    VERSION: Final[int] = 2
+
+    _HEADER: Final[struct.Struct] = struct.Struct("<8sHdII")
+    _PATH_LENGTH: Final[struct.Struct] = struct.Struct("<H")
+    _STAMP: Final[struct.Struct] = struct.Struct("<Qq")
+    _LEG_RECORD: Final[struct.Struct] = struct.Struct("<IIIddddddI")
+
+    __slots__ = ("root", "cell_degrees", "paths", "legs", "stamps")
+
+    def __init__(
+        self,
+        root: Path,
+        cell_degrees: float,
+        paths: list[str],
+        legs: list[IndexedLeg],
+        stamps: list[tuple[int, int]],
+    ) -> None:
+        self.root = root
+        self.cell_degrees = cell_degrees
+        self.paths = paths
+        self.legs = legs
+        self.stamps = stamps
+
+    @classmethod
+    def build(
+        cls,
+        root: Path,
+        *,
+        cell_degrees: float = 1.0,
+        max_gap: float | None = None,
+        max_workers: int | None = None,
+        chunk_size: int = 64,
+    ) -> "TraceIndex":
+        """Index every trace file below ``root`` in one parallel pass.
+
+        Args:
+            root: A readsb ``traces/`` directory.
+            cell_degrees: Size of the spatial grid cells in degrees.
+            max_gap: Also split legs on time gaps longer than this (seconds).
+            max_workers: Number of worker processes (default: CPU count).
+            chunk_size: Number of files handed to a worker at a time.
+        """
+        if cell_degrees <= 0:
+            raise ValueError("cell_degrees must be positive")
+
+        files = list(iter_trace_files(root))
+        tasks = [(i, path, cell_degrees, max_gap) for i, path in enumerate(files)]
+
+        legs: list[IndexedLeg] = []
+        stamps: list[tuple[int, int]] = []
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for stamp, records in executor.map(
+                _index_file, tasks, chunksize=chunk_size
+            ):
+                stamps.append(stamp)
+                legs.extend(records)
+
+        paths = [path.relative_to(root).as_posix() for path in files]
+        return cls(root, cell_degrees, paths, legs, stamps)
+
+    def save(self, index_file: Path) -> None:
+        """Write the index to ``index_file`` in a compact binary format."""
+        root_bytes = os.fsencode(self.root)
+        with open(index_file, "wb") as f:
+            f.write(
+                self._HEADER.pack(
+                    self.MAGIC,
+                    self.VERSION,
+                    self.cell_degrees,
+                    len(self.paths),
+                    len(self.legs),
+                )
+            )
+            self._write_string(f, root_bytes)
+            for path, stamp in zip(self.paths, self.stamps, strict=True):
+                self._write_string(f, path.encode())
+                f.write(self._STAMP.pack(*stamp))
+
+            pack = self._LEG_RECORD.pack
+            f.write(
+                b"".join(
+                    pack(
+                        leg.file_id,
+                        leg.start,
+                        leg.end,
+                        leg.start_time,
+                        leg.end_time,
+                        leg.min_latitude,
+                        leg.max_latitude,
+                        leg.min_longitude,
+                        leg.max_longitude,
+                        len(leg.cells),
+                    )
+                    for leg in self.legs
+                )
+            )
+
+            cells = array("I")
+            for leg in self.legs:
+                cells.extend(leg.cells)
+            if sys.byteorder == "big":
+                cells.byteswap()
+            f.write(cells.tobytes())
+
+    def _write_string(self, f: BinaryIO, value: bytes) -> None:
+        f.write(self._PATH_LENGTH.pack(len(value)))
+        f.write(value)
+
+    @classmethod
+    def load(cls, index_file: Path, root: Path | None = None) -> "TraceIndex":
+        """Read an index written by :meth:`save`.
+
+        Args:
+            index_file: The index file.
+            root: Traces directory to resolve files against, if it has moved
+                since the index was built.
+        """
+        data = index_file.read_bytes()
+        magic, version, cell_degrees, path_count, leg_count = cls._HEADER.unpack_from(
+            data
+        )
+        if magic != cls.MAGIC:
+            raise ValueError(f"{index_file} is not a trace index")
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported trace index version {version}")
+
+        pos = cls._HEADER.size
+        strings: list[bytes] = []
+        stamps: list[tuple[int, int]] = []
+        for i in range(path_count + 1):
+            (length,) = cls._PATH_LENGTH.unpack_from(data, pos)
+            pos += cls._PATH_LENGTH.size
+            strings.append(data[pos : pos + length])
+            pos += length
+            # The root string comes first and has no stamp
+            if i:
+                stamps.append(cls._STAMP.unpack_from(data, pos))
+                pos += cls._STAMP.size
+
+        records = list(
+            cls._LEG_RECORD.iter_unpack(
+                data[pos : pos + leg_count * cls._LEG_RECORD.size]
+            )
+        )
+        pos += leg_count * cls._LEG_RECORD.size
+
+        cells = array("I")
+        cells.frombytes(data[pos:])
+        if sys.byteorder == "big":
+            cells.byteswap()
+
+        legs: list[IndexedLeg] = []
+        cell_pos = 0
+        for (
+            file_id,
+            start,
+            end,
+            start_time,
+            end_time,
+            min_latitude,
+            max_latitude,
+            min_longitude,
+            max_longitude,
+            cell_count,
+        ) in records:
+            legs.append(
+                IndexedLeg(
+                    file_id=file_id,
+                    start=start,
+                    end=end,
+                    start_time=start_time,
+                    end_time=end_time,
+                    min_latitude=min_latitude,
+                    max_latitude=max_latitude,
+                    min_longitude=min_longitude,
+                    max_longitude=max_longitude,
+                    cells=cells[cell_pos : cell_pos + cell_count],
+                )
+            )
+            cell_pos += cell_count
+
+        index_root = root if root is not None else Path(os.fsdecode(strings[0]))
+        paths = [s.decode() for s in strings[1:]]
+        return cls(index_root, cell_degrees, paths, legs, stamps)
+
+    def candidates(
+        self,
+        bbox: BoundingBox | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[IndexedLeg]:
+        """Return the legs that may have points in the box and time window."""
+        start_ts = -math.inf if start is None else start.timestamp()
+        end_ts = math.inf if end is None else end.timestamp()
+
+        legs = [
+            leg
+            for leg in self.legs
+            if leg.start_time <= end_ts and leg.end_time >= start_ts
+        ]
+        if bbox is None:
+            return legs
+
+        min_lat, min_lon, max_lat, max_lon = bbox
+        deg = self.cell_degrees
+        columns = _grid_columns(deg)
+        min_row, max_row = int((min_lat + 90.0) // deg), int((max_lat + 90.0) // deg)
+        min_col, max_col = int((min_lon + 180.0) // deg), int((max_lon + 180.0) // deg)
+
+        return [
+            leg
+            for leg in legs
+            if leg.min_latitude <= max_lat
+            and leg.max_latitude >= min_lat
+            and leg.min_longitude <= max_lon
+            and leg.max_longitude >= min_lon
+            and any(
+                min_row <= cell // columns <= max_row
+                and min_col <= cell % columns <= max_col
+                for cell in leg.cells
+            )
+        ]
+
+    def query(
+        self,
+        bbox: BoundingBox | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Generator[TraceColumns]:
+        """Yield, per matching trace file, the points in the box and time window.
+
+        Only candidate files are opened, and only the points of candidate legs
+        inside the time window are tested against the box. Files that changed
+        since the index was built, or that can no longer be read, are skipped
+        with a warning; rebuild the index to query them again.
+        """
+        by_file: dict[int, list[IndexedLeg]] = {}
+        for leg in self.candidates(bbox, start, end):
+            by_file.setdefault(leg.file_id, []).append(leg)
+
+        for file_id, legs in sorted(by_file.items()):
+            path = self.root / self.paths[file_id]
+            try:
+                stat = path.stat()
+                if (stat.st_size, stat.st_mtime_ns) != self.stamps[file_id]:
+                    logger.warning(
+                        f"Skipping trace file {path}: changed since it was indexed"
+                    )
+                    continue
+                columns = trace_columns_from_file(path)
+            except READ_ERRORS as e:
+                logger.warning(f"Skipping unreadable trace file {path}: {e}")
+                continue
+            offsets = columns.offsets
+            start_offset = (
+                -math.inf if start is None else start.timestamp() - columns.timestamp
+            )
+            end_offset = (
+                math.inf if end is None else end.timestamp() - columns.timestamp
+            )
+
+            indices: list[int] = []
+            for leg in legs:
+                first = bisect_left(offsets, start_offset, leg.start, leg.end)
+                last = bisect_right(offsets, end_offset, first, leg.end)
+                if bbox is None:
+                    indices.extend(range(first, last))
+                    continue
+                min_lat, min_lon, max_lat, max_lon = bbox
+                latitudes = columns.latitudes
+                longitudes = columns.longitudes
+                indices.extend(
+                    i
+                    for i in range(first, last)
+                    if min_lat <= latitudes[i] <= max_lat
+                    and min_lon <= longitudes[i] <= max_lon
+                )
+
+            if indices:
+                yield columns.take(indices)
@@ -0,0 +1,191 @@
+import math
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Final
+
+from .traces_decoder import TRACE_FLAG_NEW_LEG, TRACE_FLAG_STALE, TraceColumns
+
+GROUND_ALTITUDE: Final[float] = -1.0
+
+# Below this central angle (radians, ~6 cm) slerp degenerates to a lerp
+_MIN_SLERP_ANGLE: Final[float] = 1e-8
+# Grid times this close to a segment's ends (seconds) count as inside it
+_GRID_TOLERANCE: Final[float] = 1e-6
+
+
+@dataclass(slots=True)
+class ResampledTrace:
+    """Trace positions interpolated onto a fixed time grid.
+
+    ``offsets`` are seconds relative to ``timestamp`` and fall on multiples of
+    ``interval`` in absolute (POSIX) time, so resampled traces of different
+    aircraft share the same grid. ``segments`` numbers the continuous stretches
+    the samples were interpolated from; no sample spans two segments.
+    """
+
+    icao: str
+    timestamp: float
+    interval: float
+    offsets: array[float]
+    latitudes: array[float]
+    longitudes: array[float]
+    altitudes: array[float]
+    ground_speeds: array[float]
+    segments: array[int]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+def _interpolable_segments(
+    columns: TraceColumns, max_gap: float | None
+) -> list[tuple[int, int]]:
+    """Return ``(first, last)`` index pairs of runs that may be interpolated.
+
+    An interval between consecutive points is usable unless either end is
+    stale, the second point starts a new leg, or the points are further apart
+    than ``max_gap``.
+    """
+    flags = columns.flags
+    offsets = columns.offsets
+    stale = TRACE_FLAG_STALE
+    breaking = TRACE_FLAG_STALE | TRACE_FLAG_NEW_LEG
+    gap = math.inf if max_gap is None else max_gap
+
+    usable = [
+        not (f0 & stale or f1 & breaking or t1 - t0 > gap)
+        for f0, f1, t0, t1 in zip(flags, flags[1:], offsets, offsets[1:], strict=False)
+    ]
+
+    segments: list[tuple[int, int]] = []
+    first: int | None = None
+    for i, ok in enumerate(usable):
+        if ok and first is None:
+            first = i
+        elif not ok and first is not None:
+            segments.append((first, i))
+            first = None
+    if first is not None:
+        segments.append((first, len(usable)))
+    return segments
+
+
+def _slerp(
+    lat0: float, lon0: float, lat1: float, lon1: float, f: float
+) -> tuple[float, float]:
+    """Interpolate along the great circle between two positions in degrees."""
+    phi0, lam0, phi1, lam1 = map(math.radians, (lat0, lon0, lat1, lon1))
+    cos_phi0 = math.cos(phi0)
+    cos_phi1 = math.cos(phi1)
+    x0, y0, z0 = cos_phi0 * math.cos(lam0), cos_phi0 * math.sin(lam0), math.sin(phi0)
+    x1, y1, z1 = cos_phi1 * math.cos(lam1), cos_phi1 * math.sin(lam1), math.sin(phi1)
+
+    omega = math.acos(max(-1.0, min(1.0, x0 * x1 + y0 * y1 + z0 * z1)))
+    if omega < _MIN_SLERP_ANGLE:
+        a, b = 1.0 - f, f
+    else:
+        sin_omega = math.sin(omega)
+        a = math.sin((1.0 - f) * omega) / sin_omega
+        b = math.sin(f * omega) / sin_omega
+
+    x, y, z = a * x0 + b * x1, a * y0 + b * y1, a * z0 + b * z1
+    return (
+        math.degrees(math.atan2(z, math.hypot(x, y))),
+        math.degrees(math.atan2(y, x)),
+    )
+
+
+def resample_trace(
+    columns: TraceColumns,
+    interval: float,
+    *,
+    max_gap: float | None = None,
+) -> ResampledTrace:
+    """Resample a trace onto a fixed time cadence.
+
+    Latitude and longitude are interpolated along great circles; altitude and
+    ground speed linearly. Interpolation never crosses a leg break
+    (:data:`TRACE_FLAG_NEW_LEG`), a stale point (:data:`TRACE_FLAG_STALE`) or,
+    when ``max_gap`` is given, a gap longer than ``max_gap`` seconds; grid
+    times in such stretches produce no sample. Ground altitudes are not
+    interpolated: the value of the nearest point is used instead.
+
+    Args:
+        columns: Decoded trace columns.
+        interval: Grid cadence in seconds.
+        max_gap: Optional maximum time between points to interpolate across.
+
+    Returns:
+        The resampled trace.
+    """
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+
+    offsets = columns.offsets
+    base = columns.timestamp
+    latitudes = columns.latitudes
+    longitudes = columns.longitudes
+    altitudes = columns.altitudes
+    speeds = columns.ground_speeds
+
+    out_offsets: list[float] = []
+    out_lower: list[int] = []
+    out_segments: list[int] = []
+    for segment, (first, last) in enumerate(_interpolable_segments(columns, max_gap)):
+        # Grid times are computed in absolute time, so rounding can put one
+        # that coincides with a point just outside the segment: clamp it
+        start = max(
+            math.ceil((base + offsets[first]) / interval) * interval - base,
+            offsets[first],
+        )
+        stop = offsets[last]
+        steps = math.floor((stop - start + _GRID_TOLERANCE) / interval) + 1
+        if steps <= 0:
+            continue
+        grid = [min(start + k * interval, stop) for k in range(steps)]
+        out_offsets.extend(grid)
+        # Index of the point at or before each grid time, clamped to the
+        # segment so that its last point is reached through the interval
+        # before it
+        out_lower.extend(
+            [
+                max(first, min(bisect_right(offsets, t, first, last + 1) - 1, last - 1))
+                for t in grid
+            ]
+        )
+        out_segments.extend([segment] * steps)
+
+    fractions = [
+        (t - offsets[i]) / (offsets[i + 1] - offsets[i])
+        if offsets[i + 1] > offsets[i]
+        else 0.0
+        for t, i in zip(out_offsets, out_lower, strict=True)
+    ]
+    positions = [
+        _slerp(latitudes[i], longitudes[i], latitudes[i + 1], longitudes[i + 1], f)
+        for i, f in zip(out_lower, fractions, strict=True)
+    ]
+
+    def lerp(values: array[float]) -> list[float]:
+        return [
+            values[i] + (values[i + 1] - values[i]) * f
+            for i, f in zip(out_lower, fractions, strict=True)
+        ]
+
+    interpolated_altitudes = lerp(altitudes)
+    for k, (i, f) in enumerate(zip(out_lower, fractions, strict=True)):
+        if altitudes[i] == GROUND_ALTITUDE or altitudes[i + 1] == GROUND_ALTITUDE:
+            interpolated_altitudes[k] = altitudes[i] if f < 0.5 else altitudes[i + 1]
+
+    return ResampledTrace(
+        icao=columns.icao,
+        timestamp=base,
+        interval=interval,
+        offsets=array("d", out_offsets),
+        latitudes=array("d", [lat for lat, _ in positions]),
+        longitudes=array("d", [lon for _, lon in positions]),
+        altitudes=array("d", interpolated_altitudes),
+        ground_speeds=array("d", lerp(speeds)),
+        segments=array("i", out_segments),
+    )
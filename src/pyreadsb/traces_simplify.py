@@ -0,0 +1,158 @@
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Final
+
+from .geo_utils import EARTH_RADIUS_M
+from .traces_decoder import TRACE_FLAG_NEW_LEG, TRACE_FLAG_STALE, TraceColumns
+
+_METERS_PER_DEGREE: Final[float] = math.radians(1.0) * EARTH_RADIUS_M
+
+# Flags marking a break in the track: stale data and the start of a new leg
+DEFAULT_ANCHOR_FLAGS: Final[int] = TRACE_FLAG_STALE | TRACE_FLAG_NEW_LEG
+
+
+@dataclass(slots=True)
+class SimplifiedTrace:
+    """Result of :func:`simplify_trace`."""
+
+    columns: TraceColumns
+    kept_indices: array[int]
+    original_count: int
+
+    @property
+    def compression_ratio(self) -> float:
+        """Original point count divided by retained point count."""
+        kept = len(self.kept_indices)
+        return self.original_count / kept if kept else 1.0
+
+
+def _anchor_indices(columns: TraceColumns, anchor_flags: int) -> list[int]:
+    """Return points that must always be kept.
+
+    These are the first and last points, every point with one of
+    ``anchor_flags`` and the last point before each leg break.
+    """
+    count = len(columns)
+    new_leg = TRACE_FLAG_NEW_LEG
+    anchors = {0, count - 1}
+    for i, flag in enumerate(columns.flags):
+        if flag & anchor_flags:
+            anchors.add(i)
+        if flag & new_leg and i:
+            anchors.add(i)
+            anchors.add(i - 1)
+    return sorted(anchors)
+
+
+def _douglas_peucker(
+    columns: TraceColumns,
+    first: int,
+    last: int,
+    horizontal_tolerance: float,
+    vertical_tolerance: float | None,
+    keep: bytearray,
+) -> None:
+    """Mark the points of ``[first, last]`` needed to stay within tolerance.
+
+    Horizontal distances are measured in meters to the chord in a local
+    equirectangular projection; vertical deviations in feet against the
+    altitude linearly interpolated in time along the chord. A point is kept
+    when either error, relative to its tolerance, exceeds 1.
+    """
+    latitudes = columns.latitudes
+    longitudes = columns.longitudes
+    altitudes = columns.altitudes
+    offsets = columns.offsets
+
+    stack = [(first, last)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+
+        lat_a = latitudes[a]
+        lon_a = longitudes[a]
+        x_scale = _METERS_PER_DEGREE * math.cos(math.radians(lat_a))
+        bx = ((longitudes[b] - lon_a + 180.0) % 360.0 - 180.0) * x_scale
+        by = (latitudes[b] - lat_a) * _METERS_PER_DEGREE
+        chord_sq = bx * bx + by * by
+        t_a = offsets[a]
+        duration = offsets[b] - t_a
+        alt_a = altitudes[a]
+        alt_slope = (altitudes[b] - alt_a) / duration if duration > 0 else 0.0
+
+        worst = 1.0
+        worst_index = -1
+        for i in range(a + 1, b):
+            px = ((longitudes[i] - lon_a + 180.0) % 360.0 - 180.0) * x_scale
+            py = (latitudes[i] - lat_a) * _METERS_PER_DEGREE
+            if chord_sq > 0.0:
+                u = min(1.0, max(0.0, (px * bx + py * by) / chord_sq))
+                px -= u * bx
+                py -= u * by
+            error = math.hypot(px, py) / horizontal_tolerance
+
+            if vertical_tolerance is not None:
+                expected = alt_a + alt_slope * (offsets[i] - t_a)
+                vertical_error = abs(altitudes[i] - expected) / vertical_tolerance
+                # NaN altitudes compare false and never force a point
+                if vertical_error > error:
+                    error = vertical_error
+
+            if error > worst:
+                worst = error
+                worst_index = i
+
+        if worst_index >= 0:
+            keep[worst_index] = 1
+            stack.append((a, worst_index))
+            stack.append((worst_index, b))
+
+
+def simplify_trace(
+    columns: TraceColumns,
+    horizontal_tolerance: float,
+    vertical_tolerance: float | None = None,
+    *,
+    anchor_flags: int = DEFAULT_ANCHOR_FLAGS,
+) -> SimplifiedTrace:
+    """Simplify a trace with the Douglas-Peucker algorithm.
+
+    Points with one of ``anchor_flags`` (by default stale and new-leg
+    points) and the points on either side of a leg break are always kept,
+    and simplification runs independently between them, so legs are never
+    merged. Points that only carry other flags, like geometric altitude or
+    rate, are simplified like any other point.
+
+    Args:
+        columns: Decoded trace columns.
+        horizontal_tolerance: Maximum horizontal deviation in meters.
+        vertical_tolerance: Optional maximum altitude deviation in feet.
+        anchor_flags: Bitmask of ``TRACE_FLAG_*`` values whose points are
+            always kept.
+
+    Returns:
+        The retained points and the compression ratio achieved.
+    """
+    if horizontal_tolerance <= 0:
+        raise ValueError("horizontal_tolerance must be positive")
+    if vertical_tolerance is not None and vertical_tolerance <= 0:
+        raise ValueError("vertical_tolerance must be positive")
+
+    count = len(columns)
+    if count <= 2:
+        indices = array("i", range(count))
+        return SimplifiedTrace(columns.take(indices), indices, count)
+
+    anchors = _anchor_indices(columns, anchor_flags)
+    keep = bytearray(count)
+    for anchor in anchors:
+        keep[anchor] = 1
+    for first, last in zip(anchors, anchors[1:], strict=False):
+        _douglas_peucker(
+            columns, first, last, horizontal_tolerance, vertical_tolerance, keep
+        )
+
+    indices = array("i", [i for i, kept in enumerate(keep) if kept])
+    return SimplifiedTrace(columns.take(indices), indices, count)
@@ -0,0 +1,151 @@
+import gzip
+import struct
+from pathlib import Path
+
+import pytest
+
+TRACE_RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+
+@pytest.fixture
+def traces_tree(tmp_path):
+    """Build a small readsb-like traces/ tree of gzipped trace files."""
+    payload = TRACE_RESOURCE.read_bytes()
+    icaos = ["ac134a", "ab0001", "ab0002", "c0ffee", "c0ffef"]
+    for icao in icaos:
+        directory = tmp_path / "traces" / icao[-2:]
+        directory.mkdir(parents=True, exist_ok=True)
+        patched = payload.replace(b'"ac134a"', f'"{icao}"'.encode(), 1)
+        (directory / f"trace_full_{icao}.json").write_bytes(gzip.compress(patched))
+    (tmp_path / "traces" / "notes.txt").write_text("ignored")
+    return tmp_path / "traces"
+
+
+HEATMAP_MAGIC = 0x0E7F7C9D
+HEATMAP_START = 1723420800.0  # 2024-08-12 00:00:00 UTC
+
+
+def _signed32(value):
+    return value - (1 << 32) if value & (1 << 31) else value
+
+
+def pack_heatmap_separator(timestamp, fmt="<IiiHH"):
+    """Pack a timestamp separator record."""
+    ms = round(timestamp * 1000)
+    return struct.pack(
+        fmt, HEATMAP_MAGIC, _signed32(ms >> 32), _signed32(ms & 0xFFFFFFFF), 0, 0
+    )
+
+
+def pack_heatmap_position(addr, lat, lon, alt, gs, fmt="<IiiHH"):
+    """Pack a position record from decoded units."""
+    return struct.pack(fmt, addr, round(lat * 1e6), round(lon * 1e6), alt // 25, gs)
+
+
+def pack_heatmap_callsign(addr, callsign, fmt="<IiiHH"):
+    """Pack a callsign record."""
+    raw = callsign.encode().ljust(8, b"\x00")
+    lon, alt, gs = struct.unpack("<IHH", raw)
+    return struct.pack(fmt, addr, 1 << 30, _signed32(lon), alt, gs)
+
+
+def build_heatmap_bytes(fmt="<IiiHH", chunks=3, start=HEATMAP_START, spacing=10):
+    """Build a small heatmap slot with a few aircraft over several chunks."""
+    records = []
+    for chunk in range(chunks):
+        records.append(pack_heatmap_separator(start + spacing * chunk, fmt))
+        records.append(pack_heatmap_callsign(0xABC123, "UAL123", fmt))
+        for addr, lat, lon in (
+            (0xABC123, 40.0, -75.0),
+            (0x3C6DD4, 50.0, 8.5),
+            (0xA00001, 33.9, -118.4),
+        ):
+            records.append(
+                pack_heatmap_position(
+                    addr, lat + 0.01 * chunk, lon, 30000 + 25 * chunk, 4500, fmt
+                )
+            )
+    return b"".join(records)
+
+
+def pack_heatmap_altitude_code(addr, lat, lon, alt_code, gs, fmt="<IiiHH"):
+    """Pack a position record with a raw int16 altitude code (25 ft units)."""
+    return struct.pack(
+        fmt, addr, round(lat * 1e6), round(lon * 1e6), alt_code & 0xFFFF, gs
+    )
+
+
+@pytest.fixture
+def special_heatmap_bytes():
+    """Fixture providing a slot with readsb's special and negative values.
+
+    It holds a ground position of abc123, an unknown altitude of 3c6dd4,
+    a position of a00001 at -1000 ft and 7- and 8-character callsigns.
+    """
+    return b"".join(
+        [
+            pack_heatmap_separator(HEATMAP_START),
+            pack_heatmap_callsign(0xABC123, "SWA1234"),
+            pack_heatmap_callsign(0xA00001, "N12345AB"),
+            pack_heatmap_altitude_code(0xABC123, 40.0, -75.0, -123, 50),
+            pack_heatmap_altitude_code(0x3C6DD4, 50.0, 8.5, -124, 0xFFFF),
+            pack_heatmap_altitude_code(0xA00001, 33.9, -118.4, -40, 1200),
+            pack_heatmap_separator(HEATMAP_START + 10),
+            pack_heatmap_altitude_code(0xABC123, 40.1, -75.0, 40, 1300),
+        ]
+    )
+
+
+@pytest.fixture
+def heatmap_bytes():
+    """Fixture providing the bytes of a small little-endian heatmap slot."""
+    return build_heatmap_bytes()
+
+
+@pytest.fixture
+def heatmap_file(tmp_path, heatmap_bytes):
+    """Fixture providing a gzipped heatmap slot file."""
+    path = tmp_path / "16.bin.ttf"
+    path.write_bytes(gzip.compress(heatmap_bytes))
+    return path
+
+
+@pytest.fixture
+def heatmap_files(tmp_path):
+    """Fixture providing eight gzipped heatmap files of 2 to 9 chunks."""
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"{i:02d}.bin.ttf"
+        data = build_heatmap_bytes(chunks=2 + i, start=HEATMAP_START + i)
+        path.write_bytes(gzip.compress(data))
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def large_heatmap_files(tmp_path):
+    """Fixture providing four uncompressed heatmap files of 20000 chunks."""
+    data = build_heatmap_bytes(chunks=20_000)
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"large_{i}.bin"
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def heatmap_archive(tmp_path):
+    """Fixture providing a globe_history tree spanning two days.
+
+    Slots 00 and 01 of 2024-08-12, 47 of 2024-08-12 and 00 of 2024-08-13
+    exist, each with three chunks ten minutes apart.
+    """
+    root = tmp_path / "globe_history"
+    for day, slot in ((12, 0), (12, 1), (12, 47), (13, 0)):
+        start = HEATMAP_START + (day - 12) * 86400 + slot * 1800
+        directory = root / "2024" / "08" / f"{day:02d}" / "heatmap"
+        directory.mkdir(parents=True, exist_ok=True)
+        data = build_heatmap_bytes(start=start, spacing=600)
+        (directory / f"{slot:02d}.bin.ttf").write_bytes(gzip.compress(data))
+    return root
@@ -0,0 +1,213 @@
+import csv
+import gzip
+import importlib.util
+import json
+import subprocess
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.cli import RecordFilter, main, parse_filters
+from pyreadsb.traces_decoder import process_traces_from_file
+from pyreadsb.traces_index import TraceIndex
+
+RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+
+def read_csv(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+class TestParseFilters:
+    def test_all_filters(self):
+        """Test parsing of every filter kind."""
+        parsed = parse_filters(
+            [
+                "bbox=40,-80,45,-70",
+                "hex=ABC123,~3c6dd4",
+                "start=2024-08-12T00:10",
+                "end=1723421400",
+            ]
+        )
+        assert parsed.bbox == (40.0, -80.0, 45.0, -70.0)
+        assert parsed.addresses == frozenset({0xABC123, 0x3C6DD4})
+        assert parsed.start == datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        assert parsed.end == datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        assert parse_filters([]) == RecordFilter()
+
+    @pytest.mark.parametrize(
+        "spec", ["bbox=1,2,3", "colour=red", "hex", "start=yesterday", "hex=xyz"]
+    )
+    def test_invalid_filters(self, spec):
+        """Test that malformed filters are rejected."""
+        with pytest.raises(ValueError):
+            parse_filters([spec])
+
+
+class TestConvert:
+    def test_heatmap_to_csv(self, heatmap_file, tmp_path):
+        """Test converting a heatmap file to CSV."""
+        output = tmp_path / "out.csv"
+        assert main(["convert", str(heatmap_file), "-o", str(output), "-q"]) == 0
+
+        rows = read_csv(output)
+        assert len(rows) == 9
+        assert rows[0]["hex_id"] == "abc123"
+        assert rows[0]["callsign"] == "UAL123"
+        assert rows[0]["altitude"] == "30000"
+        assert float(rows[0]["timestamp"]) == 1723420800.0
+        assert rows[1]["callsign"] == ""
+
+    def test_heatmap_filters(self, heatmap_file, tmp_path):
+        """Test time, address and bounding box pushdown on heatmap files."""
+        output = tmp_path / "out.csv"
+        args = ["convert", str(heatmap_file), "-o", str(output), "-q"]
+
+        main([*args, "-f", "start=1723420810", "-f", "end=1723420810"])
+        assert {row["timestamp"] for row in read_csv(output)} == {"1723420810.0"}
+
+        main([*args, "-f", "hex=3c6dd4,a00001"])
+        assert {row["hex_id"] for row in read_csv(output)} == {"3c6dd4", "a00001"}
+
+        main([*args, "-f", "bbox=45,0,55,10"])
+        assert {row["hex_id"] for row in read_csv(output)} == {"3c6dd4"}
+
+    def test_heatmap_special_values(self, special_heatmap_bytes, tmp_path):
+        """Test that ground, unknown and negative altitudes are exported."""
+        path = tmp_path / "16.bin.ttf"
+        path.write_bytes(gzip.compress(special_heatmap_bytes))
+        output = tmp_path / "out.ndjson"
+        assert main(["convert", str(path), "-o", str(output), "-q"]) == 0
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [
+            (r["hex_id"], r["callsign"], r["altitude"], r["on_ground"]) for r in records
+        ] == [
+            ("abc123", "SWA1234", None, True),
+            ("3c6dd4", None, None, False),
+            ("a00001", "N12345AB", -1000, False),
+            ("abc123", "SWA1234", 1000, False),
+        ]
+        assert records[0]["ground_speed"] == 5.0
+        assert records[1]["ground_speed"] is None
+
+    def test_traces_to_ndjson(self, tmp_path):
+        """Test converting a trace file with a time window."""
+        output = tmp_path / "out.ndjson"
+        start = datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        end = datetime(2024, 8, 12, 0, 20, tzinfo=UTC)
+        argv = ["convert", str(RESOURCE), "-o", str(output), "-q"]
+        argv += ["-f", f"start={start.isoformat()}", "-f", f"end={end.isoformat()}"]
+        assert main(argv) == 0
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        expected = list(process_traces_from_file(RESOURCE, start=start, end=end))
+        assert len(records) == len(expected)
+        assert records[0]["hex_id"] == "ac134a"
+        assert records[0]["latitude"] == expected[0].latitude
+        assert records[0]["timestamp"] == pytest.approx(
+            expected[0].timestamp.timestamp()
+        )
+
+    def test_parallel_matches_serial(self, traces_tree, tmp_path):
+        """Test that --jobs keeps the output identical and in order."""
+        serial = tmp_path / "serial.csv"
+        parallel = tmp_path / "parallel.csv"
+        main(["convert", str(traces_tree), "-o", str(serial), "-q"])
+        main(["convert", str(traces_tree), "-o", str(parallel), "-q", "-j", "3"])
+
+        assert serial.read_bytes() == parallel.read_bytes()
+        hex_ids = [row["hex_id"] for row in read_csv(serial)]
+        assert sorted(set(hex_ids)) == [
+            "ab0001",
+            "ab0002",
+            "ac134a",
+            "c0ffee",
+            "c0ffef",
+        ]
+
+    def test_trace_address_filter_skips_files(self, traces_tree, tmp_path):
+        """Test that the address filter selects whole trace files."""
+        output = tmp_path / "out.csv"
+        main(["convert", str(traces_tree), "-o", str(output), "-q", "-f", "hex=c0ffee"])
+        assert {row["hex_id"] for row in read_csv(output)} == {"c0ffee"}
+
+    def test_mixed_inputs_are_rejected(self, heatmap_file, tmp_path):
+        """Test that heatmap and trace files cannot share one output."""
+        with pytest.raises(SystemExit) as excinfo:
+            main(["convert", str(heatmap_file), str(RESOURCE), "-o", "-", "-q"])
+        assert excinfo.value.code == 2
+
+    def test_unreadable_file_is_reported(self, heatmap_file, tmp_path):
+        """Test that a missing input is skipped with a non-zero status."""
+        output = tmp_path / "out.csv"
+        missing = tmp_path / "missing.bin.ttf"
+        argv = ["convert", str(heatmap_file), str(missing), "-o", str(output), "-q"]
+        assert main(argv) == 1
+        assert len(read_csv(output)) == 9
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("pyarrow") is None, reason="requires pyarrow"
+    )
+    def test_parquet(self, heatmap_file, tmp_path):
+        """Test Parquet output."""
+        import pyarrow.parquet as pq
+
+        output = tmp_path / "out.parquet"
+        assert main(["convert", str(heatmap_file), "-o", str(output), "-q"]) == 0
+        table = pq.read_table(output)
+        assert table.num_rows == 9
+        assert table.column("hex_id")[0].as_py() == "abc123"
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("pyarrow") is not None, reason="pyarrow installed"
+    )
+    def test_parquet_without_pyarrow(self, heatmap_file, tmp_path):
+        """Test the message shown when pyarrow is missing."""
+        output = tmp_path / "out.parquet"
+        with pytest.raises(SystemExit, match="pyarrow"):
+            main(["convert", str(heatmap_file), "-o", str(output), "-q"])
+
+
+class TestStatsAndIndex:
+    def test_stats(self, heatmap_archive, capsys):
+        """Test the JSON statistics of a heatmap archive."""
+        argv = ["stats", str(heatmap_archive), "--reference", "50.1,8.7", "-q"]
+        assert main([*argv, "--per-file", "-j", "2"]) == 0
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert len(lines) == 5
+        total = lines[-1]
+        assert total["source"] == "total"
+        assert total["positions"] == 36
+        assert total["distinct_aircraft"] == 3
+        assert total["distance_bands_km"]["<50"] == 12
+        assert sum(line["positions"] for line in lines[:-1]) == 36
+
+    def test_index(self, traces_tree, tmp_path):
+        """Test building a trace index."""
+        output = tmp_path / "traces.idx"
+        assert main(["index", str(traces_tree), "-o", str(output), "-q"]) == 0
+        assert len(TraceIndex.load(output).paths) == 5
+
+    def test_runtime_error_is_not_a_usage_error(self, traces_tree, tmp_path, caplog):
+        """Test that a failure while running exits with 1, without the usage."""
+        output = tmp_path / "traces.idx"
+        argv = ["index", str(traces_tree), "-o", str(output), "--cell-degrees", "0"]
+        assert main([*argv, "-q"]) == 1
+        assert "cell_degrees must be positive" in caplog.text
+
+
+def test_startup_imports_are_lazy():
+    """Test that loading the CLI does not import the decoders."""
+    code = (
+        "import sys, pyreadsb.cli; "
+        "print(sorted(m for m in sys.modules if m.startswith('pyreadsb.')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "['pyreadsb.cli']"
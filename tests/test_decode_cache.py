@@ -0,0 +1,171 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.decode_cache import DecodeCache
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.traces_decoder import process_traces_from_file
+
+TRACE_RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture providing an empty decode cache."""
+    return DecodeCache(tmp_path / "cache")
+
+
+def cache_entries(cache):
+    return sorted(p for p in cache.directory.iterdir() if not p.name.endswith(".tmp"))
+
+
+class TestDecodeCache:
+    def test_heatmap_hit_matches_decode(self, cache, heatmap_file):
+        """Test that cached heatmap decoding yields the same entries."""
+        decoder = HeatmapDecoder()
+        expected = list(decoder.decode_from_file(heatmap_file))
+
+        assert list(decoder.decode_from_file(heatmap_file, cache=cache)) == expected
+        assert len(cache_entries(cache)) == 1
+        assert list(decoder.decode_from_file(heatmap_file, cache=cache)) == expected
+
+    def test_trace_hit_matches_decode(self, cache):
+        """Test that cached trace decoding yields the same entries."""
+        expected = list(process_traces_from_file(TRACE_RESOURCE))
+
+        assert list(process_traces_from_file(TRACE_RESOURCE, cache=cache)) == expected
+        entry = cache_entries(cache)[0]
+        mtime = entry.stat().st_mtime_ns
+        os.utime(entry, ns=(mtime - 10**9, mtime - 10**9))
+
+        assert list(process_traces_from_file(TRACE_RESOURCE, cache=cache)) == expected
+        assert cache_entries(cache) == [entry]
+        assert entry.stat().st_mtime_ns > mtime - 10**9
+
+    def test_trace_window_from_cache(self, cache):
+        """Test that time windows apply to cached traces."""
+        start = datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        end = datetime(2024, 8, 12, 0, 20, tzinfo=UTC)
+        expected = list(process_traces_from_file(TRACE_RESOURCE, start=start, end=end))
+        list(process_traces_from_file(TRACE_RESOURCE, cache=cache))
+
+        assert (
+            list(
+                process_traces_from_file(
+                    TRACE_RESOURCE, cache=cache, start=start, end=end
+                )
+            )
+            == expected
+        )
+
+    def test_batches_from_cache(self, cache, heatmap_file):
+        """Test that batching applies to cached decoding."""
+        decoder = HeatmapDecoder()
+        expected = list(decoder.decode_from_file(heatmap_file))
+        list(decoder.decode_from_file(heatmap_file, cache=cache))
+        batches = list(decoder.decode_from_file(heatmap_file, cache, batch_size=4))
+        assert [entry for batch in batches for entry in batch] == expected
+
+        traces = list(process_traces_from_file(TRACE_RESOURCE))
+        batches = list(
+            process_traces_from_file(TRACE_RESOURCE, cache=cache, batch_size=100)
+        )
+        assert [entry for batch in batches for entry in batch] == traces
+
+    def test_changed_file_invalidates_entry(self, cache, heatmap_file):
+        """Test that modifying the source file misses the old entry."""
+        decoder = HeatmapDecoder()
+        list(decoder.decode_from_file(heatmap_file, cache=cache))
+        stat = heatmap_file.stat()
+        os.utime(heatmap_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        list(decoder.decode_from_file(heatmap_file, cache=cache))
+
+        assert len(cache_entries(cache)) == 2
+
+    def test_corrupt_entry_is_discarded(self, cache, heatmap_file):
+        """Test that an unreadable entry is replaced by a fresh decode."""
+        decoder = HeatmapDecoder()
+        expected = list(decoder.decode_from_file(heatmap_file, cache=cache))
+        cache_entries(cache)[0].write_bytes(b"garbage")
+
+        assert list(decoder.decode_from_file(heatmap_file, cache=cache)) == expected
+
+    def test_entry_evicted_during_read_is_a_hit(self, cache, heatmap_file, monkeypatch):
+        """Test that an entry removed after it was read still serves the hit."""
+        decoder = HeatmapDecoder()
+        expected = list(decoder.decode_from_file(heatmap_file, cache=cache))
+
+        def evicted(path, *args, **kwargs):
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(os, "utime", evicted)
+        assert list(decoder.decode_from_file(heatmap_file, cache=cache)) == expected
+        assert len(cache_entries(cache)) == 1
+
+    def test_lru_eviction(self, tmp_path, heatmap_file):
+        """Test that the least recently used entries are evicted over budget."""
+        cache = DecodeCache(tmp_path / "cache", max_bytes=1)
+        list(HeatmapDecoder().decode_from_file(heatmap_file, cache=cache))
+        assert cache_entries(cache) == []
+
+        cache = DecodeCache(tmp_path / "cache2", max_bytes=1 << 20)
+        list(HeatmapDecoder().decode_from_file(heatmap_file, cache=cache))
+        list(process_traces_from_file(TRACE_RESOURCE, cache=cache))
+        heatmap_entry = next(p for p in cache_entries(cache) if p.suffix == ".heatmap")
+        trace_size = (
+            next(p for p in cache_entries(cache) if p.suffix == ".trace").stat().st_size
+        )
+        cache.max_bytes = trace_size + heatmap_entry.stat().st_size - 1
+        os.utime(heatmap_entry, ns=(0, 0))
+        cache._evict()
+
+        assert [p.suffix for p in cache_entries(cache)] == [".trace"]
+
+    def test_directory_is_scanned_only_over_budget(
+        self, cache, traces_tree, monkeypatch
+    ):
+        """Test that writes under budget only grow the running size estimate."""
+        scans = []
+        evict = DecodeCache._evict
+        monkeypatch.setattr(
+            DecodeCache, "_evict", lambda self: scans.append(1) or evict(self)
+        )
+        paths = sorted(traces_tree.rglob("trace_full_*.json"))
+        for path in paths:
+            cache.trace_columns(path)
+
+        assert len(scans) == 1
+        assert cache.size == sum(p.stat().st_size for p in cache_entries(cache))
+
+        cache.max_bytes = cache.size - 1
+        cache.trace_columns(TRACE_RESOURCE)
+        assert len(scans) == 2
+        assert cache.size <= cache.max_bytes
+        assert len(cache_entries(cache)) < len(paths) + 1
+
+    def test_concurrent_writes_from_threads(self, cache, large_heatmap_files, caplog):
+        """Test that threads missing on the same file never clobber each other."""
+        path = large_heatmap_files[0]
+        expected = HeatmapDecoder().decode_columns_from_file(path)
+        barrier = threading.Barrier(8)
+
+        def fill(_):
+            barrier.wait()
+            return cache.heatmap_columns(path)
+
+        with caplog.at_level("WARNING"), ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(fill, range(8)))
+
+        assert not caplog.records
+        assert all(result == expected for result in results)
+        assert [p.suffix for p in cache.directory.iterdir()] == [".heatmap"]
+        assert cache.heatmap_columns(path) == expected
+
+    def test_invalid_budget(self, tmp_path):
+        """Test that a non-positive budget is rejected."""
+        with pytest.raises(ValueError):
+            DecodeCache(tmp_path, max_bytes=0)
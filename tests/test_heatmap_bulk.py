@@ -0,0 +1,120 @@
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from pyreadsb.heatmap_bulk import decode_heatmap_files
+from pyreadsb.heatmap_decoder import DecodeContext, HeatmapDecoder
+
+
+class TestDecodeContext:
+    def test_context_receives_state(self, heatmap_bytes):
+        """Test that a context keeps the decoder itself untouched."""
+        decoder = HeatmapDecoder()
+        context = DecodeContext()
+        entries = list(decoder.decode_from_bytes(heatmap_bytes, context=context))
+
+        separators = [e for e in entries if isinstance(e, decoder.TimestampSeparator)]
+        assert context.current_timestamp == separators[-1].timestamp
+        assert decoder.current_timestamp is None
+        assert entries == list(HeatmapDecoder().decode_from_bytes(heatmap_bytes))
+
+    def test_context_on_every_path(self, heatmap_bytes, heatmap_file):
+        """Test that all decoding paths honour the context."""
+        decoder = HeatmapDecoder()
+        expected = list(decoder.decode_from_bytes(heatmap_bytes))
+        last = decoder.current_timestamp
+        decoder = HeatmapDecoder()
+
+        results = [
+            lambda c: decoder.decode_from_bytes(heatmap_bytes, batch_size=3, context=c),
+            lambda c: decoder.decode_from_file(heatmap_file, context=c),
+            lambda c: decoder.decode_from_file(heatmap_file, batch_size=5, context=c),
+            lambda c: decoder.entries_from_columns(
+                decoder.decode_columns_from_file(heatmap_file), context=c
+            ),
+        ]
+        for decode in results:
+            context = DecodeContext()
+            output = list(decode(context))
+            if output and isinstance(output[0], list):
+                output = [entry for batch in output for entry in batch]
+            assert output == expected
+            assert context.current_timestamp == last
+        assert decoder.current_timestamp is None
+
+    def test_shared_decoder_across_threads(self, heatmap_files):
+        """Test concurrent calls on one decoder with per-thread contexts."""
+        decoder = HeatmapDecoder()
+        barrier = threading.Barrier(len(heatmap_files))
+        results: dict[int, datetime | None] = {}
+
+        def run(i: int) -> None:
+            context = DecodeContext()
+            barrier.wait()
+            for _ in decoder.decode_from_file(heatmap_files[i], context=context):
+                pass
+            results[i] = context.current_timestamp
+
+        threads = [
+            threading.Thread(target=run, args=(i,)) for i in range(len(heatmap_files))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i, path in enumerate(heatmap_files):
+            sequential = HeatmapDecoder()
+            for _ in sequential.decode_from_file(path):
+                pass
+            assert results[i] == sequential.current_timestamp
+        assert decoder.current_timestamp is None
+
+
+class TestDecodeHeatmapFiles:
+    def test_matches_sequential_decoding(self, heatmap_files):
+        """Test that threaded results equal sequential decoding, in order."""
+        decoder = HeatmapDecoder()
+        results = list(decode_heatmap_files(heatmap_files, max_workers=4))
+
+        assert [path for path, _ in results] == heatmap_files
+        for path, entries in results:
+            assert entries == list(decoder.decode_from_file(path))
+
+    def test_unordered(self, heatmap_files):
+        """Test that unordered mode yields every file exactly once."""
+        results = dict(
+            decode_heatmap_files(heatmap_files, max_workers=3, ordered=False)
+        )
+        assert sorted(results) == heatmap_files
+
+    def test_unreadable_file_is_skipped(self, heatmap_files, tmp_path):
+        """Test that a missing file yields no entries instead of failing."""
+        missing = tmp_path / "missing.bin.ttf"
+        results = dict(decode_heatmap_files([*heatmap_files[:2], missing]))
+        assert results[missing] == []
+        assert results[heatmap_files[0]]
+
+    def test_invalid_pending_limit(self, heatmap_files):
+        """Test that a non-positive pending limit is rejected."""
+        with pytest.raises(ValueError):
+            list(decode_heatmap_files(heatmap_files, max_pending_files=-1))
+
+    @pytest.mark.skipif(
+        getattr(sys, "_is_gil_enabled", lambda: True)(),
+        reason="requires a free-threaded interpreter",
+    )
+    def test_scales_without_gil(self, large_heatmap_files):
+        """Test near-linear scaling of CPU-bound decoding on free-threaded builds."""
+        paths = large_heatmap_files
+
+        def elapsed(workers: int) -> float:
+            start = time.perf_counter()
+            for _ in decode_heatmap_files(paths, max_workers=workers):
+                pass
+            return time.perf_counter() - start
+
+        assert elapsed(1) / elapsed(4) > 2.5
@@ -1,3 +1,4 @@
+import gzip
 import struct
 from datetime import UTC, datetime
 from pathlib import Path
@@ -5,6 +6,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from pyreadsb.decode_cache import DecodeCache
 from pyreadsb.heatmap_decoder import HeatmapDecoder
 
 
@@ -313,3 +315,145 @@ class TestHeatmapDecoderWithRealFile:
             if i >= 10:  # Just test first 10 additional entries
                 break
             assert entry is not None
+
+
+class TestHeatmapColumns:
+    """Test suite for the columnar heatmap decoder."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.decoder = HeatmapDecoder()
+
+    def test_columns_round_trip_to_entries(self, heatmap_bytes):
+        """Test that entries from columns equal the streaming decoder output."""
+        expected = list(self.decoder.decode_from_bytes(heatmap_bytes))
+        columns = self.decoder.decode_columns_from_bytes(heatmap_bytes)
+
+        assert len(columns) == len(heatmap_bytes) // 16
+        assert list(self.decoder.entries_from_columns(columns)) == expected
+
+    def test_big_endian_columns(self, heatmap_bytes):
+        """Test that big-endian files decode to the same values."""
+        swapped = b"".join(
+            struct.pack(">IiiHH", *struct.unpack_from("<IiiHH", heatmap_bytes, pos))
+            for pos in range(0, len(heatmap_bytes), 16)
+        )
+        little = self.decoder.decode_columns_from_bytes(heatmap_bytes)
+        big = self.decoder.decode_columns_from_bytes(swapped)
+
+        assert big.big_endian
+        assert big.hex_values == little.hex_values
+        assert big.latitudes == little.latitudes
+        assert big.altitudes == little.altitudes
+        assert list(self.decoder.entries_from_columns(big)) == list(
+            self.decoder.decode_from_bytes(swapped)
+        )
+
+    def test_trailing_bytes_are_ignored(self, heatmap_bytes):
+        """Test that an incomplete trailing record is dropped."""
+        columns = self.decoder.decode_columns_from_bytes(heatmap_bytes + b"\x00" * 5)
+        assert len(columns) == len(heatmap_bytes) // 16
+
+    def test_columns_from_file(self, heatmap_file, heatmap_bytes):
+        """Test decoding columns from a gzipped file."""
+        columns = self.decoder.decode_columns_from_file(heatmap_file)
+        assert columns == self.decoder.decode_columns_from_bytes(heatmap_bytes)
+
+    def test_special_values_on_every_path(self, special_heatmap_bytes, tmp_path):
+        """Test that all decoding paths agree on special altitudes and callsigns."""
+        path = tmp_path / "00.bin"
+        path.write_bytes(special_heatmap_bytes)
+        columns = self.decoder.decode_columns_from_bytes(special_heatmap_bytes)
+        expected = list(self.decoder.decode_from_bytes(special_heatmap_bytes))
+
+        assert expected[1].callsign == "SWA1234"
+        assert expected[3].alt == "ground"
+        assert expected[4].alt is None
+        assert expected[5].alt == -1000
+        assert list(self.decoder.entries_from_columns(columns)) == expected
+        assert list(self.decoder.decode_from_file(path)) == expected
+
+    def test_select_rows(self, heatmap_bytes):
+        """Test selecting chunks by time and records by box and address."""
+        columns = self.decoder.decode_columns_from_bytes(heatmap_bytes)
+        start = columns.separator_timestamp(0)
+
+        assert columns.select_rows() == list(range(len(columns)))
+        assert columns.select_rows(start + 5, start + 20, bbox=(45, 0, 55, 10)) == [
+            5,
+            6,
+            8,
+            10,
+            11,
+            13,
+        ]
+        assert columns.select_rows(start + 5, addresses={0xABC123}) == [
+            5,
+            6,
+            7,
+            10,
+            11,
+            12,
+        ]
+
+        taken = columns.take([0, 8])
+        assert taken.hex_values.tolist() == [self.decoder.MAGIC_NUMBER, 0x3C6DD4]
+        assert taken.latitudes.tolist() == [columns.latitudes[0], 50_010_000]
+
+
+class TestBatchedDecoding:
+    """Test suite for batched decoder output."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.decoder = HeatmapDecoder()
+
+    @pytest.mark.parametrize("batch_size", [1, 4, 7, 1000])
+    def test_bytes_batches_match_entries(self, heatmap_bytes, batch_size):
+        """Test that batches concatenate to the per-record output."""
+        expected = list(self.decoder.decode_from_bytes(heatmap_bytes))
+        batches = list(
+            self.decoder.decode_from_bytes(heatmap_bytes, batch_size=batch_size)
+        )
+
+        assert all(1 <= len(batch) <= batch_size for batch in batches)
+        assert [entry for batch in batches for entry in batch] == expected
+
+    @pytest.mark.parametrize("batch_size", [1, 5, 1000])
+    def test_file_batches_match_entries(self, heatmap_file, batch_size):
+        """Test batched decoding from a gzipped file."""
+        expected = list(self.decoder.decode_from_file(heatmap_file))
+        batches = list(
+            self.decoder.decode_from_file(heatmap_file, batch_size=batch_size)
+        )
+
+        assert all(1 <= len(batch) <= batch_size for batch in batches)
+        assert [entry for batch in batches for entry in batch] == expected
+
+    def test_large_file_batches_are_full(self, large_heatmap_files):
+        """Test that every batch but the last holds exactly batch_size entries."""
+        path = large_heatmap_files[0]
+        expected = list(self.decoder.decode_from_file(path))
+        batches = list(self.decoder.decode_from_file(path, batch_size=3001))
+
+        assert {len(batch) for batch in batches[:-1]} == {3001}
+        assert [entry for batch in batches for entry in batch] == expected
+
+    def test_special_values_in_batches(self, special_heatmap_bytes, tmp_path):
+        """Test that batches decode ground, unknown and negative values alike."""
+        path = tmp_path / "16.bin.ttf"
+        path.write_bytes(gzip.compress(special_heatmap_bytes))
+        expected = list(self.decoder.decode_from_bytes(special_heatmap_bytes))
+        cache = DecodeCache(tmp_path / "cache")
+
+        for batches in (
+            self.decoder.decode_from_bytes(special_heatmap_bytes, batch_size=3),
+            self.decoder.decode_from_file(path, batch_size=3),
+            self.decoder.decode_from_file(path, cache, batch_size=3),
+        ):
+            assert [entry for batch in batches for entry in batch] == expected
+
+    def test_invalid_batch_size(self, heatmap_bytes):
+        """Test that a non-positive batch size is rejected."""
+        with pytest.raises(ValueError):
+            list(self.decoder.decode_from_bytes(heatmap_bytes, batch_size=0))
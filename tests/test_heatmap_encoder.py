@@ -0,0 +1,210 @@
+import gzip
+import importlib.util
+import io
+import sys
+from datetime import UTC, datetime
+
+import pytest
+
+from pyreadsb.compression_utils import detect_compression
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.heatmap_encoder import HeatmapEncoder, encode_heatmap_bytes
+
+
+def comparable(entries):
+    """Replace separators by their timestamp, since raw data is byte-order specific."""
+    return [
+        e.timestamp if isinstance(e, HeatmapDecoder.TimestampSeparator) else e
+        for e in entries
+    ]
+
+
+class TestRoundTrip:
+    def test_columns_are_copied_exactly(self, heatmap_bytes):
+        """Test that raw columns encode back to the original bytes."""
+        columns = HeatmapDecoder().decode_columns_from_bytes(heatmap_bytes)
+        assert encode_heatmap_bytes(columns) == heatmap_bytes
+
+    def test_entries_are_copied_exactly(self, heatmap_bytes):
+        """Test that decoder entries encode back to the original bytes."""
+        entries = HeatmapDecoder().decode_from_bytes(heatmap_bytes)
+        assert encode_heatmap_bytes(entries) == heatmap_bytes
+
+    def test_special_values_are_copied_exactly(self, special_heatmap_bytes):
+        """Test that ground, unknown, negative and 8-byte callsign records survive."""
+        entries = list(HeatmapDecoder().decode_from_bytes(special_heatmap_bytes))
+        assert encode_heatmap_bytes(entries) == special_heatmap_bytes
+
+        values = [
+            (e.alt, e.ground_speed)
+            for e in entries
+            if isinstance(e, HeatmapDecoder.HeatEntry)
+        ]
+        assert values == [("ground", 5.0), (None, None), (-1000, 120.0), (1000, 130.0)]
+        callsigns = [
+            e.callsign for e in entries if isinstance(e, HeatmapDecoder.CallsignEntry)
+        ]
+        assert callsigns == ["SWA1234", "N12345AB"]
+
+    def test_batches(self, heatmap_bytes):
+        """Test that batched decoder output is accepted."""
+        batches = HeatmapDecoder().decode_from_bytes(heatmap_bytes, batch_size=4)
+        assert encode_heatmap_bytes(batches) == heatmap_bytes
+
+    def test_big_endian(self, heatmap_bytes):
+        """Test that big-endian output decodes to the same entries."""
+        decoder = HeatmapDecoder()
+        columns = decoder.decode_columns_from_bytes(heatmap_bytes)
+        data = encode_heatmap_bytes(columns, big_endian=True)
+        assert data != heatmap_bytes
+        assert decoder.decode_columns_from_bytes(data).big_endian
+        assert comparable(decoder.decode_from_bytes(data)) == comparable(
+            decoder.decode_from_bytes(heatmap_bytes)
+        )
+
+    def test_big_endian_entries(self, heatmap_bytes):
+        """Test that separators are rebuilt when the byte order changes."""
+        decoder = HeatmapDecoder()
+        expected = list(decoder.decode_from_bytes(heatmap_bytes))
+        data = encode_heatmap_bytes(expected, big_endian=True)
+        assert comparable(decoder.decode_from_bytes(data)) == comparable(expected)
+
+    def test_selected_rows(self, heatmap_bytes):
+        """Test writing a subset of rows, as for a regional extract."""
+        decoder = HeatmapDecoder()
+        columns = decoder.decode_columns_from_bytes(heatmap_bytes)
+        rows = [
+            i
+            for i in range(len(columns))
+            if columns.hex_values[i] in (decoder.MAGIC_NUMBER, 0x3C6DD4)
+        ]
+        buffer = io.BytesIO()
+        with HeatmapEncoder(buffer) as encoder:
+            encoder.write_columns(columns, rows)
+        data = buffer.getvalue()
+        assert encoder.records == len(rows) == 6
+
+        entries = list(decoder.decode_from_bytes(data))
+        assert {e.hex_id for e in entries if hasattr(e, "hex_id")} == {"3c6dd4"}
+        assert len(entries) == 6
+
+
+class TestRecords:
+    def test_written_values(self):
+        """Test the units and special values of written records."""
+        timestamp = datetime(2024, 8, 12, 0, 0, 1, 500000, tzinfo=UTC)
+        buffer = io.BytesIO()
+        with HeatmapEncoder(buffer) as encoder:
+            encoder.write_separator(timestamp)
+            encoder.write_callsign("abc123", "DLH4")
+            encoder.write_callsign("abc123", None)
+            encoder.write_position("abc123", 51.470022, -0.454295, 35000, 451.3)
+            encoder.write_position("~abc123", 33.9, -151.2, 100, None)
+        assert encoder.records == 5
+
+        decoder = HeatmapDecoder()
+        separator, callsign, empty, position, other = decoder.decode_from_bytes(
+            buffer.getvalue()
+        )
+        assert separator.timestamp == timestamp
+        assert callsign == HeatmapDecoder.CallsignEntry("abc123", "DLH4")
+        assert empty == HeatmapDecoder.CallsignEntry("abc123", None)
+        assert position == HeatmapDecoder.HeatEntry(
+            "abc123", 51.470022, -0.454295, 35000, 451.3
+        )
+        assert other == HeatmapDecoder.HeatEntry("abc123", 33.9, -151.2, 100, None)
+        columns = decoder.decode_columns_from_bytes(buffer.getvalue())
+        assert columns.hex_values[4] == 0xABC123 | 1 << 24
+
+    def test_readsb_special_altitudes(self):
+        """Test that ground and unknown altitudes use readsb's int16 codes."""
+        buffer = io.BytesIO()
+        with HeatmapEncoder(buffer) as encoder:
+            encoder.write_position("abc123", 0.0, 0.0, "ground", 0.0)
+            encoder.write_position("abc123", 0.0, 0.0, None, 0.0)
+            encoder.write_position("abc123", 0.0, 0.0, -100, 0.0)
+        columns = HeatmapDecoder().decode_columns_from_bytes(buffer.getvalue())
+        assert list(columns.altitudes) == [-123 & 0xFFFF, -124 & 0xFFFF, -4 & 0xFFFF]
+
+    @pytest.mark.parametrize(
+        ("method", "args"),
+        [
+            ("write_position", ("abc123", 91.0, 0.0, 1000, 100.0)),
+            ("write_position", ("abc123", 0.0, 0.0, 1_000_000, 100.0)),
+            ("write_position", ("abc123", 0.0, 0.0, 1000, 7000.0)),
+            ("write_position", ("1abc123", 0.0, 0.0, 1000, 100.0)),
+            ("write_position", (HeatmapDecoder.MAGIC_NUMBER, 0.0, 0.0, 0, 0.0)),
+            ("write_callsign", ("abc123", "TOOLONGCS")),
+            ("write_separator", (-1.0,)),
+        ],
+    )
+    def test_invalid_values(self, method, args):
+        """Test that values readsb cannot represent are rejected."""
+        encoder = HeatmapEncoder(io.BytesIO())
+        with pytest.raises(ValueError):
+            getattr(encoder, method)(*args)
+        assert encoder.records == 0
+
+    def test_buffered_output(self):
+        """Test that records reach the stream in blocks and on flush."""
+        buffer = io.BytesIO()
+        encoder = HeatmapEncoder(buffer)
+        for _ in range(10):
+            encoder.write_position("abc123", 1.0, 2.0, 1000, 100.0)
+        assert buffer.getvalue() == b""
+        encoder.flush()
+        assert len(buffer.getvalue()) == 160
+        for _ in range(5000):
+            encoder.write_position("abc123", 1.0, 2.0, 1000, 100.0)
+        assert len(buffer.getvalue()) >= 1 << 16
+        encoder.close()
+        assert len(buffer.getvalue()) == 5010 * 16
+        assert not buffer.closed
+
+
+class TestFiles:
+    def test_gzipped_slot(self, heatmap_bytes, tmp_path):
+        """Test that .bin.ttf files are gzipped, as readsb writes them."""
+        decoder = HeatmapDecoder()
+        path = tmp_path / "00.bin.ttf"
+        with HeatmapEncoder.open(path) as encoder:
+            encoder.write_entries(decoder.decode_from_bytes(heatmap_bytes))
+        assert detect_compression(path) == "gzip"
+        assert gzip.decompress(path.read_bytes()) == heatmap_bytes
+        assert list(decoder.decode_from_file(path)) == list(
+            decoder.decode_from_bytes(heatmap_bytes)
+        )
+
+    def test_uncompressed(self, heatmap_file, tmp_path):
+        """Test writing an uncompressed copy of a slot file."""
+        decoder = HeatmapDecoder()
+        path = tmp_path / "copy.bin"
+        with HeatmapEncoder.open(path) as encoder:
+            encoder.write_columns(decoder.decode_columns_from_file(heatmap_file))
+        assert path.read_bytes() == gzip.decompress(heatmap_file.read_bytes())
+
+    def test_unknown_compression(self, tmp_path):
+        """Test that an unknown compression is rejected."""
+        with pytest.raises(ValueError, match="compression"):
+            HeatmapEncoder.open(tmp_path / "x.bin", compression="lz4")  # type: ignore[arg-type]
+
+    def test_detect_zstd(self, tmp_path):
+        """Test that Zstandard files are recognised by their magic bytes."""
+        path = tmp_path / "00.bin"
+        path.write_bytes(b"\x28\xb5\x2f\xfd" + bytes(12))
+        assert detect_compression(path) == "zstd"
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("zstandard") is None and sys.version_info < (3, 14),
+        reason="requires zstd support",
+    )
+    def test_zstd(self, heatmap_bytes, tmp_path):
+        """Test Zstandard output, read back by the decoder."""
+        decoder = HeatmapDecoder()
+        path = tmp_path / "00.bin.zst"
+        with HeatmapEncoder.open(path, level=3) as encoder:
+            encoder.write_columns(decoder.decode_columns_from_bytes(heatmap_bytes))
+        assert detect_compression(path) == "zstd"
+        assert list(decoder.decode_from_file(path)) == list(
+            decoder.decode_from_bytes(heatmap_bytes)
+        )
@@ -0,0 +1,134 @@
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.heatmap_query import query_heatmap, slot_files, slot_path
+
+
+def separator_times(entries):
+    return [
+        entry.timestamp
+        for entry in entries
+        if isinstance(entry, HeatmapDecoder.TimestampSeparator)
+    ]
+
+
+class TestSlotFiles:
+    def test_slot_path(self):
+        """Test the archive layout of a slot file."""
+        path = slot_path(Path("gh"), datetime(2024, 8, 12, 23, 45, tzinfo=UTC))
+        assert path == Path("gh/2024/08/12/heatmap/47.bin.ttf")
+
+    def test_slot_files_across_days(self, heatmap_archive):
+        """Test that a multi-day range maps to the existing slots in order."""
+        files = slot_files(
+            heatmap_archive,
+            datetime(2024, 8, 12, 0, 40, tzinfo=UTC),
+            datetime(2024, 8, 13, 0, 5, tzinfo=UTC),
+        )
+        assert [path.name for _, path in files] == [
+            "01.bin.ttf",
+            "47.bin.ttf",
+            "00.bin.ttf",
+        ]
+
+
+class TestQueryHeatmap:
+    def test_boundary_slots_are_trimmed(self, heatmap_archive):
+        """Test that only chunks within the window are returned."""
+        start = datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        end = datetime(2024, 8, 13, 0, 10, tzinfo=UTC)
+        entries = list(query_heatmap(heatmap_archive, start, end))
+
+        assert separator_times(entries) == [
+            datetime(2024, 8, 12, 0, 10, tzinfo=UTC),
+            datetime(2024, 8, 12, 0, 20, tzinfo=UTC),
+            datetime(2024, 8, 12, 0, 30, tzinfo=UTC),
+            datetime(2024, 8, 12, 0, 40, tzinfo=UTC),
+            datetime(2024, 8, 12, 0, 50, tzinfo=UTC),
+            datetime(2024, 8, 12, 23, 30, tzinfo=UTC),
+            datetime(2024, 8, 12, 23, 40, tzinfo=UTC),
+            datetime(2024, 8, 12, 23, 50, tzinfo=UTC),
+            datetime(2024, 8, 13, 0, 0, tzinfo=UTC),
+            datetime(2024, 8, 13, 0, 10, tzinfo=UTC),
+        ]
+        heat_entries = [e for e in entries if isinstance(e, HeatmapDecoder.HeatEntry)]
+        assert len(heat_entries) == 10 * 3
+
+    def test_chunks_match_full_decode(self, heatmap_archive):
+        """Test that a whole slot window yields what decode_from_file yields."""
+        path = heatmap_archive / "2024" / "08" / "12" / "heatmap" / "00.bin.ttf"
+        expected = list(HeatmapDecoder().decode_from_file(path))
+        entries = list(
+            query_heatmap(
+                heatmap_archive,
+                datetime(2024, 8, 12, 0, 0, tzinfo=UTC),
+                datetime(2024, 8, 12, 0, 29, tzinfo=UTC),
+            )
+        )
+        assert entries == expected
+
+    def test_spatial_and_address_filters(self, heatmap_archive):
+        """Test bbox and address pushdown."""
+        start = datetime(2024, 8, 12, 0, 0, tzinfo=UTC)
+        end = datetime(2024, 8, 12, 0, 59, tzinfo=UTC)
+
+        in_box = [
+            e
+            for e in query_heatmap(heatmap_archive, start, end, bbox=(45, 0, 55, 10))
+            if isinstance(e, HeatmapDecoder.HeatEntry)
+        ]
+        assert {e.hex_id for e in in_box} == {"3c6dd4"}
+        assert len(in_box) == 6
+
+        by_address = [
+            e
+            for e in query_heatmap(heatmap_archive, start, end, hex_ids=["ABC123"])
+            if not isinstance(e, HeatmapDecoder.TimestampSeparator)
+        ]
+        assert {e.hex_id for e in by_address} == {"abc123"}
+        assert any(isinstance(e, HeatmapDecoder.CallsignEntry) for e in by_address)
+
+    @pytest.mark.skipif(not hasattr(time, "tzset"), reason="requires time.tzset")
+    def test_naive_datetimes_are_local_time(self, heatmap_archive, monkeypatch):
+        """Test that naive bounds are read as local time, like timestamp()."""
+        monkeypatch.setenv("TZ", "UTC-02:00")
+        time.tzset()
+        try:
+            start = datetime(2024, 8, 12, 23, 30, tzinfo=UTC)
+            end = datetime(2024, 8, 13, 0, 10, tzinfo=UTC)
+            naive_start = start.astimezone().replace(tzinfo=None)
+            naive_end = end.astimezone().replace(tzinfo=None)
+
+            assert slot_files(heatmap_archive, naive_start, naive_end) == slot_files(
+                heatmap_archive, start, end
+            )
+            assert list(query_heatmap(heatmap_archive, naive_start, naive_end)) == (
+                list(query_heatmap(heatmap_archive, start, end))
+            )
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+    def test_empty_window(self, heatmap_archive):
+        """Test a window with no slot files."""
+        start = datetime(2024, 8, 12, 5, 0, tzinfo=UTC)
+        end = datetime(2024, 8, 12, 6, 0, tzinfo=UTC)
+        assert list(query_heatmap(heatmap_archive, start, end)) == []
+
+
+def test_heatmap_modules_do_not_import_trace_modules():
+    """Test that heatmap queries and statistics leave the trace stack unloaded."""
+    code = (
+        "import sys, pyreadsb.heatmap_query, pyreadsb.heatmap_stats; "
+        "print(sorted(m for m in sys.modules if m.startswith('pyreadsb.traces')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,171 @@
+import gzip
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.heatmap_shm_cache import (
+    HeatmapCacheManager,
+    HeatmapSlotRegistry,
+    SharedHeatmapCache,
+)
+
+AUTHKEY = b"pyreadsb-test"
+
+
+@pytest.fixture
+def registry():
+    """Fixture providing an in-process registry, cleared afterwards."""
+    registry = HeatmapSlotRegistry()
+    yield registry
+    registry.clear()
+
+
+@pytest.fixture
+def cache(registry):
+    cache = SharedHeatmapCache(registry)
+    yield cache
+    cache.close()
+
+
+def _read_in_child(address, path, queue):
+    manager = HeatmapCacheManager(address, authkey=AUTHKEY)
+    manager.connect()
+    cache = SharedHeatmapCache(manager.registry())
+    columns = cache.heatmap_columns(path)
+    queue.put((len(columns), list(columns.hex_values)))
+    del columns
+    cache.close()
+
+
+class TestSharedHeatmapCache:
+    def test_columns_match_decoder(self, cache, heatmap_file):
+        """Test that shared columns equal a direct decode."""
+        decoder = HeatmapDecoder()
+        expected = decoder.decode_columns_from_file(heatmap_file)
+        columns = cache.heatmap_columns(heatmap_file)
+
+        assert len(columns) == len(expected)
+        for name in ("hex_values", "latitudes", "longitudes", "altitudes"):
+            assert list(getattr(columns, name)) == list(getattr(expected, name))
+        assert list(decoder.entries_from_columns(columns)) == list(
+            decoder.decode_from_file(heatmap_file)
+        )
+
+    def test_views_are_read_only(self, cache, heatmap_file):
+        """Test that shared columns cannot be modified."""
+        columns = cache.heatmap_columns(heatmap_file)
+        with pytest.raises(TypeError):
+            columns.latitudes[0] = 0
+
+    def test_slot_decoded_once(self, registry, heatmap_file):
+        """Test that several caches share one decoded segment."""
+        first = SharedHeatmapCache(registry)
+        second = SharedHeatmapCache(registry)
+        try:
+            assert len(first.heatmap_columns(heatmap_file)) == len(
+                second.heatmap_columns(heatmap_file)
+            )
+            assert registry.stats()["misses"] == 1
+            assert registry.stats()["hits"] == 1
+        finally:
+            first.close()
+            second.close()
+
+    def test_growing_file_invalidates_segment(self, cache, registry, tmp_path):
+        """Test that appending to a slot file replaces its segment."""
+        decoder = HeatmapDecoder()
+        path = tmp_path / "00.bin"
+        records = HeatmapDecoder.HEAT_ENTRY_LE
+        path.write_bytes(records.pack(decoder.MAGIC_NUMBER, 0, 1000, 0, 0))
+        assert len(cache.heatmap_columns(path)) == 1
+
+        with open(path, "ab") as f:
+            f.write(records.pack(0xABC123, 51_000_000, 0, 1200, 4500))
+        columns = cache.heatmap_columns(path)
+
+        assert len(columns) == 2
+        assert columns.hex_values[1] == 0xABC123
+        assert registry.stats()["misses"] == 2
+        assert registry.stats()["entries"] == 1
+
+    def test_lru_eviction(self, tmp_path, heatmap_bytes):
+        """Test that the least recently used segment is evicted first."""
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"{i:02d}.bin.ttf"
+            path.write_bytes(gzip.compress(heatmap_bytes))
+            paths.append(path)
+
+        probe = HeatmapSlotRegistry()
+        probe.acquire(str(paths[0]))
+        size = probe.stats()["bytes"]
+        probe.clear()
+
+        registry = HeatmapSlotRegistry(max_bytes=2 * size)
+        try:
+            registry.acquire(str(paths[0]))
+            registry.acquire(str(paths[1]))
+            registry.acquire(str(paths[0]))
+            registry.acquire(str(paths[2]))
+            assert registry.stats()["entries"] == 2
+
+            # paths[1] was evicted, paths[0] was kept
+            registry.acquire(str(paths[0]))
+            assert registry.stats()["misses"] == 3
+            registry.acquire(str(paths[1]))
+            assert registry.stats()["misses"] == 4
+        finally:
+            registry.clear()
+
+    def test_columns_outlive_detach(self, registry, heatmap_bytes, tmp_path):
+        """Test that columns handed out stay readable after detaching."""
+        paths = []
+        for i in range(2):
+            path = tmp_path / f"{i:02d}.bin"
+            path.write_bytes(heatmap_bytes)
+            paths.append(path)
+
+        cache = SharedHeatmapCache(registry, max_attached=1)
+        first = cache.heatmap_columns(paths[0])
+        cache.heatmap_columns(paths[1])
+        registry.clear()
+
+        assert len(first) > 0
+        assert first.hex_values[0] == HeatmapDecoder.MAGIC_NUMBER
+        del first
+        cache.close()
+        assert cache.retired == []
+
+
+class TestHeatmapCacheManager:
+    def test_cross_process_attach(self, heatmap_file):
+        """Test that another process attaches to the server's segments."""
+        manager = HeatmapCacheManager(authkey=AUTHKEY)
+        manager.start_registry(max_bytes=1 << 20)
+        try:
+            registry = manager.registry()
+            cache = SharedHeatmapCache(registry)
+            columns = cache.heatmap_columns(heatmap_file)
+            expected = (len(columns), list(columns.hex_values))
+            name = registry.acquire(str(heatmap_file))
+
+            queue = multiprocessing.Queue()
+            child = multiprocessing.Process(
+                target=_read_in_child, args=(manager.address, heatmap_file, queue)
+            )
+            child.start()
+            assert queue.get(timeout=30) == expected
+            child.join(timeout=30)
+            assert child.exitcode == 0
+
+            assert registry.stats()["misses"] == 1
+            del columns
+            cache.close()
+        finally:
+            manager.shutdown()
+
+        # Shutting the server down unlinks its segments
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
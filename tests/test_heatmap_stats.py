@@ -0,0 +1,140 @@
+import pytest
+
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.heatmap_stats import (
+    CoverageStats,
+    Histogram,
+    HyperLogLog,
+    coverage_stats_from_files,
+)
+
+# Frankfurt, close to one of the synthetic aircraft (50.0, 8.5)
+REFERENCE = (50.1, 8.7)
+
+
+class TestHyperLogLog:
+    def test_small_cardinality_is_exact(self):
+        """Test that a few values are counted exactly (linear counting)."""
+        sketch = HyperLogLog()
+        for value in [1, 2, 3, 2, 1]:
+            sketch.add_int(value)
+        assert round(sketch.estimate()) == 3
+
+    @pytest.mark.parametrize("count", [10_000, 200_000])
+    def test_large_cardinality_error(self, count):
+        """Test that the estimate stays within a few standard errors."""
+        sketch = HyperLogLog()
+        for value in range(count):
+            sketch.add_int(value)
+        assert abs(sketch.estimate() - count) / count < 0.05
+
+    def test_merge_equals_union(self):
+        """Test that merging sketches equals sketching the union."""
+        left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        for value in range(5000):
+            left.add_int(value)
+            union.add_int(value)
+        for value in range(3000, 9000):
+            right.add_int(value)
+            union.add_int(value)
+        for value in ("UAL123", "DLH4AB"):
+            left.add_str(value)
+            union.add_str(value)
+
+        left.merge(right)
+        assert left.registers == union.registers
+
+    def test_invalid_configuration(self):
+        """Test that bad precisions and mismatched merges are rejected."""
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=2)
+        with pytest.raises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+
+class TestHistogram:
+    def test_bins(self):
+        """Test bin boundaries and merging."""
+        histogram = Histogram((10.0, 20.0))
+        for value in (0.0, 10.0, 15.0, 20.0, 99.0):
+            histogram.add(value)
+        assert histogram.counts == [1, 2, 2]
+
+        other = Histogram((10.0, 20.0))
+        other.add(5.0)
+        histogram.merge(other)
+        assert histogram.counts == [2, 2, 2]
+        assert histogram.total() == 6
+
+        with pytest.raises(ValueError):
+            histogram.merge(Histogram((10.0,)))
+
+
+class TestCoverageStats:
+    def test_stats_from_entries(self, heatmap_bytes):
+        """Test the statistics of the synthetic slot."""
+        stats = CoverageStats(reference=REFERENCE)
+        stats.update(HeatmapDecoder().decode_from_bytes(heatmap_bytes))
+
+        assert stats.positions == 9
+        assert stats.distinct_aircraft == 3
+        assert stats.callsign_records == 3
+        assert stats.distinct_callsigns == 1
+        # Altitudes of 30000-30050 ft land in the 30000-40000 band
+        assert stats.altitudes.counts[5] == 9
+        assert stats.start == 1723420800.0
+        assert stats.end == 1723420820.0
+        # The farthest aircraft is the Los Angeles one
+        assert stats.max_distance_km > 9000
+        assert stats.distances.counts[0] == 3
+        assert stats.distances.counts[-1] == 6
+
+    def test_columns_match_entries(self, heatmap_bytes):
+        """Test that the columnar path matches the entry path."""
+        decoder = HeatmapDecoder()
+        from_entries = CoverageStats(reference=REFERENCE)
+        from_entries.update(decoder.decode_from_bytes(heatmap_bytes))
+        from_columns = CoverageStats(reference=REFERENCE)
+        from_columns.update_from_columns(
+            decoder.decode_columns_from_bytes(heatmap_bytes)
+        )
+        assert from_columns == from_entries
+
+    def test_special_values(self, special_heatmap_bytes):
+        """Test ground, unknown and negative altitudes and 8-character callsigns."""
+        decoder = HeatmapDecoder()
+        stats = CoverageStats()
+        stats.update_from_columns(
+            decoder.decode_columns_from_bytes(special_heatmap_bytes)
+        )
+
+        assert stats.positions == 4
+        assert stats.ground_positions == 1
+        assert stats.unknown_altitudes == 1
+        # -1000 ft is below the first edge, 1000 ft in the 1000-5000 band
+        assert stats.altitudes.counts[0] == 1
+        assert stats.altitudes.counts[1] == 1
+        assert sum(stats.altitudes.counts) == 2
+        assert stats.distinct_callsigns == 2
+
+        from_entries = CoverageStats()
+        from_entries.update(decoder.decode_from_bytes(special_heatmap_bytes))
+        assert from_entries == stats
+
+    def test_merge_matches_single_pass(self, heatmap_archive):
+        """Test that merging per-file statistics equals one pass over all files."""
+        paths = sorted(heatmap_archive.rglob("*.bin.ttf"))
+        combined = coverage_stats_from_files(paths, reference=REFERENCE)
+
+        merged = CoverageStats(reference=REFERENCE)
+        for path in reversed(paths):
+            merged.merge(coverage_stats_from_files([path], reference=REFERENCE))
+
+        assert merged == combined
+        assert combined.positions == 9 * len(paths)
+        assert combined.distinct_aircraft == 3
+
+    def test_merge_rejects_other_reference(self):
+        """Test that statistics around different references do not merge."""
+        with pytest.raises(ValueError):
+            CoverageStats(reference=REFERENCE).merge(CoverageStats())
@@ -0,0 +1,138 @@
+import gzip
+import math
+
+import pytest
+
+from pyreadsb.heatmap_decoder import HeatmapDecoder
+from pyreadsb.heatmap_tracks import (
+    build_trajectories,
+    merge_trajectories,
+    trajectories_from_files,
+)
+
+
+def expected_tracks(data):
+    """Group decode_from_bytes output by aircraft the slow way."""
+    tracks = {}
+    timestamp = None
+    for entry in HeatmapDecoder().decode_from_bytes(data):
+        if isinstance(entry, HeatmapDecoder.TimestampSeparator):
+            timestamp = entry.timestamp.timestamp()
+        elif isinstance(entry, HeatmapDecoder.HeatEntry):
+            tracks.setdefault(entry.hex_id, []).append(
+                (timestamp, entry.lat, entry.lon)
+            )
+    return tracks
+
+
+class TestBuildTrajectories:
+    def test_grouping_matches_entries(self, heatmap_bytes):
+        """Test that each track holds the aircraft's points in time order."""
+        columns = HeatmapDecoder().decode_columns_from_bytes(heatmap_bytes)
+        trajectories = build_trajectories(columns)
+        expected = expected_tracks(heatmap_bytes)
+
+        assert len(trajectories) == len(expected)
+        assert list(trajectories.addresses) == sorted(trajectories.addresses)
+        for track in range(len(trajectories)):
+            span = trajectories.span(track)
+            points = list(
+                zip(
+                    trajectories.timestamps[span],
+                    trajectories.latitudes[span],
+                    trajectories.longitudes[span],
+                    strict=True,
+                )
+            )
+            assert points == expected[trajectories.hex_id(track)]
+
+    def test_callsigns_and_lookup(self, heatmap_bytes):
+        """Test callsign attachment and lookup by hex id."""
+        trajectories = build_trajectories(
+            HeatmapDecoder().decode_columns_from_bytes(heatmap_bytes)
+        )
+        track = trajectories.find("abc123")
+
+        assert track is not None
+        assert trajectories.callsigns[track] == "UAL123"
+        assert trajectories.callsigns[trajectories.find("3c6dd4")] is None
+        assert trajectories.find("ffffff") is None
+        assert trajectories.altitudes[trajectories.span(track)][0] == 30000.0
+        assert trajectories.ground_speeds[trajectories.span(track)][0] == 450.0
+
+    def test_special_values(self, special_heatmap_bytes):
+        """Test ground, unknown and negative altitudes and 8-character callsigns."""
+        trajectories = build_trajectories(
+            HeatmapDecoder().decode_columns_from_bytes(special_heatmap_bytes)
+        )
+        ground = trajectories.find("abc123")
+        unknown = trajectories.find("3c6dd4")
+        below = trajectories.find("a00001")
+
+        assert list(trajectories.altitudes[trajectories.span(ground)]) == [-1.0, 1000.0]
+        assert math.isnan(trajectories.altitudes[trajectories.span(unknown)][0])
+        assert math.isnan(trajectories.ground_speeds[trajectories.span(unknown)][0])
+        assert list(trajectories.altitudes[trajectories.span(below)]) == [-1000.0]
+        assert trajectories.callsigns[ground] == "SWA1234"
+        assert trajectories.callsigns[below] == "N12345AB"
+
+    def test_empty_slot(self):
+        """Test that an empty slot has no tracks."""
+        trajectories = build_trajectories(
+            HeatmapDecoder().decode_columns_from_bytes(b"")
+        )
+        assert len(trajectories) == 0
+        assert list(trajectories.offsets) == [0]
+
+
+class TestMergeTrajectories:
+    def test_merge_across_files(self, tmp_path, heatmap_bytes):
+        """Test that merging slot files concatenates tracks in time order."""
+        decoder = HeatmapDecoder()
+        columns = decoder.decode_columns_from_bytes(heatmap_bytes)
+        separators = columns.separator_indices()
+        first = heatmap_bytes[: separators[2] * 16]
+        second = heatmap_bytes[separators[2] * 16 :]
+        paths = []
+        for name, data in (("00.bin.ttf", second), ("01.bin.ttf", first)):
+            path = tmp_path / name
+            path.write_bytes(gzip.compress(data))
+            paths.append(path)
+
+        merged = trajectories_from_files(paths)
+        whole = build_trajectories(columns)
+
+        assert merged == whole
+
+    def test_latest_callsign_wins_in_any_order(self, heatmap_bytes):
+        """Test that the callsign of the latest track wins whatever the order."""
+        decoder = HeatmapDecoder()
+        separators = decoder.decode_columns_from_bytes(
+            heatmap_bytes
+        ).separator_indices()
+        earlier = build_trajectories(
+            decoder.decode_columns_from_bytes(heatmap_bytes[: separators[2] * 16])
+        )
+        later = build_trajectories(
+            decoder.decode_columns_from_bytes(
+                heatmap_bytes[separators[2] * 16 :].replace(b"UAL123", b"DAL456")
+            )
+        )
+
+        for groupings in ([earlier, later], [later, earlier]):
+            merged = merge_trajectories(groupings)
+            assert merged.callsigns[merged.find("abc123")] == "DAL456"
+
+    def test_merge_nothing(self):
+        """Test merging no groupings."""
+        assert len(merge_trajectories([])) == 0
+
+
+@pytest.mark.parametrize("hex_id", ["abc123", "a00001"])
+def test_span_lengths(heatmap_bytes, hex_id):
+    """Test that every chunk contributes one point per aircraft."""
+    trajectories = build_trajectories(
+        HeatmapDecoder().decode_columns_from_bytes(heatmap_bytes)
+    )
+    span = trajectories.span(trajectories.find(hex_id))
+    assert span.stop - span.start == 3
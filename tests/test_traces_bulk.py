@@ -0,0 +1,98 @@
+import gzip
+import math
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.traces_bulk import (
+    decode_trace_directory,
+    icao_from_trace_path,
+    iter_trace_files,
+)
+from pyreadsb.traces_decoder import (
+    process_traces_from_file,
+    trace_columns_from_file,
+)
+
+RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+
+class TestTraceColumns:
+    def test_columns_match_entries(self):
+        """Test that columns carry the same values as TraceEntry objects."""
+        columns = trace_columns_from_file(RESOURCE)
+        entries = list(process_traces_from_file(RESOURCE))
+
+        assert columns.icao == "ac134a"
+        assert len(columns) == len(entries)
+        for i in (0, 1, 3, len(entries) - 1):
+            entry = entries[i]
+            assert columns.latitudes[i] == entry.latitude
+            assert columns.longitudes[i] == entry.longitude
+            assert columns.altitudes[i] == entry.altitude
+            assert columns.flags[i] == entry.flags
+            assert columns.sources[i] == entry.source
+            assert columns.aircraft[i] == entry.aircraft
+
+    def test_missing_values_are_nan(self):
+        """Test that null values are stored as NaN."""
+        columns = trace_columns_from_file(RESOURCE)
+        assert math.isnan(columns.geometric_vertical_rates[0])
+        assert columns.geometric_altitudes[0] == 37375
+
+
+class TestDecodeTraceDirectory:
+    def test_iter_trace_files(self, traces_tree):
+        """Test that only trace files are found, in a stable order."""
+        files = list(iter_trace_files(traces_tree))
+        assert len(files) == 5
+        assert files == sorted(files)
+
+    def test_icao_from_trace_path(self):
+        """Test ICAO extraction from file names."""
+        assert icao_from_trace_path(Path("trace_full_AC134A.json.gz")) == "ac134a"
+
+    def test_ordered_decode(self, traces_tree):
+        """Test ordered decoding across a process pool."""
+        files = list(iter_trace_files(traces_tree))
+        batches = list(decode_trace_directory(traces_tree, max_workers=2, chunk_size=2))
+
+        assert [b.icao for b in batches] == [icao_from_trace_path(f) for f in files]
+        assert all(len(b) == 777 for b in batches)
+
+    def test_unordered_decode(self, traces_tree):
+        """Test unordered decoding yields every file exactly once."""
+        batches = list(
+            decode_trace_directory(
+                traces_tree,
+                max_workers=2,
+                chunk_size=1,
+                ordered=False,
+                max_pending_chunks=1,
+            )
+        )
+        assert sorted(b.icao for b in batches) == [
+            "ab0001",
+            "ab0002",
+            "ac134a",
+            "c0ffee",
+            "c0ffef",
+        ]
+
+    def test_truncated_file_is_skipped(self, traces_tree):
+        """Test that a half-written gzipped trace file does not abort the run."""
+        truncated = traces_tree / "ee" / "trace_full_c0ffee.json"
+        truncated.write_bytes(gzip.compress(RESOURCE.read_bytes())[:-100])
+
+        batches = list(decode_trace_directory(traces_tree, max_workers=2))
+        assert sorted(b.icao for b in batches) == [
+            "ab0001",
+            "ab0002",
+            "ac134a",
+            "c0ffef",
+        ]
+
+    def test_invalid_chunk_size(self, traces_tree):
+        """Test that an invalid chunk size is rejected."""
+        with pytest.raises(ValueError):
+            list(decode_trace_directory(traces_tree, chunk_size=0))
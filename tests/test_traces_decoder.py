@@ -1,9 +1,20 @@
+import gc
+import tracemalloc
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import pytest
 
-from pyreadsb.traces_decoder import get_aircraft_record, process_traces_from_file
+from pyreadsb.traces_decoder import (
+    TRACE_FLAG_NEW_LEG,
+    TRACE_FLAG_STALE,
+    TraceInterner,
+    compute_trace_legs,
+    get_aircraft_record,
+    process_traces_from_file,
+    trace_columns_from_file,
+    trace_entries_from_columns,
+)
 
 
 class TestGetAircraftRecord:
@@ -144,3 +155,230 @@ class TestProcessTraces:
         for trace in traces[:5]:
             assert isinstance(trace.altitude, int)
             assert trace.altitude > 0  # All our test data is at cruise altitude
+
+
+class TestTraceLegs:
+    @pytest.fixture
+    def columns(self):
+        """Fixture providing the test trace as columns."""
+        return trace_columns_from_file(
+            Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+        )
+
+    def test_legs_follow_new_leg_flags(self, columns):
+        """Test that legs start exactly at points flagged as a new leg."""
+        legs = compute_trace_legs(columns)
+        expected_starts = [0] + [
+            i for i, f in enumerate(columns.flags) if f & TRACE_FLAG_NEW_LEG and i
+        ]
+
+        assert [leg.start for leg in legs] == expected_starts
+        assert legs[-1].end == len(columns)
+        assert sum(leg.point_count for leg in legs) == len(columns)
+        for previous, current in zip(legs, legs[1:], strict=False):
+            assert previous.end == current.start
+
+    def test_leg_extent(self, columns):
+        """Test leg time range, bounding box and stale count."""
+        for leg in compute_trace_legs(columns):
+            points = list(trace_entries_from_columns(columns, leg.start, leg.end))
+            assert leg.start_time == points[0].timestamp
+            assert leg.end_time == points[-1].timestamp
+            assert leg.min_latitude == min(p.latitude for p in points)
+            assert leg.max_longitude == max(p.longitude for p in points)
+            assert leg.stale_points == sum(
+                1 for p in points if p.flags & TRACE_FLAG_STALE
+            )
+
+    def test_split_on_time_gaps(self, columns):
+        """Test that a gap threshold adds extra leg boundaries."""
+        legs = compute_trace_legs(columns)
+        gap_legs = compute_trace_legs(columns, max_gap=60.0)
+
+        assert len(gap_legs) > len(legs)
+        for leg in gap_legs:
+            offsets = columns.offsets[leg.start : leg.end]
+            assert all(
+                b - a <= 60.0 for a, b in zip(offsets, offsets[1:], strict=False)
+            )
+
+    def test_slice_leg(self, columns):
+        """Test slicing the columns of a single leg."""
+        leg = compute_trace_legs(columns)[-1]
+        sliced = columns.slice(leg.start, leg.end)
+
+        assert len(sliced) == leg.point_count
+        assert sliced.latitudes[0] == columns.latitudes[leg.start]
+
+    def test_entries_from_columns_match_row_decoder(self, columns):
+        """Test that materialised entries equal the row decoder output."""
+        entries = list(
+            process_traces_from_file(
+                Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+            )
+        )
+        assert list(trace_entries_from_columns(columns)) == entries
+
+    def test_empty_trace_has_no_legs(self, columns):
+        """Test that an empty trace yields no legs."""
+        assert compute_trace_legs(columns.slice(0, 0)) == []
+
+
+class TestInterning:
+    @pytest.fixture
+    def test_data_path(self):
+        """Fixture providing path to test data file."""
+        return Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+    def test_interned_entries_equal_plain_entries(self, test_data_path):
+        """Test that interning does not change decoded values."""
+        plain = list(process_traces_from_file(test_data_path))
+        interned = list(process_traces_from_file(test_data_path, intern=True))
+        assert interned == plain
+
+    def test_sources_and_keys_are_shared(self, test_data_path):
+        """Test that repeated strings are the same objects."""
+        traces = list(process_traces_from_file(test_data_path, intern=True))
+        sources = {id(t.source) for t in traces if t.source == "adsb_icao"}
+        assert len(sources) == 1
+
+        details = [t.aircraft for t in traces if t.aircraft]
+        first_keys = list(details[0])
+        for other in details[1:]:
+            for key in other:
+                if key in details[0]:
+                    assert key is first_keys[first_keys.index(key)]
+
+    def test_identical_consecutive_details_are_shared(self):
+        """Test that equal consecutive detail dicts become one object."""
+        interner = TraceInterner()
+        first = interner.details({"flight": "SWA506  ", "nav_qnh": 1013.6})
+        second = interner.details({"flight": "SWA506  ", "nav_qnh": 1013.6})
+        third = interner.details({"flight": "SWA506  ", "nav_qnh": 1012.0})
+
+        assert second is first
+        assert third is not first
+        assert third == {"flight": "SWA506  ", "nav_qnh": 1012.0}
+        assert third["flight"] is first["flight"]
+
+    def test_values_keep_their_type(self):
+        """Test that equal values of different types are not shared."""
+        interner = TraceInterner()
+        interner.details({"alert": True})
+        assert type(interner.details({"alert": 1, "spi": 0})["alert"]) is int
+
+    def test_equal_dicts_of_other_types_are_not_shared(self):
+        """Test that a dict equal to the previous one across types keeps its values."""
+        interner = TraceInterner()
+        first = interner.details({"alert": True, "nav_qnh": 1013})
+        second = interner.details({"alert": 1, "nav_qnh": 1013.0})
+
+        assert second is not first
+        assert type(second["alert"]) is int
+        assert type(second["nav_qnh"]) is float
+
+    def test_interning_reduces_retained_memory(self, test_data_path):
+        """Test that interned entries retain less memory than plain ones."""
+
+        def retained(build):
+            gc.collect()
+            tracemalloc.start()
+            try:
+                baseline = tracemalloc.get_traced_memory()[0]
+                entries = build()
+                size = tracemalloc.get_traced_memory()[0] - baseline
+            finally:
+                tracemalloc.stop()
+            assert entries
+            return size
+
+        plain = retained(lambda: list(process_traces_from_file(test_data_path)))
+        interned = retained(
+            lambda: list(process_traces_from_file(test_data_path, intern=True))
+        )
+        columns = retained(lambda: trace_columns_from_file(test_data_path))
+        assert interned < plain
+        assert columns < interned
+
+    def test_interned_columns(self, test_data_path):
+        """Test interning in the columnar decoder."""
+        plain = trace_columns_from_file(test_data_path)
+        interned = trace_columns_from_file(test_data_path, intern=True)
+        assert interned.aircraft == plain.aircraft
+        assert interned.sources == plain.sources
+
+
+class TestTimeWindow:
+    @pytest.fixture
+    def test_data_path(self):
+        """Fixture providing path to test data file."""
+        return Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+    def test_window_matches_filtered_entries(self, test_data_path):
+        """Test that a window returns exactly the points inside it."""
+        start = datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        end = datetime(2024, 8, 12, 0, 20, tzinfo=UTC)
+        expected = [
+            t
+            for t in process_traces_from_file(test_data_path)
+            if start <= t.timestamp <= end
+        ]
+        traces = list(process_traces_from_file(test_data_path, start=start, end=end))
+
+        assert expected
+        assert traces == expected
+
+    def test_open_ended_windows(self, test_data_path):
+        """Test windows bounded on one side only."""
+        all_traces = list(process_traces_from_file(test_data_path))
+        middle = all_traces[len(all_traces) // 2].timestamp
+
+        before = list(process_traces_from_file(test_data_path, end=middle))
+        after = list(process_traces_from_file(test_data_path, start=middle))
+        assert before[-1].timestamp == middle
+        assert after[0].timestamp == middle
+        assert len(before) + len(after) == len(all_traces) + 1
+
+    def test_window_outside_trace(self, test_data_path):
+        """Test that a window without points yields nothing."""
+        start = datetime(2024, 8, 14, tzinfo=UTC)
+        assert list(process_traces_from_file(test_data_path, start=start)) == []
+
+    def test_window_on_columns(self, test_data_path):
+        """Test that the columnar decoder applies the same window."""
+        start = datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        end = datetime(2024, 8, 12, 0, 20, tzinfo=UTC)
+        columns = trace_columns_from_file(test_data_path, start=start, end=end)
+        expected = list(process_traces_from_file(test_data_path, start=start, end=end))
+
+        assert list(trace_entries_from_columns(columns)) == expected
+
+
+class TestBatchedTraces:
+    @pytest.fixture
+    def test_data_path(self):
+        """Fixture providing path to test data file."""
+        return Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+    @pytest.mark.parametrize("batch_size", [1, 100, 10000])
+    def test_batches_match_entries(self, test_data_path, batch_size):
+        """Test that batches concatenate to the per-record output."""
+        expected = list(process_traces_from_file(test_data_path))
+        batches = list(process_traces_from_file(test_data_path, batch_size=batch_size))
+
+        assert all(1 <= len(batch) <= batch_size for batch in batches)
+        assert [entry for batch in batches for entry in batch] == expected
+
+    def test_batches_with_window_and_interning(self, test_data_path):
+        """Test batching combined with a time window and interning."""
+        start = datetime(2024, 8, 12, 0, 10, tzinfo=UTC)
+        expected = list(process_traces_from_file(test_data_path, start=start))
+        batches = process_traces_from_file(
+            test_data_path, start=start, intern=True, batch_size=64
+        )
+        assert [entry for batch in batches for entry in batch] == expected
+
+    def test_invalid_batch_size(self, test_data_path):
+        """Test that a non-positive batch size is rejected."""
+        with pytest.raises(ValueError):
+            list(process_traces_from_file(test_data_path, batch_size=0))
@@ -0,0 +1,113 @@
+import gzip
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.traces_decoder import trace_columns_from_file
+from pyreadsb.traces_index import TraceIndex
+
+TRACE_RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+START = datetime(2024, 8, 12, 0, 30, tzinfo=UTC)
+END = datetime(2024, 8, 12, 1, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def index(traces_tree):
+    """Fixture providing an index over the test traces tree."""
+    return TraceIndex.build(traces_tree, cell_degrees=0.5, max_workers=2)
+
+
+def brute_force(bbox, start, end):
+    """Return the matching points of the test trace by scanning every point."""
+    columns = trace_columns_from_file(TRACE_RESOURCE)
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return [
+        i
+        for i in range(len(columns))
+        if start.timestamp()
+        <= columns.timestamp + columns.offsets[i]
+        <= end.timestamp()
+        and min_lat <= columns.latitudes[i] <= max_lat
+        and min_lon <= columns.longitudes[i] <= max_lon
+    ]
+
+
+class TestTraceIndex:
+    def test_build(self, index):
+        """Test that every file and leg is indexed."""
+        assert len(index.paths) == 5
+        assert len({leg.file_id for leg in index.legs}) == 5
+        assert all(leg.cells for leg in index.legs)
+
+    def test_save_and_load_round_trip(self, index, tmp_path):
+        """Test the on-disk format round trip."""
+        index_file = tmp_path / "traces.idx"
+        index.save(index_file)
+        loaded = TraceIndex.load(index_file)
+
+        assert loaded.root == index.root
+        assert loaded.cell_degrees == index.cell_degrees
+        assert loaded.paths == index.paths
+        assert loaded.legs == index.legs
+        assert loaded.stamps == index.stamps
+
+    def test_truncated_file_is_skipped(self, traces_tree):
+        """Test that a half-written gzipped trace file does not abort the build."""
+        truncated = traces_tree / "ee" / "trace_full_c0ffee.json"
+        truncated.write_bytes(gzip.compress(TRACE_RESOURCE.read_bytes())[:-100])
+
+        index = TraceIndex.build(traces_tree, cell_degrees=0.5, max_workers=2)
+        assert len(index.paths) == 5
+        skipped = index.paths.index("ee/trace_full_c0ffee.json")
+        assert {leg.file_id for leg in index.legs} == set(range(5)) - {skipped}
+
+    def test_load_rejects_other_files(self, tmp_path):
+        """Test that a file without the index magic is rejected."""
+        bogus = tmp_path / "bogus.idx"
+        bogus.write_bytes(b"\x00" * 64)
+        with pytest.raises(ValueError):
+            TraceIndex.load(bogus)
+
+    def test_query_matches_brute_force(self, index):
+        """Test that queries return exactly the points a full scan would."""
+        columns = trace_columns_from_file(TRACE_RESOURCE)
+        bbox = (
+            min(columns.latitudes),
+            min(columns.longitudes),
+            max(columns.latitudes),
+            (min(columns.longitudes) + max(columns.longitudes)) / 2,
+        )
+        expected = brute_force(bbox, START, END)
+        results = list(index.query(bbox, START, END))
+
+        assert expected
+        assert len(results) == 5
+        for result in results:
+            assert list(result.offsets) == [columns.offsets[i] for i in expected]
+
+    def test_query_skips_changed_files(self, index, traces_tree, caplog):
+        """Test that rewritten and deleted files are skipped with a warning."""
+        rewritten = traces_tree / "ee" / "trace_full_c0ffee.json"
+        payload = TRACE_RESOURCE.read_bytes().replace(b'"ac134a"', b'"c0ffee"', 1)
+        rewritten.write_bytes(gzip.compress(payload + b"\n"))
+        (traces_tree / "ef" / "trace_full_c0ffef.json").unlink()
+
+        with caplog.at_level("WARNING"):
+            results = list(index.query(None, START, END))
+
+        assert len(results) == 3
+        assert "trace_full_c0ffee.json: changed since it was indexed" in caplog.text
+        assert "Skipping unreadable trace file" in caplog.text
+        assert "trace_full_c0ffef.json" in caplog.text
+
+    def test_query_outside_window(self, index):
+        """Test that a window without traffic opens no file."""
+        start = datetime(2024, 8, 13, 12, 0, tzinfo=UTC)
+        end = datetime(2024, 8, 13, 13, 0, tzinfo=UTC)
+        assert index.candidates(None, start, end) == []
+        assert list(index.query(None, start, end)) == []
+
+    def test_query_outside_box(self, index):
+        """Test that a box without traffic yields no candidates."""
+        assert index.candidates((-10.0, 100.0, -5.0, 110.0)) == []
@@ -0,0 +1,138 @@
+import math
+from array import array
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.traces_decoder import (
+    TRACE_FLAG_NEW_LEG,
+    TRACE_FLAG_STALE,
+    TraceColumns,
+    trace_columns_from_file,
+)
+from pyreadsb.traces_resample import resample_trace
+
+RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+
+def make_columns(offsets, latitudes, longitudes, altitudes, flags, timestamp=1000.0):
+    """Build minimal trace columns from plain lists."""
+    count = len(offsets)
+    nan_column = array("d", [math.nan] * count)
+    return TraceColumns(
+        icao="abcdef",
+        timestamp=timestamp,
+        offsets=array("d", offsets),
+        latitudes=array("d", latitudes),
+        longitudes=array("d", longitudes),
+        altitudes=array("d", altitudes),
+        ground_speeds=array("d", [400.0] * count),
+        tracks=nan_column,
+        flags=array("i", flags),
+        vertical_rates=nan_column,
+        aircraft=[None] * count,
+        sources=["adsb_icao"] * count,
+        geometric_altitudes=nan_column,
+        geometric_vertical_rates=nan_column,
+        indicated_airspeeds=nan_column,
+        roll_angles=nan_column,
+    )
+
+
+class TestResampleTrace:
+    def test_grid_alignment_and_linear_values(self):
+        """Test that samples fall on the absolute grid with interpolated values."""
+        columns = make_columns(
+            [0.0, 10.0, 20.0],
+            [0.0, 0.0, 0.0],
+            [0.0, 1.0, 2.0],
+            [0, 1000, 2000],
+            [0] * 3,
+        )
+        resampled = resample_trace(columns, 5.0)
+
+        assert list(resampled.offsets) == [0.0, 5.0, 10.0, 15.0, 20.0]
+        assert list(resampled.altitudes) == [0.0, 500.0, 1000.0, 1500.0, 2000.0]
+        assert resampled.longitudes[1] == pytest.approx(0.5)
+        assert resampled.latitudes[1] == pytest.approx(0.0, abs=1e-9)
+
+    def test_point_on_grid_with_real_timestamp(self):
+        """Test that a first point exactly on the grid is not lost to rounding."""
+        columns = make_columns(
+            [8.61, 9.61, 10.61],
+            [10.0, 10.01, 10.02],
+            [20.0, 20.0, 20.0],
+            [1000, 1000, 1000],
+            [0] * 3,
+            timestamp=1749702755.39,
+        )
+        resampled = resample_trace(columns, 0.5)
+
+        assert len(resampled) == 5
+        assert resampled.offsets[0] == pytest.approx(8.61)
+        assert resampled.latitudes[0] == pytest.approx(10.0)
+        assert resampled.latitudes[-1] == pytest.approx(10.02)
+        assert all(
+            first <= second
+            for first, second in zip(
+                resampled.latitudes, resampled.latitudes[1:], strict=False
+            )
+        )
+
+    def test_great_circle_interpolation(self):
+        """Test that the midpoint follows the great circle, not the rhumb line."""
+        columns = make_columns(
+            [0.0, 10.0], [60.0, 60.0], [-30.0, 30.0], [30000, 30000], [0, 0]
+        )
+        resampled = resample_trace(columns, 5.0)
+
+        # The great circle between two points on a parallel bulges poleward
+        assert resampled.latitudes[1] > 60.0
+        assert resampled.longitudes[1] == pytest.approx(0.0, abs=1e-9)
+
+    def test_no_interpolation_across_leg_breaks(self):
+        """Test that grid times between legs or around stale points are skipped."""
+        columns = make_columns(
+            [0.0, 10.0, 20.0, 30.0, 40.0, 50.0],
+            [0.0] * 6,
+            [0.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+            [1000] * 6,
+            [0, 0, TRACE_FLAG_NEW_LEG, 0, TRACE_FLAG_STALE, 0],
+        )
+        resampled = resample_trace(columns, 5.0)
+
+        assert list(resampled.offsets) == [0.0, 5.0, 10.0, 20.0, 25.0, 30.0]
+        assert list(resampled.segments) == [0, 0, 0, 1, 1, 1]
+
+    def test_max_gap(self):
+        """Test that long gaps are not interpolated when max_gap is set."""
+        columns = make_columns(
+            [0.0, 10.0, 100.0], [0.0] * 3, [0.0, 1.0, 2.0], [1000] * 3, [0] * 3
+        )
+        assert len(resample_trace(columns, 10.0)) == 11
+        assert list(resample_trace(columns, 10.0, max_gap=30.0).offsets) == [0.0, 10.0]
+
+    def test_ground_altitude_not_interpolated(self):
+        """Test that ground altitudes take the nearest point's value."""
+        columns = make_columns([0.0, 10.0], [0.0, 0.0], [0.0, 0.001], [-1, 500], [0, 0])
+        resampled = resample_trace(columns, 2.0)
+        assert list(resampled.altitudes) == [-1.0, -1.0, -1.0, 500.0, 500.0, 500.0]
+
+    def test_real_trace(self):
+        """Test resampling the real trace stays within its legs' extent."""
+        columns = trace_columns_from_file(RESOURCE)
+        resampled = resample_trace(columns, 5.0)
+
+        assert len(resampled) > 0
+        assert all(
+            b - a > 0
+            for a, b in zip(resampled.offsets, resampled.offsets[1:], strict=False)
+        )
+        assert min(resampled.latitudes) >= min(columns.latitudes) - 0.01
+        assert max(resampled.latitudes) <= max(columns.latitudes) + 0.01
+
+    def test_invalid_interval(self):
+        """Test that a non-positive interval is rejected."""
+        columns = trace_columns_from_file(RESOURCE)
+        with pytest.raises(ValueError):
+            resample_trace(columns, 0.0)
@@ -0,0 +1,115 @@
+import math
+from array import array
+from pathlib import Path
+
+import pytest
+
+from pyreadsb.traces_decoder import (
+    TRACE_FLAG_ALTITUDE_GEOMETRIC,
+    TRACE_FLAG_NEW_LEG,
+    TRACE_FLAG_STALE,
+    TraceColumns,
+    trace_columns_from_file,
+)
+from pyreadsb.traces_simplify import simplify_trace
+
+RESOURCE = Path(__file__).parent / "resources" / "trace_full_ac134a.json"
+
+
+def make_columns(latitudes, longitudes, altitudes, flags):
+    """Build minimal trace columns sampled every 10 seconds."""
+    count = len(latitudes)
+    nan_column = array("d", [math.nan] * count)
+    return TraceColumns(
+        icao="abcdef",
+        timestamp=0.0,
+        offsets=array("d", [10.0 * i for i in range(count)]),
+        latitudes=array("d", latitudes),
+        longitudes=array("d", longitudes),
+        altitudes=array("d", altitudes),
+        ground_speeds=nan_column,
+        tracks=nan_column,
+        flags=array("i", flags),
+        vertical_rates=nan_column,
+        aircraft=[None] * count,
+        sources=["adsb_icao"] * count,
+        geometric_altitudes=nan_column,
+        geometric_vertical_rates=nan_column,
+        indicated_airspeeds=nan_column,
+        roll_angles=nan_column,
+    )
+
+
+class TestSimplifyTrace:
+    def test_straight_line_collapses(self):
+        """Test that collinear points reduce to the end points."""
+        columns = make_columns(
+            [0.0] * 11, [0.01 * i for i in range(11)], [10000] * 11, [0] * 11
+        )
+        result = simplify_trace(columns, horizontal_tolerance=10.0)
+
+        assert list(result.kept_indices) == [0, 10]
+        assert result.compression_ratio == pytest.approx(5.5)
+        assert len(result.columns) == 2
+
+    def test_corner_is_kept(self):
+        """Test that a point far from the chord is kept."""
+        columns = make_columns(
+            [0.0, 0.0, 0.0, 0.01, 0.02],
+            [0.0, 0.01, 0.02, 0.02, 0.02],
+            [10000] * 5,
+            [0] * 5,
+        )
+        result = simplify_trace(columns, horizontal_tolerance=10.0)
+        assert list(result.kept_indices) == [0, 2, 4]
+
+    def test_vertical_tolerance(self):
+        """Test that altitude deviations keep points only with a vertical tolerance."""
+        columns = make_columns(
+            [0.0] * 5, [0.01 * i for i in range(5)], [0, 2500, 5000, 2500, 0], [0] * 5
+        )
+        assert list(simplify_trace(columns, 10.0).kept_indices) == [0, 4]
+        assert list(simplify_trace(columns, 10.0, 100.0).kept_indices) == [0, 2, 4]
+
+    def test_leg_boundaries_are_kept(self):
+        """Test that flagged points and the point before a leg break are kept."""
+        flags = [0] * 9
+        flags[5] = TRACE_FLAG_NEW_LEG
+        columns = make_columns([0.0] * 9, [0.01 * i for i in range(9)], [0] * 9, flags)
+
+        result = simplify_trace(columns, horizontal_tolerance=10.0)
+        assert list(result.kept_indices) == [0, 4, 5, 8]
+
+    def test_geometric_flags_are_not_anchors(self):
+        """Test that only the anchor flags force a point to be kept."""
+        flags = [0] * 9
+        flags[2] = TRACE_FLAG_ALTITUDE_GEOMETRIC
+        flags[6] = TRACE_FLAG_STALE
+        columns = make_columns([0.0] * 9, [0.01 * i for i in range(9)], [0] * 9, flags)
+
+        result = simplify_trace(columns, horizontal_tolerance=10.0)
+        assert list(result.kept_indices) == [0, 6, 8]
+
+        result = simplify_trace(
+            columns, 10.0, anchor_flags=TRACE_FLAG_ALTITUDE_GEOMETRIC
+        )
+        assert list(result.kept_indices) == [0, 2, 8]
+
+    def test_real_trace_within_tolerance(self):
+        """Test compression of the real trace keeps all anchored points."""
+        columns = trace_columns_from_file(RESOURCE)
+        result = simplify_trace(columns, horizontal_tolerance=50.0)
+
+        assert result.original_count == len(columns)
+        assert result.compression_ratio > 1.5
+        kept = set(result.kept_indices)
+        anchor_flags = TRACE_FLAG_STALE | TRACE_FLAG_NEW_LEG
+        assert all(i in kept for i, f in enumerate(columns.flags) if f & anchor_flags)
+
+    def test_invalid_tolerance(self):
+        """Test that non-positive tolerances are rejected."""
+        columns = trace_columns_from_file(RESOURCE)
+        with pytest.raises(ValueError):
+            simplify_trace(columns, 0.0)
+        with pytest.raises(ValueError):
+            simplify_trace(columns, 10.0, -1.0)